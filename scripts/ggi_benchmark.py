@@ -0,0 +1,454 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Benchmark suite for the parsing and rendering hot paths.
+
+Synthetic boards of various sizes are generated, with task-heavy
+scorecards and long label histories, and the following functions are
+timed on each of them:
+* extract_sections (building issue descriptions from activities),
+* extract_workflow: the previous line-by-line parser, kept as a
+  reference, the single-pass parser and the memoized one,
+* write_to_csv, write_activities_to_md and write_data_points,
+* update_keywords.
+
+For every function and board size, the best and mean times, the
+throughput (activities, or files, per second) and the peak memory
+allocated (from tracemalloc) are reported. Results can be written as
+JSON, along with the git commit, to be compared across commits.
+
+With -m, the memory used by the issue/event model is measured instead:
+records and dataframes of a board with the given numbers of label
+events are built in a fresh process, once as plain lists with object
+columns and once with the compact model, and the records are also
+streamed to the output files, twice so that the second run checks them
+against the stored history. The peak RSS of each is reported.
+
+usage: ggi_benchmark [-h] [-n ACTIVITIES [ACTIVITIES ...]] [-t TASKS] [-e EVENTS]
+                     [-r REPEAT] [-b BENCHMARK [BENCHMARK ...]] [-m EVENTS [EVENTS ...]]
+                     [-o OUTPUT]
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from ggi_deploy import conf_file, extract_sections, retrieve_env
+from ggi_update_website import *
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def reference_extract_workflow(activity_desc: str):
+    """
+    Previous implementation of extract_workflow, kept as a reference.
+    """
+    paragraphs = activity_desc.split('\n')
+    content_t = 'Introduction'
+    content = OrderedDict()
+    content = {content_t: []}
+    a_id = ""
+    for p in paragraphs:
+        activity_id_match = re_activity_id.match(p)
+        if activity_id_match:
+            a_id = activity_id_match.group(1)
+            continue
+        match_section = re.search(re_section, p)
+        if match_section:
+            content_t = match_section.group('section')
+            content[content_t] = []
+        else:
+            content[content_t].append(p)
+    subsection = 'Default'
+    workflow = {subsection: []}
+    tasks = []
+    if 'Scorecard' in content:
+        for p in content['Scorecard']:
+            match_subsection = re.search(re_subsection, p)
+            if match_subsection:
+                subsection = match_subsection.group('subsection')
+                workflow[subsection] = []
+            elif p != '':
+                workflow[subsection].append(p)
+                match_tasks = re.search(re_tasks, p)
+                if match_tasks:
+                    is_completed = match_tasks.group('is_completed')
+                    is_completed = True if is_completed == 'x' else False
+                    task = match_tasks.group('task')
+                    tasks.append({'is_completed': is_completed, 'task': task})
+    del workflow['Default']
+    if len(list(workflow)) > 2:
+        del workflow[list(workflow)[-1]][-1]
+        del workflow[list(workflow)[-1]][-1]
+    return a_id, content['Description'], workflow, tasks
+
+
+def make_dataset(nb_activities: int, nb_tasks: int, nb_events: int, seed: int = 0):
+    """
+    Generate a synthetic board, as the update scripts would retrieve it.
+
+    Activities are modelled after the GGI ones, with nb_tasks objectives in
+    their scorecard (a quarter of them completed) and nb_events label events
+    each. Returns a dict with the activities, the issue descriptions, the
+    issues, tasks and history dataframes, the params and the goal names.
+    """
+    rng = random.Random(seed)
+    metadata, init_scorecard = retrieve_env()
+    with open(conf_file, 'r', encoding='utf-8') as f:
+        params = json.load(f)
+    progress = list(params['progress_labels'].values())
+    goals = [goal['name'] for goal in metadata['goals']]
+    roles = list(metadata['roles'])
+
+    activities, descriptions, issues, tasks, hist = [], [], [], [], []
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for index in range(nb_activities):
+        activity_id = f"GGI-A-{index + 1:05d}"
+        paragraphs = '\n\n'.join(f"Paragraph {p} of activity {index}, describing what has to be done "
+                                 "and why it matters for the organisation." for p in range(nb_tasks // 10 + 1))
+        activity = {'id': activity_id,
+                    'name': f"Activity {index + 1}",
+                    'goal': goals[index % len(goals)],
+                    'roles': rng.sample(roles, rng.randint(1, len(roles))),
+                    'content': f"## Activity {index + 1}\n\n"
+                               f"Activity ID: [{activity_id}](https://example.org/activity_{index + 1}.md).\n\n"
+                               f"### Description\n\n{paragraphs}\n\n"
+                               "### Opportunity Assessment\n\nSome text.\n\n"
+                               "### Progress Assessment\n\nSome more text.\n\n"
+                               "### Tools\n\nA list of tools.\n\n"
+                               "### Resources\n\nA list of resources."}
+        activities.append(activity)
+
+        objectives = ''.join(f"- [{'x' if t % 4 == 0 else ' '}] objective {t} of activity {index + 1}\n"
+                             for t in range(nb_tasks))
+        scorecard = [line.replace("What we aim to achieve in this iteration.", objectives)
+                     for line in init_scorecard]
+        desc = extract_sections(argparse.Namespace(opt_random=False), scorecard, activity)
+        descriptions.append(desc)
+
+        a_id, description, workflow, a_tasks = parse_workflow(desc)
+        url = f"https://example.org/issues/{index + 1}"
+        labels = [activity['goal']] + activity['roles'] + [rng.choice(progress)]
+        updated_at = start + timedelta(hours=index)
+        issues.append(Issue(index + 1, a_id, 'open', activity['name'], ','.join(labels), updated_at, url,
+                            '\n'.join(description), workflow, len(a_tasks),
+                            len([t for t in a_tasks if t['is_completed']])))
+        tasks += [make_task(a_id, t['is_completed'], t['task']) for t in a_tasks]
+        for event in range(nb_events):
+            hist.append(make_label_event(updated_at + timedelta(minutes=event), index + 1, index * nb_events + event,
+                                         f"user{event % 7}",
+                                         f"{'labeled' if event % 2 == 0 else 'unlabeled'} {rng.choice(progress)}",
+                                         url))
+
+    issues, tasks, hist = build_dataframes(issues, tasks, hist)
+    return {
+        'activities': activities,
+        'init_scorecard': init_scorecard,
+        'descriptions': descriptions,
+        'issues': issues,
+        'tasks': tasks,
+        'hist': hist,
+        'params': params,
+        'goals': goals,
+    }
+
+
+def check_dataset(dataset: dict):
+    """
+    Check that every synthetic issue parses to a distinct Activity ID, as
+    real boards do, so that the output stages process every activity.
+    """
+    activity_ids = list(dataset['issues']['activity_id'])
+    assert all(activity_ids), "Some synthetic issues have no Activity ID."
+    assert len(set(activity_ids)) == len(activity_ids), "Some synthetic issues share an Activity ID."
+    for desc in dataset['descriptions']:
+        assert parse_workflow(desc) == reference_extract_workflow(desc)
+
+
+def reset_outputs():
+    """
+    Remove the generated files, so that every run writes them all.
+    """
+    shutil.rmtree('web/content', ignore_errors=True)
+    os.makedirs('web/content/includes')
+    os.makedirs('web/content/scorecards')
+
+
+def make_keyword_files(nb_files: int):
+    """
+    Write nb_files pages full of keywords to be replaced, returns their names.
+    """
+    content = ''.join(f"Line {i}: see [GGI_URL] and [GGI_ACTIVITIES_URL], updated on [GGI_CURRENT_DATE].\n"
+                      if i % 5 == 0 else f"Line {i}: nothing to replace here.\n" for i in range(200))
+    files = []
+    for index in range(nb_files):
+        filename = f'web/content/page_{index}.md'
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+        files.append(filename)
+    return files
+
+
+def get_benchmarks(dataset: dict):
+    """
+    Return the benchmarks to run on a dataset, as
+    {name: (function, setup, number of items processed)}.
+
+    The setup function is called before every run, and is not timed.
+    """
+    nb_activities = len(dataset['activities'])
+    keywords = {'[GGI_URL]': 'https://example.org/ggi/my-ggi-board',
+                '[GGI_ACTIVITIES_URL]': 'https://example.org/ggi/my-ggi-board/-/boards',
+                '[GGI_CURRENT_DATE]': '2025-01-01'}
+    keyword_files = []
+
+    def setup_keywords():
+        reset_outputs()
+        keyword_files[:] = make_keyword_files(nb_activities)
+
+    def run_parser(parser):
+        for desc in dataset['descriptions']:
+            parser(desc)
+
+    def fill_workflow_cache():
+        workflow_cache.clear()
+        run_parser(extract_workflow)
+
+    return {
+        'extract_sections': (
+            lambda: [extract_sections(argparse.Namespace(opt_random=False), dataset['init_scorecard'], a)
+                     for a in dataset['activities']],
+            None, nb_activities),
+        'extract_workflow (reference)': (
+            lambda: run_parser(reference_extract_workflow), None, nb_activities),
+        'extract_workflow (single-pass)': (
+            lambda: run_parser(parse_workflow), None, nb_activities),
+        'extract_workflow (cached)': (
+            lambda: run_parser(extract_workflow), fill_workflow_cache, nb_activities),
+        'write_to_csv': (
+            lambda: write_to_csv(dataset['issues'], dataset['tasks'], dataset['hist']),
+            reset_outputs, nb_activities),
+        'write_activities_to_md': (
+            lambda: write_activities_to_md(dataset['issues']), reset_outputs, nb_activities),
+        'write_data_points': (
+            lambda: write_data_points(dataset['issues'], dataset['params'], dataset['goals']),
+            reset_outputs, nb_activities),
+        'update_keywords': (
+            lambda: [update_keywords(f, keywords) for f in keyword_files], setup_keywords, nb_activities),
+    }
+
+
+def run_benchmark(func, setup, repeat: int):
+    """
+    Run func `repeat` times, and once more under tracemalloc.
+
+    Returns the best and mean times, in seconds, and the peak memory
+    allocated during a run, in bytes. Output of func is discarded.
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return min(times), sum(times) / len(times), peak
+
+
+def iter_board_records(compact: bool, nb_events: int, nb_issues: int):
+    """
+    Generate the records of a board as retrieved from the forge, with
+    nb_events label events spread over nb_issues issues. Strings are
+    built for every event, as when decoded from API responses.
+
+    Records use the compact model, or plain lists if compact is False.
+    """
+    events_per_issue = nb_events // nb_issues
+    for index in range(nb_issues):
+        url = f"https://example.org/issues/{index + 1}"
+        workflow = {'Objectives': [f"- [ ] objective {t}" for t in range(10)]}
+        issue = [index + 1, f"GGI-A-{index % 100:02d}", 'opened', f"Activity {index + 1}",
+                 'Culture Goal,Not Started', '2025-01-01T00:00:00.000Z', url,
+                 f"Description of activity {index + 1}.", workflow, 10, 0]
+        tasks = [[issue[1], 'open', f"objective {t}"] for t in range(10)]
+        hist = []
+        for event in range(events_per_issue):
+            n = index * events_per_issue + event
+            hist.append([f"2025-01-{1 + n % 28:02d}T{n % 24:02d}:{n % 60:02d}:00.000Z", index + 1, n, 'label',
+                         f"user{n % 50}", f"{'add' if n % 2 == 0 else 'remove'} {['Not Started', 'In Progress', 'Done'][n % 3]}",
+                         url])
+        if compact:
+            issue = Issue(*issue)
+            tasks = [Task(*t) for t in tasks]
+            hist = [make_label_event(e[0], e[1], e[2], e[4], e[5], e[6]) for e in hist]
+        yield [index + 1, issue, tasks, hist]
+
+
+def measure_model_memory(model: str, nb_events: int, nb_issues: int):
+    """
+    Build the records and dataframes of a board, and return the peak RSS
+    of the process before and after, and the memory used by the
+    dataframes, in bytes. Runs in a fresh process.
+    """
+    import resource
+
+    # ru_maxrss is in KiB on Linux.
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    if model == 'streaming':
+        os.chdir(tempfile.mkdtemp(prefix='ggi_benchmark_'))
+        reset_outputs()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # The second run checks every event against the stored history.
+            for _ in range(2):
+                frames = [stream_records(iter_board_records(True, nb_events, nb_issues))]
+        shutil.rmtree(os.getcwd(), ignore_errors=True)
+    elif model == 'compact':
+        records = list(iter_board_records(True, nb_events, nb_issues))
+        frames = build_dataframes(*flatten_records(records))
+    else:
+        records = list(iter_board_records(False, nb_events, nb_issues))
+        issues, tasks, hist = flatten_records(records)
+        frames = (pd.DataFrame(issues, columns=Issue._fields),
+                  pd.DataFrame(tasks, columns=Task._fields),
+                  pd.DataFrame(hist, columns=LabelEvent._fields))
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return before, after, int(sum(frame.memory_usage(deep=True).sum() for frame in frames))
+
+
+def run_memory_benchmark(nb_events: int, nb_issues: int = 100):
+    """
+    Measure the peak RSS of all models for a board, each in a fresh process.
+    """
+    results = {}
+    for model in ['lists', 'compact', 'streaming']:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results[model] = executor.submit(measure_model_memory, model, nb_events, nb_issues).result()
+    return results
+
+
+def get_git_commit():
+    """
+    Return the current git commit of the repository, if any.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    """
+    Parse arguments from command line.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the parsing and rendering hot paths.")
+    parser.add_argument('-n', '--activities', dest='activities', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Numbers of activities of the generated boards (default: 10 100 1000).')
+    parser.add_argument('-t', '--tasks', dest='tasks', type=int, default=100,
+                        help='Number of tasks per scorecard (default: 100).')
+    parser.add_argument('-e', '--events', dest='events', type=int, default=50,
+                        help='Number of label events per activity (default: 50).')
+    parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=3,
+                        help='Number of timed runs, the best one is kept (default: 3).')
+    parser.add_argument('-b', '--benchmark', dest='benchmarks', nargs='+', default=None,
+                        help='Only run the benchmarks whose name starts with one of these.')
+    parser.add_argument('-m', '--memory', dest='memory', type=int, nargs='+', default=None,
+                        help='Measure the peak RSS of the issue/event model for boards with these numbers '
+                             'of label events (e.g. 100000), instead of running the timing benchmarks.')
+    parser.add_argument('-o', '--output', dest='output', default=None,
+                        help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = parse_args()
+    report = {'commit': get_git_commit(),
+              'date': datetime.now(timezone.utc).isoformat(),
+              'python': platform.python_version(),
+              'pandas': pd.__version__,
+              'parameters': {'tasks': args.tasks, 'events': args.events, 'repeat': args.repeat},
+              'results': []}
+
+    if args.memory is not None:
+        print("\n# Peak RSS of the issue/event model (100 issues).")
+        for nb_events in args.memory:
+            for model, (before, after, frames) in run_memory_benchmark(nb_events).items():
+                report['results'].append({'benchmark': f'memory ({model})',
+                                          'events': nb_events,
+                                          'peak_rss_bytes': after,
+                                          'model_rss_bytes': after - before,
+                                          'dataframes_bytes': frames})
+                print(f"  {nb_events:>8} events, {model:<9}: peak RSS {after / 2**20:8.1f} MiB, "
+                      f"model {(after - before) / 2**20:8.1f} MiB, dataframes {frames / 2**20:8.1f} MiB")
+        args.activities = []
+
+    work_dir = tempfile.mkdtemp(prefix='ggi_benchmark_')
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        for nb_activities in args.activities:
+            dataset = make_dataset(nb_activities, args.tasks, args.events)
+            print(f"\n# {nb_activities} activities, {args.tasks} tasks and {args.events} label events each.")
+
+            # Check the dataset, and that both parsers agree, before timing them.
+            check_dataset(dataset)
+
+            for name, (func, setup, nb_items) in get_benchmarks(dataset).items():
+                if args.benchmarks and not any(name.startswith(b) for b in args.benchmarks):
+                    continue
+                best, mean, peak = run_benchmark(func, setup, args.repeat)
+                report['results'].append({'benchmark': name,
+                                          'activities': nb_activities,
+                                          'best_s': round(best, 6),
+                                          'mean_s': round(mean, 6),
+                                          'throughput_per_s': round(nb_items / best, 1),
+                                          'peak_memory_bytes': peak})
+                print(f"  {name:<32}: {best:8.3f} s, {nb_items / best:12.1f} /s, peak {peak / 2**20:8.1f} MiB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"\n# Results written to {args.output}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,7 @@ This script:
 The script expects your GitLab private key in the environment variable: GGI_GITLAB_TOKEN
 You may also set an environment variable 'GGI_DEMO_MODE' to 'true' to activate the demo mode.
 
-usage: ggi_deploy [-h] [-a] [-b] [-d] [-p]
+usage: ggi_deploy [-h] [-a] [-b] [-d] [-p] [-c] [-t] [--plan]
 
 optional arguments:
   -h, --help                  Show this help message and exit
@@ -28,12 +28,17 @@ optional arguments:
   -b, --board                 Create board
   -d, --project-description   Update Project Description with pointers to the Board and Dashboard
   -p, --schedule-pipeline     Schedule nightly pipeline to update dashboard
+  -c, --http-cache            Cache API responses on disk and revalidate them with conditional requests
+  -t, --telemetry             Record phase timings and API calls, and write a JSON and OpenMetrics report
+  --plan                      Only print the API calls needed to create missing labels and activities
 """
 import argparse
+import hashlib
 import json
 import os
 import random
 import re
+import tempfile
 from collections import OrderedDict
 
 # Define some variables.
@@ -41,13 +46,23 @@ conf_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/conf'
 activities_file = conf_dir + '/ggi_activities_full.json'
 conf_file = conf_dir + '/ggi_deployment.json'
 init_scorecard_file = conf_dir + '/workflow_init.inc'
+# Descriptions of the activities already split in sections, by activity
+# ID, rebuilt when the hash of the activities file changes. Kept with the
+# other caches of the board being built, in the current directory.
+compiled_activities_file = 'web/cache/ggi_activities_compiled.json'
+# Version of the structure of the compiled activities.
+compiled_activities_version = 2
 
 
 # Define some regexps
 re_section = re.compile(r"^### (?P<section>.*?)\s*$")
+re_activity_id = re.compile(r"^Activity ID: \[(?P<activity_id>GGI-A-\d+)\]", re.MULTILINE)
 
 ggi_board_name = 'GGI Activities/Goals'
 
+# Compiled sections of the activities, by activity ID.
+activity_sections = {}
+
 #comment
 
 def parse_args():
@@ -76,6 +91,18 @@ def parse_args():
                         dest='opt_random',
                         action='store_true',
                         help='Random Scorecard objectives and Activities status, for demo purposes')
+    parser.add_argument('-c', '--http-cache',
+                        dest='opt_http_cache',
+                        action='store_true',
+                        help='Cache API responses on disk and revalidate them with conditional requests')
+    parser.add_argument('-t', '--telemetry',
+                        dest='opt_telemetry',
+                        action='store_true',
+                        help='Record phase timings and API calls, and write a JSON and OpenMetrics report.')
+    parser.add_argument('--plan',
+                        dest='opt_plan',
+                        action='store_true',
+                        help='Only print the API calls needed to create missing labels and activities')
     args = parser.parse_args()
 
     if 'GGI_DEMO_MODE' in os.environ:
@@ -89,11 +116,23 @@ def retrieve_env():
     """
     Read metadata for activities and deployment options.
 
+    Sections of the activities are read from the compiled activities
+    when they are up to date with the activities file, and compiled
+    otherwise.
     """
 
     print(f"\n# Reading metadata from {activities_file}")
-    with open(activities_file, 'r', encoding='utf-8') as f:
-        metadata = json.load(f)
+    with open(activities_file, 'rb') as f:
+        source = f.read()
+    source_hash = hashlib.sha256(source).hexdigest()
+    metadata = json.loads(source)
+
+    compiled = read_compiled_activities(source_hash)
+    if compiled is None:
+        print("# Compiling activities.")
+        compiled = compile_activities(metadata, source_hash)
+        write_compiled_activities(compiled)
+    activity_sections.update(compiled['sections'])
 
     # Read the custom scorecard init file.
     print(f"# Reading scorecard init file from {init_scorecard_file}.")
@@ -103,6 +142,78 @@ def retrieve_env():
     return metadata, init_scorecard
 
 
+def compile_sections(content: str):
+    """
+    Split the description of an activity in sections.
+
+    Returns a dict with the Activity ID line (second paragraph of the
+    introduction) and the text of all other sections, ready to be
+    appended after the scorecard.
+    """
+    paragraphs = content.split('\n\n')
+    content_t = 'Introduction'
+    sections = OrderedDict()
+    sections = {content_t: []}
+    for p in paragraphs:
+        match_section = re.search(re_section, p)
+        if match_section:
+            content_t = match_section.group('section')
+            sections[content_t] = []
+        else:
+            sections[content_t].append(p)
+    activity_id_line = sections['Introduction'][1]
+    del sections['Introduction']
+    body = ''.join(f"\n\n### {key}\n\n" + '\n\n'.join(sections[key]) for key in sections.keys())
+    return {'activity_id_line': activity_id_line, 'body': body}
+
+
+def compile_activities(metadata: dict, source_hash: str):
+    """
+    Compile the activities metadata: sections of all activities, by ID.
+    """
+    return {'version': compiled_activities_version,
+            'source_sha256': source_hash,
+            'sections': {activity['id']: compile_sections(activity['content'])
+                         for activity in metadata['activities']}}
+
+
+def read_compiled_activities(source_hash: str):
+    """
+    Read the compiled activities, or None if they are missing, from
+    another version or built from another activities file.
+    """
+    if not os.path.isfile(compiled_activities_file):
+        return None
+    try:
+        with open(compiled_activities_file, 'r', encoding='utf-8') as f:
+            compiled = json.load(f)
+    except Exception:
+        return None
+    if compiled.get('version') != compiled_activities_version or compiled.get('source_sha256') != source_hash:
+        return None
+    return compiled
+
+
+def write_compiled_activities(compiled: dict):
+    """
+    Write the compiled activities atomically. Failures are not fatal:
+    activities are compiled again at the next run. Nothing is written
+    outside of a board tree (no `web` directory).
+    """
+    directory = os.path.dirname(compiled_activities_file)
+    if not os.path.isdir(os.path.dirname(directory)):
+        return
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix='.ggi_activities_compiled.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(compiled, f, separators=(',', ':'))
+        os.chmod(tmp_filename, 0o644)
+        os.replace(tmp_filename, compiled_activities_file)
+    except OSError as e:
+        print(f"  Cannot write compiled activities: {e}")
+
+
 def get_scorecard(opt_random, init_scorecard):
     """
     Build a scorecard with a random number of objectives,
@@ -129,26 +240,89 @@ def extract_sections(args, init_scorecard, activity):
     """
     Extracts the scorecard from the "Introduction" section in the
     description field of an issue.
+
+    Sections come from the compiled activities, by activity ID; other
+    activities are compiled on the fly.
     """
-    paragraphs = activity['content'].split('\n\n')
-    content_t = 'Introduction'
-    content = OrderedDict()
-    content = {content_t: []}
-    for p in paragraphs:
-        match_section = re.search(re_section, p)
-        if match_section:
-            content_t = match_section.group('section')
-            content[content_t] = []
-        else:
-            content[content_t].append(p)
+    sections = activity_sections.get(activity['id'])
+    if sections is None:
+        sections = compile_sections(activity['content'])
+        activity_sections[activity['id']] = sections
     # Add Activity ID
-    content_text = content['Introduction'][1] + '\n\n'
+    content_text = sections['activity_id_line'] + '\n\n'
     # Add Scorecard
     content_text += ''.join(get_scorecard(args.opt_random, init_scorecard))
-    del content['Introduction']
     # Add description content.
-    for key in content.keys():
-        content_text += f"\n\n### {key}\n\n"
-        content_text += '\n\n'.join(content[key])
+    content_text += sections['body']
     return content_text
 
+
+
+def normalise_colour(colour: str):
+    """
+    Normalise a label colour to lower-case hex, without the leading '#'.
+    """
+    return colour.lstrip('#').lower()
+
+
+def get_wanted_labels(metadata, params: dict):
+    """
+    Build the set of labels needed by the GGI board: roles, progress and goals.
+
+    Returns a {name: colour} dict, colours being normalised.
+    """
+    labels = {}
+    for label, colour in metadata['roles'].items():
+        labels[label] = colour
+    for name, label in params['progress_labels'].items():
+        if label != '':
+            labels[label] = 'ed9121'
+    for goal in metadata['goals']:
+        labels[goal['name']] = goal['colour']
+    return {name: normalise_colour(colour) for name, colour in labels.items()}
+
+
+def diff_labels(existing_labels: dict, wanted_labels: dict):
+    """
+    Compare existing labels with wanted labels, both as {name: colour} dicts.
+
+    Returns the lists of label names to create, to update (colour changed)
+    and to leave untouched.
+    """
+    to_create, to_update, unchanged = [], [], []
+    for name, colour in wanted_labels.items():
+        if name not in existing_labels:
+            to_create.append(name)
+        elif normalise_colour(existing_labels[name]) != colour:
+            to_update.append(name)
+        else:
+            unchanged.append(name)
+    return to_create, to_update, unchanged
+
+
+def index_activities(issues):
+    """
+    Index existing issues by the Activity ID found in their description.
+
+    Takes an iterable of (issue reference, description) pairs and returns
+    an {activity_id: issue reference} dict.
+    """
+    index = {}
+    for ref, desc in issues:
+        match = re_activity_id.search(desc or '')
+        if match:
+            index.setdefault(match.group('activity_id'), ref)
+    return index
+
+
+def plan_activities(metadata, existing_activities: dict):
+    """
+    Returns the activities of the metadata that have no issue yet.
+
+    Existing issues are listed with one query per goal label, as every
+    activity is created with the label of its goal, so that other issues
+    and pull requests are not fetched. Closed activities count as
+    existing: they are never recreated. An activity whose goal label was
+    removed is not seen, and is created again.
+    """
+    return [a for a in metadata['activities'] if a['id'] not in existing_activities]
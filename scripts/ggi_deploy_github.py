@@ -12,11 +12,9 @@
 """
 
 """
-import time
-
-import requests
-from github import GithubException
-
+from ggi_http_cache import enable_http_cache, print_http_cache_stats
+from ggi_pacing import RequestPacer
+from ggi_telemetry import enable_telemetry, start_phase, write_telemetry_report
 from ggi_utils_github import *
 
 
@@ -29,10 +27,19 @@ def setup_github(metadata, params: dict, init_scorecard, args: dict):
     * Create Goals board
     * Create schedule for pipeline
     """
+    from github import GithubException
+
+    start_phase('connection')
     repo, github_handle, headers = get_authent(params)
+    # Go as fast as the rate limits permit.
+    pacer = RequestPacer()
+
+    if args.opt_plan:
+        print("\n# Plan mode: only labels and activities are planned, other steps are skipped.")
 
     # Update current project description with Website URL
-    if args.opt_projdesc:
+    if args.opt_projdesc and not args.opt_plan:
+        start_phase('project description')
         print("\n# Update Project description")
         ggi_activities_url = params['GITHUB_ACTIVITIES_URL']
 
@@ -47,7 +54,7 @@ def setup_github(metadata, params: dict, init_scorecard, args: dict):
         print(f"New description:\n<<<---------\n{desc}\n--------->>>\n")
 
         # Update the repository description
-        repo.edit(description=desc, homepage="https://ospo-alliance.org/")
+        pacer.call(repo.edit, description=desc, homepage="https://ospo-alliance.org/")
 
     #
     # Create labels & activities
@@ -55,78 +62,84 @@ def setup_github(metadata, params: dict, init_scorecard, args: dict):
     if args.opt_activities:
 
         # Create labels.
+        start_phase('labels')
         print("\n# Manage labels")
-
-        # Create role labels if needed
-        print("\n Roles labels")
-        for label, colour in metadata['roles'].items():
-            create_github_label(repo, label, {'name': label, 'color': colour})
-
-        # Create labels for activity tracking
-        print("\n Progress labels")
-        for name, label in params['progress_labels'].items():
-            create_github_label(repo, label, {'name': label, 'color': 'ed9121'})
-
-        # Create goal labels if needed
-        print("\n Goal labels")
-        for goal in metadata['goals']:
-            create_github_label(repo, goal['name'],
-                                {'name': goal['name'], 'color': goal['colour']})
+        sync_github_labels(repo, get_wanted_labels(metadata, params), args.opt_plan, pacer)
 
         # Create issues with their associated labels.
+        start_phase('activities')
         print("\n# Create activities.")
-        # First test the existence of Activities Issues:
-        #   if at least one Issue is found bearing one Goal label,
-        #   consider that all Issues exist and do not add any.
-        open_issues = repo.get_issues(state='open')
-        if open_issues.totalCount > 0:
-            print("Ignore, Issues already exist")
-        else:
-            for activity in metadata['activities']:
-                progress_label = params['progress_labels']['not_started']
-                if args.opt_random:
-                    # Choix aléatoire parmi les étiquettes de progression valides
-                    progress_idx = random.choice(list(params['progress_labels']) + ['none'])
-                    if progress_idx != 'none':
-                        progress_label = params['progress_labels'][progress_idx]
-                labels = [activity['goal']] + activity['roles']
-                if progress_label != '':
-                    labels = labels + [progress_label]
-
-                print(f"  - Issue: {activity['name']:<60} Labels: {labels}")
-                # Création de l'issue
-                try:
-                    issue = repo.create_issue(
-                        title=activity['name'],
-                        body=extract_sections(args, init_scorecard, activity),
-                        labels=labels
-                    )
-                    time.sleep(2)
-                except GithubException as e:
-                    print(f"Status: {e.status}, Data: {e.data}")
+        # Index existing issues (open or closed) with a goal label by their
+        # Activity ID, and only create the activities that are missing (see
+        # plan_activities). Pull requests are listed as issues, and skipped.
+        existing_activities = index_activities(
+            (i.number, i.body) for goal in metadata['goals']
+            for i in repo.get_issues(state='all', labels=[goal['name']]) if i.pull_request is None)
+        missing_activities = plan_activities(metadata, existing_activities)
+        print(f" Found {len(existing_activities)} existing activities, {len(missing_activities)} missing.")
+        for activity in missing_activities:
+            progress_label = params['progress_labels']['not_started']
+            if args.opt_random:
+                # Choix aléatoire parmi les étiquettes de progression valides
+                progress_idx = random.choice(list(params['progress_labels']) + ['none'])
+                if progress_idx != 'none':
+                    progress_label = params['progress_labels'][progress_idx]
+            labels = [activity['goal']] + activity['roles']
+            if progress_label != '':
+                labels = labels + [progress_label]
+
+            if args.opt_plan:
+                print(f"  [plan] POST /repos/{repo.full_name}/issues title='{activity['name']}' labels={labels}")
+                continue
+            print(f"  - Issue: {activity['name']:<60} Labels: {labels}")
+            # Création de l'issue
+            try:
+                issue = pacer.call(
+                    repo.create_issue,
+                    title=activity['name'],
+                    body=extract_sections(args, init_scorecard, activity),
+                    labels=labels
+                )
+            except GithubException as e:
+                print(f"Status: {e.status}, Data: {e.data}")
 
     # Create Goals board
-    if args.opt_board:
+    if args.opt_board and not args.opt_plan:
+        start_phase('board')
         create_project_graphql(params)
 
     # Close the connection.
     github_handle.close()
 
-def create_github_label(repo, new_label, label_args):
-    existing_labels = {label.name for label in repo.get_labels()}
-
+def sync_github_labels(repo, wanted_labels: dict, plan: bool = False, pacer: RequestPacer = None):
     """
-    Creates a set of labels in the GitHub project.
+    Creates the missing labels in the GitHub project, and fixes the colour
+    of existing ones. Existing labels are fetched once, and writes are
+    paced by `pacer`.
+    In plan mode, only prints the API calls that would be made.
     """
-    if new_label in existing_labels:
-        print(f" Ignore label: {new_label}")
-    else:
-        print(f" Create label: {new_label}")
-        name = label_args['name']
-        color = label_args['color'].replace("#","")
-        repo.create_label(name, color)
+    pacer = pacer or RequestPacer()
+    existing_labels = {label.name: label for label in repo.get_labels()}
+    to_create, to_update, unchanged = diff_labels(
+        {name: label.color for name, label in existing_labels.items()}, wanted_labels)
+    for name in unchanged:
+        print(f" Ignore label: {name}")
+    for name in to_create:
+        if plan:
+            print(f"  [plan] POST /repos/{repo.full_name}/labels name='{name}' color={wanted_labels[name]}")
+            continue
+        print(f" Create label: {name}")
+        pacer.call(repo.create_label, name, wanted_labels[name])
+    for name in to_update:
+        if plan:
+            print(f"  [plan] PATCH /repos/{repo.full_name}/labels/{name} color={wanted_labels[name]}")
+            continue
+        print(f" Update label colour: {name}")
+        pacer.call(existing_labels[name].edit, name, wanted_labels[name])
 
 def get_owner_id(owner, gh_token):
+    import requests
+
     url = 'https://api.github.com/graphql'
 
     headers = {
@@ -171,11 +184,13 @@ def get_owner_id(owner, gh_token):
         raise Exception(f"Query failed with status {response.status_code}: {response.text}")
 
 def create_project_graphql(params):
+    import requests
+
     print(f"\n# Create Goals board: {ggi_board_name}")
 
     access_token = params['GGI_GITHUB_TOKEN']
     headers = {'Authorization': f'bearer {access_token}'}
-    graphql_url = 'https://api.github.com/graphql'
+    graphql_url = get_graphql_url(params)
 
     repo_infos = params['GGI_GITHUB_PROJECT'].split("/")
     repo_owner = repo_infos[0]
@@ -513,6 +528,8 @@ def create_project_graphql(params):
             #         print(f"✅ Assigné {goal_option_name} à l'issue '{issue['title']}'")
 
 def get_repo_id(headers):
+    import requests
+
     graphql_url = 'https://api.github.com/graphql'
 
     # GraphQL query to get repository owner ID
@@ -544,13 +561,22 @@ def main():
     Main GITHUB.
     """
     args = parse_args()
+    if args.opt_telemetry:
+        enable_telemetry()
+    if args.opt_http_cache:
+        enable_http_cache()
 
     print("* Using GitHub backend.")
+    start_phase('configuration')
     metadata, init_scorecard = retrieve_env()
     params = retrieve_params()
 
     setup_github(metadata, params, init_scorecard, args)
 
+    if args.opt_http_cache:
+        print_http_cache_stats()
+    if args.opt_telemetry:
+        write_telemetry_report('ggi_deploy_github')
     print("\nDone.")
 
 if __name__ == '__main__':
@@ -13,8 +13,11 @@ Deploy script for GitLab.
 """
 
 import urllib.parse
-import gitlab
+
 from ggi_deploy import *
+from ggi_http_cache import enable_http_cache, print_http_cache_stats
+from ggi_pacing import RequestPacer
+from ggi_telemetry import enable_telemetry, start_phase, write_telemetry_report
 from ggi_utils_gitlab import retrieve_params
 
 def main():
@@ -22,35 +25,82 @@ def main():
     Main GITLAB.
     """
     args = parse_args()
+    if args.opt_telemetry:
+        enable_telemetry()
+    if args.opt_http_cache:
+        enable_http_cache()
 
     print("* Using GitLab backend.")
+    start_phase('configuration')
     metadata, init_scorecard = retrieve_env()
     params = retrieve_params()
     setup_gitlab(metadata, params, init_scorecard, args)
 
+    if args.opt_http_cache:
+        print_http_cache_stats()
+    if args.opt_telemetry:
+        write_telemetry_report('ggi_deploy_gitlab')
     print("\nDone.")
 
-def create_gitlab_label(project, existing_labels, new_label, label_args):
+def sync_gitlab_labels(project, wanted_labels: dict, plan: bool = False, pacer: RequestPacer = None):
     """
-    Creates a set of labels in the GitLab project.
+    Creates the missing labels in the GitLab project, and fixes the colour
+    of existing ones. Existing labels are fetched once, and writes are
+    paced by `pacer`.
+    Labels inherited from ancestor groups cannot be updated from the
+    project: a different colour is only reported.
+    In plan mode, only prints the API calls that would be made.
     """
-    if new_label in existing_labels:
-        print(f" Ignore label: {new_label}")
-    else:
-        print(f" Create label: {new_label}")
-        project.labels.create(label_args)
+    pacer = pacer or RequestPacer()
+    existing_labels = {label.name: label for label in project.labels.list(all=True)}
+    to_create, to_update, unchanged = diff_labels(
+        {name: label.color for name, label in existing_labels.items()}, wanted_labels)
+    for name in unchanged:
+        print(f" Ignore label: {name}")
+    group_labels = [name for name in to_update if not getattr(existing_labels[name], 'is_project_label', True)]
+    for name in group_labels:
+        print(f" Ignore group label: {name} (colour {existing_labels[name].color}, "
+              f"expected #{wanted_labels[name]})")
+    to_update = [name for name in to_update if name not in group_labels]
+    for name in to_create:
+        if plan:
+            print(f"  [plan] POST /projects/{project.id}/labels name='{name}' color=#{wanted_labels[name]}")
+            continue
+        print(f" Create label: {name}")
+        pacer.call(project.labels.create, {'name': name, 'color': '#' + wanted_labels[name]}, obey_rate_limit=False)
+    for name in to_update:
+        if plan:
+            print(f"  [plan] PUT /projects/{project.id}/labels name='{name}' color=#{wanted_labels[name]}")
+            continue
+        print(f" Update label colour: {name}")
+        existing_labels[name].color = '#' + wanted_labels[name]
+        pacer.call(existing_labels[name].save, obey_rate_limit=False)
 
 def setup_gitlab(metadata, params: dict, init_scorecard, args: dict):
     """
     Executes the deployment on a GitLab instance.
     """
 
+    import gitlab
+
+    start_phase('connection')
     print(f"\n# Connection to GitLab at {params['GGI_GITLAB_URL']} ")
     gl = gitlab.Gitlab(url=params['GGI_GITLAB_URL'], per_page=50, private_token=params['GGI_GITLAB_TOKEN'])
+    # Pace write requests according to the rate limit headers of all responses.
+    # Writes are sent with obey_rate_limit=False, so that python-gitlab does
+    # not retry them on its own: throttled writes are retried by the pacer
+    # only, and writes failing with a server error are not retried at all,
+    # as they may have been applied (e.g. creating an issue twice).
+    pacer = RequestPacer()
+    gl.session.hooks['response'].append(pacer.response_hook)
     project = gl.projects.get(params['GGI_GITLAB_PROJECT'])
 
+    if args.opt_plan:
+        print("\n# Plan mode: only labels and activities are planned, other steps are skipped.")
+
     # Update current project description with Website URL
-    if args.opt_projdesc:
+    if args.opt_projdesc and not args.opt_plan:
+        start_phase('project description')
         print("\n# Update Project description")
         if 'CI_PAGES_URL' in os.environ:
             ggi_activities_url = params['GGI_ACTIVITIES_URL']
@@ -68,70 +118,69 @@ def setup_gitlab(metadata, params: dict, init_scorecard, args: dict):
             print(f"\nNew description:\n<<<---------\n{desc}\n--------->>>\n")
 
             project.description = desc
-            project.save()
+            pacer.call(project.save, obey_rate_limit=False)
         else:
             print("Cannot find environment variable 'CI_PAGES_URL', skipping.")
 
     # Create labels & activities
     if args.opt_activities:
+        start_phase('labels')
         print("\n# Manage labels")
-        existing_labels = [i.name for i in project.labels.list()]
-
-        print("\n Roles labels")
-        for label, colour in metadata['roles'].items():
-            create_gitlab_label(project, existing_labels, label, {'name': label, 'color': colour})
-
-        print("\n Progress labels")
-        for name, label in params['progress_labels'].items():
-            create_gitlab_label(project, existing_labels, label, {'name': label, 'color': '#ed9121'})
-
-        print("\n Goal labels")
-        for goal in metadata['goals']:
-            create_gitlab_label(project, existing_labels, goal['name'], {'name': goal['name'], 'color': goal['colour']})
+        sync_gitlab_labels(project, get_wanted_labels(metadata, params), args.opt_plan, pacer)
 
+        start_phase('activities')
         print("\n# Create activities.")
-        issues_test = project.issues.list(state='opened')
-        if len(issues_test) > 0:
-            print(" Ignore, Issues already exist")
-        else:
-            for activity in metadata['activities']:
-                progress_label = params['progress_labels']['not_started']
-                if args.opt_random:
-                    progress_idx = random.choice(list(params['progress_labels']) + ['none'])
-                    if progress_idx != 'none':
-                        progress_label = params['progress_labels'][progress_idx]
-                labels = [activity['goal']] + activity['roles'] + [progress_label]
-                print(f"  - Issue: {activity['name']:<60} Labels: {labels}")
-                ret = project.issues.create({'title': activity['name'],
-                                             'description': extract_sections(args, init_scorecard, activity),
-                                             'labels': labels})
+        # Index existing issues (open or closed) with a goal label by their
+        # Activity ID, and only create the activities that are missing (see
+        # plan_activities).
+        existing_activities = index_activities(
+            (i.iid, i.description) for goal in metadata['goals']
+            for i in project.issues.list(all=True, per_page=100, labels=[goal['name']]))
+        missing_activities = plan_activities(metadata, existing_activities)
+        print(f" Found {len(existing_activities)} existing activities, {len(missing_activities)} missing.")
+        for activity in missing_activities:
+            progress_label = params['progress_labels']['not_started']
+            if args.opt_random:
+                progress_idx = random.choice(list(params['progress_labels']) + ['none'])
+                if progress_idx != 'none':
+                    progress_label = params['progress_labels'][progress_idx]
+            labels = [activity['goal']] + activity['roles'] + [progress_label]
+            if args.opt_plan:
+                print(f"  [plan] POST /projects/{project.id}/issues title='{activity['name']}' labels={labels}")
+                continue
+            print(f"  - Issue: {activity['name']:<60} Labels: {labels}")
+            ret = pacer.call(project.issues.create, {'title': activity['name'],
+                                                     'description': extract_sections(args, init_scorecard, activity),
+                                                     'labels': labels}, obey_rate_limit=False)
 
     # Create Goals board
-    if args.opt_board:
+    if args.opt_board and not args.opt_plan:
+        start_phase('board')
         print(f"\n# Create Goals board: {ggi_board_name}")
         boards_list = project.boards.list()
         board_exists = any(b.name == ggi_board_name for b in boards_list)
         if board_exists:
             print(" Ignore, Board already exists")
         else:
-            board = project.boards.create({'name': ggi_board_name})
+            board = pacer.call(project.boards.create, {'name': ggi_board_name}, obey_rate_limit=False)
             print('\n# Create Goals board lists.')
             goal_lists = [l for g in metadata['goals'] for l in project.labels.list() if l.name == g['name']]
             for goal_label in goal_lists:
                 print(f"  - Create list for {goal_label.name}")
-                b_list = board.lists.create({'label_id': goal_label.id})
+                b_list = pacer.call(board.lists.create, {'label_id': goal_label.id}, obey_rate_limit=False)
 
     # Schedule nightly pipeline
-    if args.opt_schedulepipeline:
+    if args.opt_schedulepipeline and not args.opt_plan:
+        start_phase('schedule')
         print(f"\n# Schedule nightly pipeline to refresh the Dashboard")
         nb_pipelines = len(project.pipelineschedules.list())
         if nb_pipelines > 0:
             print(f" Ignore, already {nb_pipelines} scheduled pipeline(s)")
         else:
-            sched = project.pipelineschedules.create({
+            sched = pacer.call(project.pipelineschedules.create, {
                 'ref': 'main',
                 'description': 'Nightly Update',
-                'cron': '0 3 * * *'})
+                'cron': '0 3 * * *'}, obey_rate_limit=False)
             print(f" Pipeline created: '{sched.description}'")
 
 
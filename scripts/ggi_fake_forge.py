@@ -0,0 +1,761 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Local stand-in for the GitHub and GitLab APIs used by the GGI scripts.
+
+A single server answers:
+* the GitHub REST API under /api/v3 and the GitHub GraphQL API under
+  /api/graphql, as served by GitHub Enterprise,
+* the GitLab REST API under /api/v4.
+
+Only the endpoints used by the deploy and update scripts are served.
+Projects are created on first access, seeded with issues and label
+events built from the GGI activities. Latency, page size limits, rate
+limits and throttling (403 on GitHub, 429 on GitLab) can be injected.
+Answers to GET requests have an ETag, and conditional requests are
+answered with 304 Not Modified when it matches.
+
+Point the scripts at it through the usual settings, e.g. for a server
+started on port 8000:
+* GitLab: GGI_GITLAB_URL=http://127.0.0.1:8000 and GGI_GITLAB_PROJECT=ggi/my-ggi-board,
+* GitHub: "github_host": "http://127.0.0.1:8000" in conf/ggi_deployment.json.
+Any token is accepted.
+
+usage: ggi_fake_forge [-h] [-p PORT] [-n ISSUES] [-e EVENTS] [-l LATENCY]
+                      [--page-limit PAGE_LIMIT] [--rate-limit RATE_LIMIT]
+                      [--rate-window RATE_WINDOW] [--throttle-every THROTTLE_EVERY]
+                      [--retry-after RETRY_AFTER] [--seed SEED]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ggi_deploy import *
+
+# Date of the first seeded issue.
+seed_start_date = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+github_secondary_limit_message = ("You have exceeded a secondary rate limit. "
+                                  "Please wait a few minutes before you try again.")
+
+
+def format_github_time(value: datetime):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def format_gitlab_time(value: datetime):
+    return value.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def parse_time(value: str):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class FakeForge:
+    """
+    State and behaviour of the fake GitHub/GitLab server.
+    """
+
+    def __init__(self, issues: int = 25, events: int = 100, latency: float = 0.0,
+                 page_limit: int = 100, rate_limit: int = 0, rate_window: float = 60.0,
+                 throttle_every: int = 0, retry_after: int = 1, seed: int = 0):
+        self.nb_issues = issues
+        self.nb_events = events
+        # Seconds added to every answer.
+        self.latency = latency
+        # Largest page served, whatever the page size asked for.
+        self.page_limit = page_limit
+        # Requests permitted per window (0: unlimited), as primary rate limits.
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        # Throttle every n-th request (0: never), as secondary rate limits.
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.seed = seed
+
+        self.projects = {}
+        self.next_id = 1
+        self.window_start = time.time()
+        self.window_requests = 0
+        self.nb_requests = 0
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+        self.metadata, self.init_scorecard = retrieve_env()
+        with open(conf_file, 'r', encoding='utf-8') as f:
+            self.progress_labels = json.load(f)['progress_labels']
+        self.wanted_labels = get_wanted_labels(self.metadata, {'progress_labels': self.progress_labels})
+
+        self.routes = [
+            ('POST', r'/api/graphql', self.github_graphql),
+            ('GET', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)', self.github_get_repo),
+            ('PATCH', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)', self.github_edit_repo),
+            ('GET', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/issues', self.github_list_issues),
+            ('POST', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/issues', self.github_create_issue),
+            ('GET', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/issues/(?P<number>\d+)', self.github_get_issue),
+            ('GET', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/issues/(?P<number>\d+)/events', self.github_list_events),
+            ('GET', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/labels', self.github_list_labels),
+            ('POST', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/labels', self.github_create_label),
+            ('PATCH', r'/api/v3/repos/(?P<path>[^/]+/[^/]+)/labels/(?P<name>[^/]+)', self.github_edit_label),
+            ('GET', r'/api/v4/projects/(?P<path>[^/]+)', self.gitlab_get_project),
+            ('PUT', r'/api/v4/projects/(?P<path>[^/]+)', self.gitlab_edit_project),
+            ('GET', r'/api/v4/projects/(?P<path>[^/]+)/issues', self.gitlab_list_issues),
+            ('POST', r'/api/v4/projects/(?P<path>[^/]+)/issues', self.gitlab_create_issue),
+            ('GET', r'/api/v4/projects/(?P<path>[^/]+)/issues/(?P<number>\d+)/resource_label_events',
+             self.gitlab_list_events),
+            ('GET', r'/api/v4/projects/(?P<path>[^/]+)/labels', self.gitlab_list_labels),
+            ('POST', r'/api/v4/projects/(?P<path>[^/]+)/labels', self.gitlab_create_label),
+            ('PUT', r'/api/v4/projects/(?P<path>[^/]+)/labels/(?P<name>[^/]+)', self.gitlab_edit_label),
+            ('GET', r'/api/v4/projects/(?P<path>[^/]+)/boards', self.gitlab_list_boards),
+            ('POST', r'/api/v4/projects/(?P<path>[^/]+)/boards', self.gitlab_create_board),
+            ('POST', r'/api/v4/projects/(?P<path>[^/]+)/boards/(?P<board_id>\d+)/lists', self.gitlab_create_list),
+            ('GET', r'/api/v4/projects/(?P<path>[^/]+)/pipeline_schedules', self.gitlab_list_schedules),
+            ('POST', r'/api/v4/projects/(?P<path>[^/]+)/pipeline_schedules', self.gitlab_create_schedule),
+        ]
+        self.routes = [(method, re.compile(pattern + '/?$'), func) for method, pattern, func in self.routes]
+
+    #
+    # Projects and seed data.
+    #
+
+    def new_id(self):
+        """
+        Return a new unique identifier. Must be called with the lock held.
+        """
+        self.next_id += 1
+        return self.next_id
+
+    def get_project(self, path: str):
+        """
+        Return a project by path (or GitLab numeric id), created and seeded on first access.
+        """
+        path = urllib.parse.unquote(path)
+        with self.lock:
+            if path.isdigit():
+                for project in self.projects.values():
+                    if project['id'] == int(path):
+                        return project
+                return None
+            if path not in self.projects:
+                self.projects[path] = self.seed_project(path)
+            return self.projects[path]
+
+    def seed_project(self, path: str):
+        """
+        Create a project with issues and label events. Must be called with the lock held.
+
+        Issues are built from the GGI activities (cycled if more issues are
+        asked for), with a random number of objectives in their scorecard.
+        Label events are spread over the issues, alternating between
+        labeling and unlabeling progress labels.
+        """
+        rng = random.Random(f"{self.seed}:{path}")
+        project = {'id': self.new_id(), 'path': path, 'description': '',
+                   'labels': {}, 'issues': [], 'boards': [], 'schedules': [], 'projects_v2': []}
+        if self.nb_issues == 0:
+            return project
+
+        for name, colour in self.wanted_labels.items():
+            project['labels'][name] = {'id': self.new_id(), 'name': name, 'color': colour}
+        progress = [label for label in self.progress_labels.values() if label != '']
+        for number in range(1, self.nb_issues + 1):
+            activity = self.metadata['activities'][(number - 1) % len(self.metadata['activities'])]
+            objectives = ''.join(f"- [{'x' if rng.randint(1, 4) == 1 else ' '}] objective {idx} \n"
+                                 for idx in range(rng.randint(4, 10)))
+            body = extract_sections(argparse.Namespace(opt_random=False), self.init_scorecard, activity)
+            body = body.replace("What we aim to achieve in this iteration.", objectives)
+            created_at = seed_start_date + timedelta(hours=number)
+            project['issues'].append({
+                'id': self.new_id(), 'number': number, 'title': activity['name'], 'body': body,
+                'state': 'open', 'labels': [activity['goal']] + activity['roles'] + [rng.choice(progress)],
+                'created_at': created_at, 'updated_at': created_at, 'events': []})
+
+        for index in range(self.nb_events):
+            issue = project['issues'][index % self.nb_issues]
+            created_at = issue['updated_at'] + timedelta(minutes=rng.randint(1, 600))
+            issue['events'].append({'id': self.new_id(),
+                                    'action': 'add' if len(issue['events']) % 2 == 0 else 'remove',
+                                    'label': rng.choice(progress),
+                                    'user': f"user{rng.randint(1, 5)}",
+                                    'created_at': created_at})
+            issue['updated_at'] = created_at
+
+        return project
+
+    def add_issue(self, project: dict, title: str, body: str, labels: list, user: str):
+        """
+        Create an issue, as well as the labels and label events that go with it.
+        """
+        with self.lock:
+            now = datetime.now(timezone.utc)
+            issue = {'id': self.new_id(), 'number': len(project['issues']) + 1, 'title': title,
+                     'body': body or '', 'state': 'open', 'labels': list(labels),
+                     'created_at': now, 'updated_at': now, 'events': []}
+            for name in labels:
+                if name not in project['labels']:
+                    project['labels'][name] = {'id': self.new_id(), 'name': name, 'color': 'ededed'}
+                issue['events'].append({'id': self.new_id(), 'action': 'add', 'label': name,
+                                        'user': user, 'created_at': now})
+            project['issues'].append(issue)
+        return issue
+
+    #
+    # Request handling.
+    #
+
+    def check_limits(self, flavour: str, method: str):
+        """
+        Count a request against the rate limits.
+
+        Returns (status, headers, payload) if the request must be throttled,
+        and the rate limit headers to add to the answer otherwise.
+        """
+        prefix = 'X-RateLimit-' if flavour == 'github' else 'RateLimit-'
+        with self.lock:
+            self.nb_requests += 1
+            now = time.time()
+            if now - self.window_start >= self.rate_window:
+                self.window_start = now
+                self.window_requests = 0
+            self.window_requests += 1
+            reset = self.window_start + self.rate_window
+            headers = {}
+            if self.rate_limit:
+                headers = {prefix + 'Limit': str(self.rate_limit),
+                           prefix + 'Remaining': str(max(0, self.rate_limit - self.window_requests)),
+                           prefix + 'Reset': str(int(reset) + 1)}
+                if self.window_requests > self.rate_limit:
+                    self.stats['throttled (rate limit)'] += 1
+                    headers['Retry-After'] = str(max(1, int(reset - now) + 1))
+                    if flavour == 'github':
+                        return 403, headers, {'message': 'API rate limit exceeded.'}
+                    return 429, headers, {'message': '429 Too Many Requests'}
+            if self.throttle_every and self.nb_requests % self.throttle_every == 0:
+                self.stats['throttled (secondary)'] += 1
+                if method != 'GET':
+                    self.stats['throttled (secondary, writes)'] += 1
+                headers['Retry-After'] = str(self.retry_after)
+                if flavour == 'github':
+                    return 403, headers, {'message': github_secondary_limit_message}
+                return 429, headers, {'message': '429 Too Many Requests'}
+        return None, headers, None
+
+    def handle(self, method: str, url: str, headers, body: bytes):
+        """
+        Answer a request, returns (status, headers, payload).
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urllib.parse.urlsplit(url)
+        query = {k: v[-1] for k, v in urllib.parse.parse_qs(parsed.query).items()}
+        flavour = 'gitlab' if parsed.path.startswith('/api/v4/') else 'github'
+
+        if 'Authorization' not in headers and 'PRIVATE-TOKEN' not in headers:
+            return 401, {}, {'message': '401 Unauthorized'}
+        status, limit_headers, payload = self.check_limits(flavour, method)
+        if status is not None:
+            return status, limit_headers, payload
+
+        data = {}
+        if body:
+            if 'json' in headers.get('Content-Type', 'application/json'):
+                data = json.loads(body)
+            else:
+                data = {k: v[-1] for k, v in urllib.parse.parse_qs(body.decode()).items()}
+
+        for route_method, pattern, func in self.routes:
+            match = pattern.match(parsed.path)
+            if match and route_method == method:
+                with self.lock:
+                    self.stats[f"{method} {pattern.pattern}"] += 1
+                context = {'base': f"http://{headers.get('Host')}", 'path': parsed.path,
+                           'query': query, 'data': data}
+                status, answer_headers, payload = func(context, **match.groupdict())
+                return status, dict(limit_headers, **answer_headers), payload
+        return 404, limit_headers, {'message': 'Not Found'}
+
+    def filter_labels(self, context: dict, issues: list):
+        """
+        Keep the issues with all the labels of the query, if any.
+        """
+        if 'labels' not in context['query']:
+            return issues
+        labels = [label for label in context['query']['labels'].split(',') if label]
+        return [i for i in issues if all(label in i['labels'] for label in labels)]
+
+    def paginate(self, context: dict, items: list, default_per_page: int):
+        """
+        Return the requested page of items and the pagination headers:
+        Link (GitHub and GitLab) and X-* (GitLab).
+        """
+        per_page = min(int(context['query'].get('per_page', default_per_page)), self.page_limit)
+        page = int(context['query'].get('page', 1))
+        nb_pages = max(1, -(-len(items) // per_page))
+
+        def page_url(number: int):
+            # PyGithub expects the page number to be the last parameter.
+            query = {k: v for k, v in context['query'].items() if k != 'page'}
+            query['page'] = number
+            return f"{context['base']}{context['path']}?{urllib.parse.urlencode(query)}"
+
+        links = [f'<{page_url(1)}>; rel="first"', f'<{page_url(nb_pages)}>; rel="last"']
+        if page < nb_pages:
+            links.insert(0, f'<{page_url(page + 1)}>; rel="next"')
+        if page > 1:
+            links.insert(0, f'<{page_url(page - 1)}>; rel="prev"')
+        headers = {'Link': ', '.join(links),
+                   'X-Page': str(page), 'X-Per-Page': str(per_page),
+                   'X-Total': str(len(items)), 'X-Total-Pages': str(nb_pages),
+                   'X-Next-Page': str(page + 1) if page < nb_pages else ''}
+        return items[(page - 1) * per_page:page * per_page], headers
+
+    #
+    # GitHub REST API.
+    #
+
+    def github_repo(self, context: dict, project: dict):
+        url = f"{context['base']}/api/v3/repos/{project['path']}"
+        owner, name = project['path'].split('/')
+        return {'id': project['id'], 'node_id': f"R_{project['id']}", 'name': name,
+                'full_name': project['path'], 'owner': {'login': owner, 'type': 'User'},
+                'description': project['description'], 'private': False,
+                'url': url, 'html_url': f"{context['base']}/{project['path']}",
+                'has_issues': True, 'has_projects': True}
+
+    def github_label(self, context: dict, project: dict, label: dict):
+        return {'id': label['id'], 'name': label['name'], 'color': label['color'],
+                'url': f"{context['base']}/api/v3/repos/{project['path']}/labels/"
+                       + urllib.parse.quote(label['name'], safe='')}
+
+    def github_issue(self, context: dict, project: dict, issue: dict):
+        answer = {'id': issue['id'], 'node_id': f"I_{project['id']}_{issue['number']}",
+                  'number': issue['number'], 'title': issue['title'], 'body': issue['body'],
+                  'state': issue['state'],
+                  'labels': [self.github_label(context, project, project['labels'][name])
+                             for name in issue['labels']],
+                  'created_at': format_github_time(issue['created_at']),
+                  'updated_at': format_github_time(issue['updated_at']),
+                  'url': f"{context['base']}/api/v3/repos/{project['path']}/issues/{issue['number']}",
+                  'html_url': f"{context['base']}/{project['path']}/issues/{issue['number']}"}
+        if issue.get('pull_request'):
+            answer['pull_request'] = {'url': f"{context['base']}/api/v3/repos/{project['path']}/pulls/"
+                                             f"{issue['number']}"}
+        return answer
+
+    def github_event(self, context: dict, project: dict, event: dict):
+        return {'id': event['id'], 'node_id': f"LE_{event['id']}",
+                'event': 'labeled' if event['action'] == 'add' else 'unlabeled',
+                'actor': {'login': event['user']},
+                'label': {'name': event['label'], 'color': project['labels'][event['label']]['color']},
+                'created_at': format_github_time(event['created_at'])}
+
+    def github_get_repo(self, context: dict, path: str):
+        project = self.get_project(path)
+        return 200, {}, self.github_repo(context, project)
+
+    def github_edit_repo(self, context: dict, path: str):
+        project = self.get_project(path)
+        project['description'] = context['data'].get('description', project['description'])
+        return 200, {}, self.github_repo(context, project)
+
+    def github_list_issues(self, context: dict, path: str):
+        project = self.get_project(path)
+        state = context['query'].get('state', 'open')
+        issues = [i for i in reversed(project['issues']) if state == 'all' or i['state'] == state]
+        issues = self.filter_labels(context, issues)
+        if 'since' in context['query']:
+            since = parse_time(context['query']['since'])
+            issues = [i for i in issues if i['updated_at'] >= since]
+        page, headers = self.paginate(context, issues, 30)
+        return 200, headers, [self.github_issue(context, project, i) for i in page]
+
+    def github_create_issue(self, context: dict, path: str):
+        project = self.get_project(path)
+        data = context['data']
+        issue = self.add_issue(project, data['title'], data.get('body'), data.get('labels', []), 'ggi-bot')
+        return 201, {}, self.github_issue(context, project, issue)
+
+    def github_get_issue(self, context: dict, path: str, number: str):
+        project = self.get_project(path)
+        if not 0 < int(number) <= len(project['issues']):
+            return 404, {}, {'message': 'Not Found'}
+        return 200, {}, self.github_issue(context, project, project['issues'][int(number) - 1])
+
+    def github_list_events(self, context: dict, path: str, number: str):
+        project = self.get_project(path)
+        if not 0 < int(number) <= len(project['issues']):
+            return 404, {}, {'message': 'Not Found'}
+        events = project['issues'][int(number) - 1]['events']
+        page, headers = self.paginate(context, events, 30)
+        return 200, headers, [self.github_event(context, project, e) for e in page]
+
+    def github_list_labels(self, context: dict, path: str):
+        project = self.get_project(path)
+        page, headers = self.paginate(context, list(project['labels'].values()), 30)
+        return 200, headers, [self.github_label(context, project, label) for label in page]
+
+    def github_create_label(self, context: dict, path: str):
+        project = self.get_project(path)
+        data = context['data']
+        with self.lock:
+            if data['name'] in project['labels']:
+                return 422, {}, {'message': 'Validation Failed',
+                                 'errors': [{'resource': 'Label', 'code': 'already_exists', 'field': 'name'}]}
+            label = {'id': self.new_id(), 'name': data['name'], 'color': normalise_colour(data['color'])}
+            project['labels'][label['name']] = label
+        return 201, {}, self.github_label(context, project, label)
+
+    def github_edit_label(self, context: dict, path: str, name: str):
+        project = self.get_project(path)
+        name = urllib.parse.unquote(name)
+        if name not in project['labels']:
+            return 404, {}, {'message': 'Not Found'}
+        label = project['labels'][name]
+        label['color'] = normalise_colour(context['data'].get('color', label['color']))
+        return 200, {}, self.github_label(context, project, label)
+
+    #
+    # GitHub GraphQL API: the queries sent by the scripts are recognised by their content.
+    #
+
+    def graphql_issue_node(self, context: dict, project: dict, issue: dict):
+        events = [self.graphql_event(e) for e in issue['events']]
+        first = min(100, self.page_limit)
+        return {'id': f"I_{project['id']}_{issue['number']}", 'databaseId': issue['id'],
+                'number': issue['number'], 'state': issue['state'].upper(), 'title': issue['title'],
+                'body': issue['body'], 'url': f"{context['base']}/{project['path']}/issues/{issue['number']}",
+                'updatedAt': format_github_time(issue['updated_at']),
+                'labels': {'nodes': [{'name': name} for name in sorted(issue['labels'])]},
+                'timelineItems': {'pageInfo': {'hasNextPage': len(events) > first,
+                                               'endCursor': str(first)},
+                                  'nodes': events[:first]}}
+
+    def graphql_event(self, event: dict):
+        return {'__typename': 'LabeledEvent' if event['action'] == 'add' else 'UnlabeledEvent',
+                'id': f"LE_{event['id']}", 'createdAt': format_github_time(event['created_at']),
+                'actor': {'login': event['user']}, 'label': {'name': event['label']}}
+
+    def graphql_page(self, items: list, first: int, cursor: str):
+        """
+        Return the requested page of items, and its pageInfo.
+        """
+        first = min(first, self.page_limit)
+        start = int(cursor) if cursor else 0
+        end = start + first
+        return items[start:end], {'hasNextPage': end < len(items), 'endCursor': str(end)}
+
+    def github_graphql(self, context: dict):
+        query = context['data'].get('query', '')
+        variables = context['data'].get('variables') or {}
+
+        if 'createProjectV2Field' in query:
+            options = [dict(option, id=f"O_{index}") for index, option in enumerate(variables['options'])]
+            field = {'id': f"F_{variables['project_id']}", 'name': variables['name'], 'options': options}
+            return 200, {}, {'data': {'createProjectV2Field': {'projectV2Field': field}}}
+
+        if 'createProjectV2' in query:
+            owner = variables['owner_id'][len('U_'):]
+            project = {'id': f"PVT_{len(self.projects)}_{variables['title']}", 'name': variables['title'],
+                       'title': variables['title']}
+            for p in self.projects.values():
+                if p['path'].split('/')[0] == owner:
+                    p['projects_v2'].append(project)
+            return 200, {}, {'data': {'createProjectV2': {'projectV2': project}}}
+
+        if 'projects(search' in query:
+            project = self.get_project(f"{variables['repo_owner']}/{variables['repo_name']}")
+            nodes = [{'id': p['id'], 'name': p['name']} for p in project['projects_v2']
+                     if variables['project_name'] in p['name']]
+            return 200, {}, {'data': {'repository': {'projects': {'nodes': nodes}}}}
+
+        if 'node(id:' in query:
+            _, project_id, number = variables['id'].split('_')
+            project = self.get_project(project_id)
+            issue = project['issues'][int(number) - 1]
+            nodes, page_info = self.graphql_page([self.graphql_event(e) for e in issue['events']],
+                                                 100, variables.get('cursor'))
+            return 200, {}, {'data': {'node': {'timelineItems': {'pageInfo': page_info, 'nodes': nodes}}}}
+
+        if 'issues(' in query:
+            project = self.get_project(f"{variables['owner']}/{variables['name']}")
+            filters = variables.get('filters') or {}
+            issues = [i for i in reversed(project['issues'])
+                      if i['state'].upper() in filters.get('states', ['OPEN', 'CLOSED'])]
+            if 'since' in filters:
+                since = parse_time(filters['since'])
+                issues = [i for i in issues if i['updated_at'] >= since]
+            page, page_info = self.graphql_page(issues, 100, variables.get('cursor'))
+            nodes = [self.graphql_issue_node(context, project, i) for i in page]
+            return 200, {}, {'data': {'repository': {'issues': {'totalCount': len(issues),
+                                                                'pageInfo': page_info,
+                                                                'nodes': nodes}}}}
+
+        if 'user(login' in query:
+            owner = variables.get('owner', variables.get('repo_owner'))
+            return 200, {}, {'data': {'user': {'id': f"U_{owner}"}, 'organization': None}}
+
+        if 'repository(' in query:
+            project = self.get_project(f"{variables['repo_owner']}/{variables['repo_name']}")
+            owner = project['path'].split('/')[0]
+            return 200, {}, {'data': {'repository': {
+                'id': f"R_{project['id']}",
+                'owner': {'id': f"U_{owner}", 'login': owner, '__typename': 'User'}}}}
+
+        return 200, {}, {'errors': [{'message': 'Query not supported by the fake forge.'}]}
+
+    #
+    # GitLab REST API.
+    #
+
+    def gitlab_project(self, context: dict, project: dict):
+        return {'id': project['id'], 'path_with_namespace': project['path'],
+                'name': project['path'].split('/')[-1], 'description': project['description'],
+                'web_url': f"{context['base']}/{project['path']}"}
+
+    def gitlab_label(self, label: dict):
+        return {'id': label['id'], 'name': label['name'], 'color': '#' + label['color']}
+
+    def gitlab_issue(self, context: dict, project: dict, issue: dict):
+        return {'id': issue['id'], 'iid': issue['number'], 'project_id': project['id'],
+                'title': issue['title'], 'description': issue['body'],
+                'state': 'opened' if issue['state'] == 'open' else 'closed',
+                'labels': issue['labels'],
+                'created_at': format_gitlab_time(issue['created_at']),
+                'updated_at': format_gitlab_time(issue['updated_at']),
+                'web_url': f"{context['base']}/{project['path']}/-/issues/{issue['number']}"}
+
+    def gitlab_event(self, project: dict, issue: dict, event: dict):
+        return {'id': event['id'], 'action': event['action'], 'resource_type': 'Issue',
+                'resource_id': issue['id'], 'user': {'username': event['user']},
+                'label': self.gitlab_label(project['labels'][event['label']]),
+                'created_at': format_gitlab_time(event['created_at'])}
+
+    def gitlab_get_project(self, context: dict, path: str):
+        project = self.get_project(path)
+        if project is None:
+            return 404, {}, {'message': '404 Project Not Found'}
+        return 200, {}, self.gitlab_project(context, project)
+
+    def gitlab_edit_project(self, context: dict, path: str):
+        project = self.get_project(path)
+        project['description'] = context['data'].get('description', project['description'])
+        return 200, {}, self.gitlab_project(context, project)
+
+    def gitlab_list_issues(self, context: dict, path: str):
+        project = self.get_project(path)
+        state = context['query'].get('state', 'all')
+        issues = [i for i in reversed(project['issues'])
+                  if state == 'all' or ('opened' if i['state'] == 'open' else 'closed') == state]
+        issues = self.filter_labels(context, issues)
+        if 'updated_after' in context['query']:
+            since = parse_time(context['query']['updated_after'])
+            issues = [i for i in issues if i['updated_at'] >= since]
+        page, headers = self.paginate(context, issues, 20)
+        return 200, headers, [self.gitlab_issue(context, project, i) for i in page]
+
+    def gitlab_create_issue(self, context: dict, path: str):
+        project = self.get_project(path)
+        data = context['data']
+        labels = data.get('labels', [])
+        if isinstance(labels, str):
+            labels = [label for label in labels.split(',') if label]
+        issue = self.add_issue(project, data['title'], data.get('description'), labels, 'ggi-bot')
+        return 201, {}, self.gitlab_issue(context, project, issue)
+
+    def gitlab_list_events(self, context: dict, path: str, number: str):
+        project = self.get_project(path)
+        if not 0 < int(number) <= len(project['issues']):
+            return 404, {}, {'message': '404 Not found'}
+        issue = project['issues'][int(number) - 1]
+        page, headers = self.paginate(context, issue['events'], 20)
+        return 200, headers, [self.gitlab_event(project, issue, e) for e in page]
+
+    def gitlab_list_labels(self, context: dict, path: str):
+        project = self.get_project(path)
+        page, headers = self.paginate(context, list(project['labels'].values()), 20)
+        return 200, headers, [self.gitlab_label(label) for label in page]
+
+    def gitlab_create_label(self, context: dict, path: str):
+        project = self.get_project(path)
+        data = context['data']
+        with self.lock:
+            if data['name'] in project['labels']:
+                return 409, {}, {'message': 'Label already exists'}
+            label = {'id': self.new_id(), 'name': data['name'], 'color': normalise_colour(data['color'])}
+            project['labels'][label['name']] = label
+        return 201, {}, self.gitlab_label(label)
+
+    def gitlab_edit_label(self, context: dict, path: str, name: str):
+        project = self.get_project(path)
+        name = urllib.parse.unquote(name)
+        labels = [label for label in project['labels'].values() if name in [label['name'], str(label['id'])]]
+        if not labels:
+            return 404, {}, {'message': '404 Label Not Found'}
+        labels[0]['color'] = normalise_colour(context['data'].get('color', labels[0]['color']))
+        return 200, {}, self.gitlab_label(labels[0])
+
+    def gitlab_list_boards(self, context: dict, path: str):
+        project = self.get_project(path)
+        page, headers = self.paginate(context, project['boards'], 20)
+        return 200, headers, page
+
+    def gitlab_create_board(self, context: dict, path: str):
+        project = self.get_project(path)
+        with self.lock:
+            board = {'id': self.new_id(), 'name': context['data']['name'], 'lists': []}
+            project['boards'].append(board)
+        return 201, {}, board
+
+    def gitlab_create_list(self, context: dict, path: str, board_id: str):
+        project = self.get_project(path)
+        boards = [b for b in project['boards'] if b['id'] == int(board_id)]
+        if not boards:
+            return 404, {}, {'message': '404 Board Not Found'}
+        labels = [label for label in project['labels'].values() if label['id'] == int(context['data']['label_id'])]
+        with self.lock:
+            board_list = {'id': self.new_id(), 'label': self.gitlab_label(labels[0]) if labels else None,
+                          'position': len(boards[0]['lists'])}
+            boards[0]['lists'].append(board_list)
+        return 201, {}, board_list
+
+    def gitlab_list_schedules(self, context: dict, path: str):
+        project = self.get_project(path)
+        page, headers = self.paginate(context, project['schedules'], 20)
+        return 200, headers, page
+
+    def gitlab_create_schedule(self, context: dict, path: str):
+        project = self.get_project(path)
+        with self.lock:
+            schedule = dict(context['data'], id=self.new_id(), active=True)
+            project['schedules'].append(schedule)
+        return 201, {}, schedule
+
+
+class FakeForgeHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front-end of the fake forge.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        status, headers, payload = self.server.forge.handle(self.command, self.path, self.headers, body)
+        content = json.dumps(payload).encode()
+        if self.command == 'GET' and status == 200:
+            headers['ETag'] = '"' + hashlib.sha256(content).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                with self.server.forge.lock:
+                    self.server.forge.stats['not modified'] += 1
+                status, content = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = handle_request
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_fake_forge(host: str = '127.0.0.1', port: int = 0, verbose: bool = False, **options):
+    """
+    Start a fake forge in a background thread.
+
+    Options are the ones of FakeForge. Returns the server: its URL is
+    `server.url`, its state `server.forge`, and `server.shutdown()` stops it.
+    """
+    server = ThreadingHTTPServer((host, port), FakeForgeHandler)
+    server.daemon_threads = True
+    server.forge = FakeForge(**options)
+    server.verbose = verbose
+    server.url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_forge_stats(forge: FakeForge):
+    """
+    Print the number of requests served, by endpoint.
+    """
+    print(f"\n# Served {forge.nb_requests} requests:")
+    for name, count in sorted(forge.stats.items()):
+        print(f" - {count:6d} {name}")
+
+
+def parse_args():
+    """
+    Parse arguments from command line.
+    """
+    parser = argparse.ArgumentParser(description="Serve a fake GitHub/GitLab API for the GGI scripts.")
+    parser.add_argument('-p', '--port', dest='port', type=int, default=8000,
+                        help='Port to listen on (default: 8000).')
+    parser.add_argument('-n', '--issues', dest='issues', type=int, default=25,
+                        help='Number of issues seeded in each project (default: 25).')
+    parser.add_argument('-e', '--events', dest='events', type=int, default=100,
+                        help='Number of label events seeded in each project (default: 100).')
+    parser.add_argument('-l', '--latency', dest='latency', type=float, default=0.0,
+                        help='Seconds added to every answer (default: 0).')
+    parser.add_argument('--page-limit', dest='page_limit', type=int, default=100,
+                        help='Largest page served (default: 100).')
+    parser.add_argument('--rate-limit', dest='rate_limit', type=int, default=0,
+                        help='Requests permitted per rate window, 0 for unlimited (default: 0).')
+    parser.add_argument('--rate-window', dest='rate_window', type=float, default=60.0,
+                        help='Duration of the rate window, in seconds (default: 60).')
+    parser.add_argument('--throttle-every', dest='throttle_every', type=int, default=0,
+                        help='Throttle every n-th request, 0 for never (default: 0).')
+    parser.add_argument('--retry-after', dest='retry_after', type=int, default=1,
+                        help='Retry-After sent with throttled answers, in seconds (default: 1).')
+    parser.add_argument('--seed', dest='seed', type=int, default=0,
+                        help='Seed of the generated issues and events (default: 0).')
+    parser.add_argument('-v', '--verbose', dest='opt_verbose', action='store_true',
+                        help='Log every request.')
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    args = parse_args()
+    server = start_fake_forge(port=args.port, verbose=args.opt_verbose,
+                              issues=args.issues, events=args.events, latency=args.latency,
+                              page_limit=args.page_limit, rate_limit=args.rate_limit,
+                              rate_window=args.rate_window, throttle_every=args.throttle_every,
+                              retry_after=args.retry_after, seed=args.seed)
+    print(f"# Fake forge listening on {server.url}")
+    print(f"- GitLab: GGI_GITLAB_URL={server.url} GGI_GITLAB_PROJECT=<group/project> GGI_GITLAB_TOKEN=<any>")
+    print(f"- GitHub: set \"github_host\": \"{server.url}\" in conf/ggi_deployment.json, GGI_GITHUB_TOKEN=<any>")
+    print("Press Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    print_forge_stats(server.forge)
+
+
+if __name__ == '__main__':
+    main()
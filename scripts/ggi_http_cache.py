@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Persistent cache for the GitHub/GitLab API responses.
+
+Once enabled, every GET request sent through `requests` (PyGithub,
+python-gitlab and direct calls) is stored on disk with its ETag and
+Last-Modified headers. The next time the same request is sent, it is
+made conditional (If-None-Match / If-Modified-Since), and a
+304 Not Modified answer is replayed locally from the cached payload.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+# Kept with the other caches of the board being built, in the current directory.
+http_cache_dir = 'web/cache/http'
+
+# Headers of the cached response that must not be replayed.
+uncached_headers = ['content-encoding', 'content-length', 'transfer-encoding']
+
+cache_stats = {'hits': 0, 'misses': 0, 'uncached': 0}
+cache_lock = threading.Lock()
+
+
+def get_cache_key(request):
+    """
+    Compute the cache key of a request: its URL, accepted media type and
+    (hashed) credentials, so that different tokens never share entries.
+    """
+    credentials = request.headers.get('Authorization', '') + request.headers.get('PRIVATE-TOKEN', '')
+    credentials = hashlib.sha256(credentials.encode()).hexdigest()
+    key = f"{request.url}\n{request.headers.get('Accept', '')}\n{credentials}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def count(stat: str):
+    """
+    Increment one of the cache counters, from any thread.
+    """
+    with cache_lock:
+        cache_stats[stat] += 1
+
+
+def read_entry(cache_dir: str, key: str):
+    """
+    Read a cached response, returns (None, None) if not in cache.
+    """
+    entry_file = os.path.join(cache_dir, key + '.json')
+    if not os.path.isfile(entry_file):
+        return None, None
+    try:
+        with open(entry_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        with open(os.path.join(cache_dir, key + '.body'), 'rb') as f:
+            content = f.read()
+    except (OSError, ValueError):
+        return None, None
+    return entry, content
+
+
+def write_entry(cache_dir: str, key: str, response):
+    """
+    Store a response in cache, body first so that an entry is never
+    visible without its payload.
+    """
+    entry = {'url': response.url,
+             'status': response.status_code,
+             'headers': dict(response.headers)}
+    for name, content in [(key + '.body', response.content),
+                          (key + '.json', json.dumps(entry).encode())]:
+        filename = os.path.join(cache_dir, name)
+        tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_filename, filename)
+
+
+def replay_entry(entry, content, request, response):
+    """
+    Build a full response from a cached entry and a 304 answer.
+
+    Headers of the 304 answer (rate limits, date, new ETag) take
+    precedence over the cached ones.
+    """
+    from requests.models import Response
+    from requests.structures import CaseInsensitiveDict
+
+    cached = Response()
+    cached.status_code = entry['status']
+    cached.reason = 'OK'
+    cached.headers = CaseInsensitiveDict(entry['headers'])
+    cached.headers.update(response.headers)
+    for name in uncached_headers:
+        cached.headers.pop(name, None)
+    cached._content = content
+    cached.encoding = response.encoding
+    cached.url = entry['url']
+    cached.request = request
+    cached.connection = response.connection
+    cached.elapsed = response.elapsed
+    return cached
+
+
+def enable_http_cache(cache_dir: str = http_cache_dir):
+    """
+    Route all GET requests through the on-disk cache.
+    """
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    cache_dir = os.path.abspath(cache_dir)
+    print(f"# Using HTTP cache in {cache_dir}.")
+    os.makedirs(cache_dir, exist_ok=True)
+    send = HTTPAdapter.send
+
+    def cached_send(adapter, request, **kwargs):
+        if request.method != 'GET' or kwargs.get('stream'):
+            count('uncached')
+            return send(adapter, request, **kwargs)
+
+        key = get_cache_key(request)
+        entry, content = read_entry(cache_dir, key)
+        if entry is not None:
+            cached_headers = CaseInsensitiveDict(entry['headers'])
+            etag = cached_headers.get('ETag')
+            last_modified = cached_headers.get('Last-Modified')
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if last_modified:
+                request.headers['If-Modified-Since'] = last_modified
+
+        response = send(adapter, request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            count('hits')
+            # The 304 answer has no body: give its connection back to the pool.
+            response.close()
+            return replay_entry(entry, content, request, response)
+        if response.status_code == 200 and \
+                ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            count('misses')
+            write_entry(cache_dir, key, response)
+        else:
+            count('uncached')
+        return response
+
+    HTTPAdapter.send = cached_send
+
+
+def print_http_cache_stats():
+    """
+    Print the number of requests served from cache.
+    """
+    print(f"\n# HTTP cache: {cache_stats['hits']} hits (304 Not Modified), "
+          f"{cache_stats['misses']} misses, {cache_stats['uncached']} uncached requests.")
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Profile the cold start of the GGI entry points.
+
+Each script is imported in a fresh interpreter with `-X importtime`,
+and its cumulative import time is compared with a budget. Heavy
+dependencies (pandas, python-gitlab, PyGithub, tldextract, requests)
+must not be loaded at import time: they are imported by the functions
+that use them, so that e.g. printing the resolved parameters does not
+pay for pandas.
+
+Exits with 1 if a script is over budget or loads a heavy dependency.
+
+usage: ggi_import_profile [-h] [-s SCRIPTS [SCRIPTS ...]] [-b BUDGET] [-r REPEAT] [-n TOP] [-o OUTPUT]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Entry points whose import is profiled. ggi_update_local_metadata runs
+# at import time and cannot be imported alone; ggi_benchmark needs pandas
+# anyway.
+entry_points = ['ggi_deploy_gitlab', 'ggi_deploy_github',
+                'ggi_update_website_gitlab', 'ggi_update_website_github',
+                'ggi_update_fleet', 'ggi_utils_gitlab', 'ggi_utils_github',
+                'ggi_update_public_suffixes', 'ggi_fake_forge']
+
+# Packages only loaded by the code paths that use them.
+heavy_modules = ['pandas', 'numpy', 'gitlab', 'github', 'tldextract', 'requests']
+
+# Default cold-start budget of a script, in milliseconds.
+default_budget_ms = 150
+
+
+def parse_args():
+    """
+    Parse arguments from command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Report the import time of the GGI entry points against a budget.")
+    parser.add_argument('-s', '--scripts',
+                        dest='scripts',
+                        nargs='+',
+                        default=entry_points,
+                        help='Scripts to profile (default: all entry points).')
+    parser.add_argument('-b', '--budget',
+                        dest='budget',
+                        type=float,
+                        default=default_budget_ms,
+                        help=f'Import time budget of each script, in ms (default: {default_budget_ms}).')
+    parser.add_argument('-r', '--repeat',
+                        dest='repeat',
+                        type=int,
+                        default=3,
+                        help='Number of imports of each script; the best one is kept (default: 3).')
+    parser.add_argument('-n', '--top',
+                        dest='top',
+                        type=int,
+                        default=5,
+                        help='Number of slowest direct imports shown for each script (default: 5).')
+    parser.add_argument('-o', '--output',
+                        dest='output',
+                        default=None,
+                        help='Also write the results to this JSON file.')
+    args = parser.parse_args()
+
+    return args
+
+
+def import_time(script: str):
+    """
+    Import a script in a fresh interpreter with -X importtime.
+
+    Returns the cumulative import time of the script and of each of its
+    direct imports, in ms, and the top-level packages it loaded.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {script}"],
+                            cwd=scripts_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Cannot import {script}:\n{result.stderr}")
+
+    # Lines are "import time: <self us> | <cumulative us> | <indented name>",
+    # each module being listed after the modules it imports.
+    lines = [line.split('|') for line in result.stderr.splitlines() if line.startswith('import time:')]
+    modules = [(int(cumulative), name) for _, cumulative, name in lines[1:]
+               if name.strip() and cumulative.strip().isdigit()]
+    root = [i for i, (_, name) in enumerate(modules) if name == ' ' + script][-1]
+    # Modules imported by the script, up to the previous top-level import (site, ...).
+    start = max([i for i, (_, name) in enumerate(modules[:root]) if not name.startswith('  ')] + [-1]) + 1
+    imported = modules[start:root]
+    direct = [(cumulative / 1000, name.strip()) for cumulative, name in imported
+              if name.startswith('   ') and not name.startswith('     ')]
+    packages = sorted({name.strip().split('.')[0] for _, name in imported})
+
+    return modules[root][0] / 1000, direct, packages
+
+
+def profile_script(script: str, repeat: int):
+    """
+    Profile the import of a script, keeping the fastest of `repeat` runs.
+    """
+    runs = [import_time(script) for _ in range(repeat)]
+    total, direct, packages = min(runs, key=lambda run: run[0])
+    return {'script': script,
+            'import_ms': round(total, 1),
+            'direct_imports_ms': {name: round(ms, 1) for ms, name in sorted(direct, reverse=True)},
+            'heavy_modules': [m for m in heavy_modules if m in packages]}
+
+
+def main():
+    """
+    Main sequence.
+    """
+    args = parse_args()
+
+    print(f"# Import time of {len(args.scripts)} scripts (budget {args.budget:.0f} ms, "
+          f"best of {args.repeat}).")
+    results, failed = [], []
+    for script in args.scripts:
+        result = profile_script(script, args.repeat)
+        problems = []
+        if result['import_ms'] > args.budget:
+            problems.append('over budget')
+        if result['heavy_modules']:
+            problems.append(f"loads {', '.join(result['heavy_modules'])}")
+        result['status'] = 'failed' if problems else 'success'
+        results.append(result)
+
+        print(f" - {script:<28} {result['import_ms']:8.1f} ms"
+              + (f"  ({'; '.join(problems)})" if problems else ''))
+        for name, ms in list(result['direct_imports_ms'].items())[:args.top]:
+            print(f"     {name:<26} {ms:8.1f} ms")
+        if problems:
+            failed.append(script)
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'budget_ms': args.budget, 'scripts': results}, f, indent=4)
+        print(f"\n# Results written to {args.output}.")
+
+    if failed:
+        print(f"\n{len(failed)} scripts failed: {', '.join(failed)}.")
+        sys.exit(1)
+    print("Done.")
+
+
+if __name__ == '__main__':
+    main()
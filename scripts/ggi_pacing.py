@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Rate-limit aware pacing of API write requests.
+
+Requests are sent as fast as the server permits: the pacer only slows
+down when the server says so, through the rate limit headers
+(X-RateLimit-* on GitHub, RateLimit-* on GitLab), a Retry-After header
+or a throttling answer (429, or 403 for GitHub secondary rate limits).
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class RequestPacer:
+    """
+    Paces requests according to the rate limit information sent by the server.
+    """
+
+    def __init__(self, max_retries: int = 5, max_interval: float = 60.0, low_remaining: int = 10,
+                 transient_errors: tuple = ()):
+        # Delay between two requests, raised on throttling and decayed on success.
+        self.interval = 0.0
+        # Time before which no request should be sent.
+        self.not_before = 0.0
+        self.last_request = 0.0
+        self.max_retries = max_retries
+        self.max_interval = max_interval
+        # Below this number of remaining requests, spread them until the reset time.
+        self.low_remaining = low_remaining
+        # Exceptions retried like throttling, e.g. timeouts and dropped connections.
+        self.transient_errors = transient_errors
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Sleep until the next request can be sent.
+        """
+        with self.lock:
+            now = time.time()
+            start = max(self.not_before, self.last_request + self.interval, now)
+            self.last_request = start
+        if start > now:
+            time.sleep(start - now)
+
+    def observe(self, status: int, headers):
+        """
+        Update the pacing from the status and headers of a response.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        retry_after = get_retry_after(headers)
+        remaining = headers.get('x-ratelimit-remaining', headers.get('ratelimit-remaining'))
+        reset = headers.get('x-ratelimit-reset', headers.get('ratelimit-reset'))
+        now = time.time()
+        with self.lock:
+            if retry_after is not None:
+                delay = retry_after
+            elif remaining == '0' and reset is not None:
+                delay = float(reset) - now
+            else:
+                delay = 0.0
+
+            if status == 429:
+                self.throttled += 1
+                # Throttled: back off exponentially, on top of any delay asked by the server.
+                self.interval = min(self.max_interval, max(1.0, 2 * self.interval))
+            elif remaining is not None and reset is not None and int(remaining) < self.low_remaining:
+                self.interval = min(self.max_interval, max(0.0, float(reset) - now) / (int(remaining) + 1))
+            else:
+                self.interval = self.interval / 2 if self.interval > 0.1 else 0.0
+
+            self.not_before = max(self.not_before, now + delay)
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        Hook for `requests` sessions, e.g. python-gitlab's `gl.session`.
+        """
+        self.observe(response.status_code, response.headers)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call func once the server permits it, and retry it when throttled.
+
+        Headers of the result are observed when the result exposes them
+        (PyGithub objects); python-gitlab responses are observed through
+        `response_hook`, and throttling answers are then not observed twice.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.wait()
+            throttled = self.throttled
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                status = getattr(e, 'status', None) or getattr(e, 'response_code', None)
+                headers = getattr(e, 'headers', None) or {}
+                transient = isinstance(e, self.transient_errors)
+                if attempt == self.max_retries or not (transient or is_throttling_error(status, headers, e)):
+                    raise
+                if transient:
+                    print(f"  Request failed ({type(e).__name__}), retrying.")
+                else:
+                    print(f"  Throttled by server (status {status}), retrying.")
+                if transient or self.throttled == throttled:
+                    self.observe(429, headers)
+                continue
+            self.observe(200, getattr(result, 'raw_headers', None))
+            return result
+
+
+def get_retry_after(headers: dict):
+    """
+    Number of seconds to wait from a Retry-After header (seconds or HTTP date).
+    """
+    if 'retry-after' not in headers:
+        return None
+    try:
+        return float(headers['retry-after'])
+    except ValueError:
+        return parsedate_to_datetime(headers['retry-after']).timestamp() - time.time()
+
+
+def is_throttling_error(status: int, headers: dict, error: Exception):
+    """
+    Tell whether a failed request was rejected because of rate limits.
+    """
+    if status == 429:
+        return True
+    if status == 403:
+        headers = {k.lower(): v for k, v in headers.items()}
+        return 'retry-after' in headers \
+            or headers.get('x-ratelimit-remaining') == '0' \
+            or 'rate limit' in str(error).lower()
+    return False
@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Timing and API-call telemetry for the GGI scripts.
+
+Scripts mark the start of their phases with `start_phase`, which gives
+the wall time spent in each phase. Once enabled, every HTTP request
+sent through `requests` (PyGithub, python-gitlab and direct calls) is
+also recorded: count, status and latency by endpoint, bytes sent and
+received (as announced by Content-Length), and the remaining rate-limit
+budget reported by the server.
+
+The report is written as JSON, and in the OpenMetrics text format for
+monitoring systems to scrape.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+
+telemetry_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/web/cache/telemetry'
+
+# Quantiles of the request latencies exported.
+latency_quantiles = [0.5, 0.9, 0.99]
+
+telemetry = {'start': time.perf_counter(), 'phases': {}, 'endpoints': {}, 'rate_limits': {}}
+telemetry_lock = threading.Lock()
+current_phase = {'name': None, 'start': None}
+
+
+def start_phase(name: str):
+    """
+    End the current phase, if any, and start a new one.
+    A phase started several times accumulates its time.
+    """
+    now = time.perf_counter()
+    with telemetry_lock:
+        if current_phase['name'] is not None:
+            phase = telemetry['phases'][current_phase['name']]
+            phase['seconds'] += now - current_phase['start']
+        if name is not None:
+            telemetry['phases'].setdefault(name, {'seconds': 0.0, 'requests': 0, 'request_seconds': 0.0})
+        current_phase['name'] = name
+        current_phase['start'] = now
+
+
+def end_phase():
+    """
+    End the current phase.
+    """
+    start_phase(None)
+
+
+def get_endpoint(method: str, url: str):
+    """
+    Compute the endpoint of a request: its method and path, with
+    identifiers (numbers, project and label names) replaced by
+    placeholders, so that calls to the same API are grouped.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    segments = parsed.path.split('/')
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index > 0 else ''
+        if segment.isdigit():
+            segments[index] = '{id}'
+        elif previous == 'projects' or '%2F' in segment.upper():
+            segments[index] = '{project}'
+        elif previous == 'labels':
+            segments[index] = '{label}'
+        elif previous == 'repos':
+            segments[index] = '{owner}'
+        elif index > 1 and segments[index - 2] == 'repos':
+            segments[index] = '{repo}'
+    return f"{method} {parsed.netloc}{'/'.join(segments)}"
+
+
+def record_request(request, response, elapsed: float):
+    """
+    Record a request and its response.
+    """
+    endpoint = get_endpoint(request.method, request.url)
+    sent = len(request.body or b'')
+    # The body is not read here: it may be streamed by the caller. Bodies
+    # without a Content-Length (chunked) are not counted.
+    received = int(response.headers.get('Content-Length', 0))
+    remaining = response.headers.get('X-RateLimit-Remaining', response.headers.get('RateLimit-Remaining'))
+
+    with telemetry_lock:
+        stats = telemetry['endpoints'].setdefault(endpoint, {'requests': 0, 'statuses': {}, 'latencies': [],
+                                                             'bytes_sent': 0, 'bytes_received': 0})
+        stats['requests'] += 1
+        stats['statuses'][str(response.status_code)] = stats['statuses'].get(str(response.status_code), 0) + 1
+        stats['latencies'].append(elapsed)
+        stats['bytes_sent'] += sent
+        stats['bytes_received'] += received
+        if current_phase['name'] is not None:
+            phase = telemetry['phases'][current_phase['name']]
+            phase['requests'] += 1
+            phase['request_seconds'] += elapsed
+        if remaining is not None:
+            host = urllib.parse.urlsplit(request.url).netloc
+            resource = response.headers.get('X-RateLimit-Resource', 'core')
+            limit = response.headers.get('X-RateLimit-Limit', response.headers.get('RateLimit-Limit'))
+            budget = telemetry['rate_limits'].setdefault(f"{host} {resource}", {'host': host, 'resource': resource})
+            budget['limit'] = int(limit) if limit is not None else None
+            budget['remaining'] = int(remaining)
+            budget['min_remaining'] = min(int(remaining), budget.get('min_remaining', int(remaining)))
+
+
+def enable_telemetry():
+    """
+    Record all HTTP requests sent through `requests`.
+
+    Enable it before the HTTP cache, so that conditional requests are
+    recorded as sent on the network.
+    """
+    from requests.adapters import HTTPAdapter
+
+    send = HTTPAdapter.send
+
+    def recorded_send(adapter, request, **kwargs):
+        start = time.perf_counter()
+        response = send(adapter, request, **kwargs)
+        record_request(request, response, time.perf_counter() - start)
+        return response
+
+    HTTPAdapter.send = recorded_send
+
+
+def get_quantile(values: list, quantile: float):
+    """
+    Nearest-rank quantile of sorted values.
+    """
+    return values[min(len(values) - 1, int(quantile * len(values)))]
+
+
+def build_report(script: str):
+    """
+    Build the telemetry report of a script, as a dict.
+    """
+    end_phase()
+    with telemetry_lock:
+        endpoints = {}
+        for endpoint, stats in sorted(telemetry['endpoints'].items()):
+            latencies = sorted(stats['latencies'])
+            endpoints[endpoint] = {
+                'requests': stats['requests'],
+                'statuses': stats['statuses'],
+                'bytes_sent': stats['bytes_sent'],
+                'bytes_received': stats['bytes_received'],
+                'latency_seconds': dict({f"p{int(q * 100)}": round(get_quantile(latencies, q), 6)
+                                         for q in latency_quantiles},
+                                        mean=round(sum(latencies) / len(latencies), 6),
+                                        max=round(latencies[-1], 6),
+                                        sum=round(sum(latencies), 6))}
+        return {'script': script,
+                'date': datetime.now(timezone.utc).isoformat(),
+                'total_seconds': round(time.perf_counter() - telemetry['start'], 6),
+                'phases': {name: {k: round(v, 6) if isinstance(v, float) else v for k, v in phase.items()}
+                           for name, phase in telemetry['phases'].items()},
+                'endpoints': endpoints,
+                'rate_limits': list(telemetry['rate_limits'].values())}
+
+
+def escape_label(value: str):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_openmetrics(report: dict):
+    """
+    Format a telemetry report in the OpenMetrics text format.
+    """
+    script = escape_label(report['script'])
+    lines = ['# TYPE ggi_run_duration_seconds gauge',
+             '# UNIT ggi_run_duration_seconds seconds',
+             '# HELP ggi_run_duration_seconds Wall time of the run.',
+             f'ggi_run_duration_seconds{{script="{script}"}} {report["total_seconds"]}',
+             '# TYPE ggi_phase_duration_seconds gauge',
+             '# UNIT ggi_phase_duration_seconds seconds',
+             '# HELP ggi_phase_duration_seconds Wall time of each phase of the run.']
+    for name, phase in report['phases'].items():
+        lines.append(f'ggi_phase_duration_seconds{{script="{script}",phase="{escape_label(name)}"}} '
+                     f'{phase["seconds"]}')
+    lines += ['# TYPE ggi_phase_http_requests gauge',
+              '# HELP ggi_phase_http_requests Number of HTTP requests sent during each phase.']
+    for name, phase in report['phases'].items():
+        lines.append(f'ggi_phase_http_requests{{script="{script}",phase="{escape_label(name)}"}} '
+                     f'{phase["requests"]}')
+
+    lines += ['# TYPE ggi_http_requests counter',
+              '# HELP ggi_http_requests HTTP requests sent, by endpoint and status.']
+    for endpoint, stats in report['endpoints'].items():
+        for status, count in sorted(stats['statuses'].items()):
+            lines.append(f'ggi_http_requests_total{{script="{script}",endpoint="{escape_label(endpoint)}",'
+                         f'status="{status}"}} {count}')
+    lines += ['# TYPE ggi_http_request_duration_seconds summary',
+              '# UNIT ggi_http_request_duration_seconds seconds',
+              '# HELP ggi_http_request_duration_seconds Latency of the HTTP requests, by endpoint.']
+    for endpoint, stats in report['endpoints'].items():
+        labels = f'script="{script}",endpoint="{escape_label(endpoint)}"'
+        for q in latency_quantiles:
+            lines.append(f'ggi_http_request_duration_seconds{{{labels},quantile="{q}"}} '
+                         f'{stats["latency_seconds"][f"p{int(q * 100)}"]}')
+        lines.append(f'ggi_http_request_duration_seconds_sum{{{labels}}} {stats["latency_seconds"]["sum"]}')
+        lines.append(f'ggi_http_request_duration_seconds_count{{{labels}}} {stats["requests"]}')
+    for direction in ['sent', 'received']:
+        lines += [f'# TYPE ggi_http_{direction}_bytes counter',
+                  f'# UNIT ggi_http_{direction}_bytes bytes',
+                  f'# HELP ggi_http_{direction}_bytes Bytes {direction} in HTTP bodies, by endpoint.']
+        for endpoint, stats in report['endpoints'].items():
+            lines.append(f'ggi_http_{direction}_bytes_total{{script="{script}",endpoint="{escape_label(endpoint)}"}} '
+                         f'{stats[f"bytes_{direction}"]}')
+
+    # Each family is written whole: its metadata, then all its samples.
+    for name, key, description in [('ggi_rate_limit_remaining', 'remaining',
+                                    'Rate-limit budget left at the end of the run.'),
+                                   ('ggi_rate_limit_min_remaining', 'min_remaining',
+                                    'Lowest rate-limit budget seen during the run.')]:
+        lines += [f'# TYPE {name} gauge',
+                  f'# HELP {name} {description}']
+        for budget in report['rate_limits']:
+            labels = (f'script="{script}",host="{escape_label(budget["host"])}",'
+                      f'resource="{escape_label(budget["resource"])}"')
+            lines.append(f'{name}{{{labels}}} {budget[key]}')
+
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+def write_telemetry_report(script: str, report_dir: str = telemetry_dir):
+    """
+    Write the telemetry report of a script to <report_dir>/<script>.json
+    and <report_dir>/<script>.prom (OpenMetrics).
+    """
+    report = build_report(script)
+    os.makedirs(report_dir, exist_ok=True)
+    report_file = os.path.join(report_dir, f"{script}.json")
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    with open(os.path.join(report_dir, f"{script}.prom"), 'w', encoding='utf-8') as f:
+        f.write(format_openmetrics(report))
+
+    print(f"\n# Telemetry: {report['total_seconds']:.1f} s, "
+          f"{sum(e['requests'] for e in report['endpoints'].values())} HTTP requests, "
+          f"report written to {report_file}.")
+    for name, phase in report['phases'].items():
+        print(f" - {name:<24} {phase['seconds']:8.2f} s, {phase['requests']:5d} requests")
@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Update the static websites of many GGI boards, several at a time.
+
+Boards are listed in a JSON manifest:
+
+    {
+        "boards": [
+            {
+                "name": "ospo-a",
+                "backend": "gitlab",
+                "url": "https://gitlab.com",
+                "project": "ospo-a/my-ggi-board",
+                "token_env": "OSPO_A_GITLAB_TOKEN",
+                "output_dir": "boards/ospo-a"
+            },
+            {
+                "backend": "github",
+                "url": "https://github.com",
+                "project": "ospo-b/my-ggi-board",
+                "token_env": "OSPO_B_GITHUB_TOKEN",
+                "output_dir": "boards/ospo-b"
+            }
+        ]
+    }
+
+Each board is updated in its own process, in its own output directory
+(relative paths are relative to the manifest): the website template is
+copied to `<output_dir>/web`, the board configuration is written to
+`<output_dir>/conf/ggi_deployment.json` and the log of the update goes
+to `<output_dir>/ggi_update.log`. Caches and sync state are kept in
+`<output_dir>/web/cache` between runs.
+
+usage: ggi_update_fleet [-h] -m MANIFEST [-j JOBS] [-g] [-i] [-c] [--stream] [-t] [-w WORKERS] [-s SUMMARY]
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ggi_deploy import conf_file
+from ggi_update_website import api_workers
+
+web_template_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/web'
+
+# Generated or run-specific directories of the template, not copied to boards.
+web_template_ignored = ['cache', 'public', 'resources']
+
+# Environment variables that would override the configuration of a board.
+board_ignored_env = ['CI_SERVER_URL', 'CI_PROJECT_PATH', 'CI_PAGES_URL',
+                     'GGI_GITLAB_URL', 'GGI_GITLAB_PROJECT',
+                     'GITHUB_REPOSITORY', 'github_project']
+
+
+def parse_args():
+    """
+    Parse arguments from command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Update the websites of all boards listed in a manifest.")
+    parser.add_argument('-m', '--manifest',
+                        dest='manifest',
+                        required=True,
+                        help='JSON manifest listing the boards to update.')
+    parser.add_argument('-j', '--jobs',
+                        dest='jobs',
+                        type=int,
+                        default=os.cpu_count(),
+                        help='Number of boards updated at the same time (default: number of CPUs).')
+    parser.add_argument('-g', '--graphql',
+                        dest='opt_graphql',
+                        action='store_true',
+                        help='Fetch issues and label events in batches with the GraphQL API (GitHub only).')
+    parser.add_argument('-i', '--incremental',
+                        dest='opt_incremental',
+                        action='store_true',
+                        help='Only fetch issues updated since the last successful run of each board.')
+    parser.add_argument('-c', '--http-cache',
+                        dest='opt_http_cache',
+                        action='store_true',
+                        help='Cache API responses on disk, per board, and revalidate them with conditional requests.')
+    parser.add_argument('--stream',
+                        dest='opt_stream',
+                        action='store_true',
+                        help='Write the outputs of each issue as soon as it is fetched. Memory grows with '
+                             'the number of issues only, not with their label events.')
+    parser.add_argument('-t', '--telemetry',
+                        dest='opt_telemetry',
+                        action='store_true',
+                        help='Record phase timings and API calls, and write a report per board.')
+    parser.add_argument('-w', '--workers',
+                        dest='workers',
+                        type=int,
+                        default=api_workers,
+                        help=f'Maximum number of API requests in flight per board (default: {api_workers}).')
+    parser.add_argument('-s', '--summary',
+                        dest='summary',
+                        default=None,
+                        help='Also write the summary of the run to this JSON file.')
+    args = parser.parse_args()
+
+    if args.opt_stream and args.opt_incremental:
+        parser.error('--stream cannot be combined with --incremental, which keeps all records.')
+
+    return args
+
+
+def read_manifest(manifest_file: str):
+    """
+    Read the list of boards from the manifest, with defaults filled in.
+    """
+    print(f"# Reading boards from {manifest_file}.")
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    boards = []
+    for board in manifest['boards']:
+        if board['backend'] not in ['gitlab', 'github']:
+            print(f"Unknown backend {board['backend']} for {board['project']}. Exiting.")
+            exit(1)
+        board = dict(board)
+        board.setdefault('name', board['project'])
+        board.setdefault('token_env', 'GGI_GITLAB_TOKEN' if board['backend'] == 'gitlab' else 'GGI_GITHUB_TOKEN')
+        board['output_dir'] = os.path.join(base_dir, board.get('output_dir', board['name'].replace('/', '_')))
+        boards.append(board)
+
+    names = [board['name'] for board in boards]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f"Duplicate board names in manifest: {', '.join(duplicates)}. Exiting.")
+        exit(1)
+    print(f"- Found {len(boards)} boards.")
+
+    return boards
+
+
+def prepare_board(board: dict):
+    """
+    Create the output tree of a board: a fresh copy of the website
+    template and the board configuration file.
+    """
+    output_dir = board['output_dir']
+    shutil.copytree(web_template_dir, os.path.join(output_dir, 'web'), dirs_exist_ok=True,
+                    ignore=lambda d, names: web_template_ignored if d == web_template_dir else [])
+
+    with open(conf_file, 'r', encoding='utf-8') as f:
+        conf = json.load(f)
+    if board['backend'] == 'gitlab':
+        conf['gitlab_url'] = board['url']
+        conf['gitlab_project'] = board['project']
+    else:
+        conf['github_project'] = board['project']
+        if board.get('url', 'https://github.com').rstrip('/') != 'https://github.com':
+            conf['github_host'] = board['url'].rstrip('/')
+    board_conf_file = os.path.join(output_dir, 'conf', 'ggi_deployment.json')
+    os.makedirs(os.path.dirname(board_conf_file), exist_ok=True)
+    with open(board_conf_file, 'w', encoding='utf-8') as f:
+        json.dump(conf, f, indent=4)
+
+    return board_conf_file
+
+
+def update_board(board: dict, args):
+    """
+    Update the website of a board. Runs in its own process.
+
+    Returns the summary of the update.
+    """
+    start = time.perf_counter()
+    summary = {'name': board['name'],
+               'backend': board['backend'],
+               'project': board['project'],
+               'output_dir': board['output_dir'],
+               'log': os.path.join(board['output_dir'], 'ggi_update.log')}
+    try:
+        board_conf_file = prepare_board(board)
+        os.chdir(board['output_dir'])
+
+        # The process only serves this board: its environment can be adjusted.
+        for name in board_ignored_env:
+            os.environ.pop(name, None)
+        token_var = 'GGI_GITLAB_TOKEN' if board['backend'] == 'gitlab' else 'GGI_GITHUB_TOKEN'
+        if board['token_env'] not in os.environ:
+            raise ValueError(f"Cannot find env var '{board['token_env']}' for the token.")
+        os.environ[token_var] = os.environ[board['token_env']]
+
+        with open(summary['log'], 'w', encoding='utf-8') as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            updater = importlib.import_module(f"ggi_update_website_{board['backend']}")
+            if args.opt_telemetry:
+                updater.enable_telemetry()
+            if args.opt_http_cache:
+                updater.enable_http_cache()
+            updater.start_phase('configuration')
+            try:
+                params = updater.retrieve_params(board_conf_file)
+            except SystemExit:
+                raise ValueError(f"Invalid configuration, see {summary['log']}.")
+            updater.update_website(params, args)
+            if args.opt_http_cache:
+                updater.print_http_cache_stats()
+            if args.opt_telemetry:
+                updater.write_telemetry_report(f"ggi_update_website_{board['backend']}",
+                                               os.path.abspath('web/cache/telemetry'))
+            summary['outputs'] = dict(updater.output_stats)
+        summary['status'] = 'success'
+    except Exception as e:
+        summary['status'] = 'failed'
+        summary['error'] = f"{type(e).__name__}: {e}"
+        if os.path.isdir(board['output_dir']):
+            with open(summary['log'], 'a', encoding='utf-8') as log:
+                traceback.print_exc(file=log)
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+
+    return summary
+
+
+def update_fleet(boards: list, args):
+    """
+    Update all boards, up to `args.jobs` at a time.
+
+    Each board gets a fresh process, so that module state (caches,
+    counters, working directory) never leaks from one board to another
+    (max_tasks_per_child needs Python 3.11, as the rest of the scripts).
+    Returns the summaries of all boards, in manifest order.
+    """
+    print(f"\n# Updating {len(boards)} boards ({args.jobs} jobs).")
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=args.jobs, max_tasks_per_child=1) as executor:
+        futures = {executor.submit(update_board, board, args): board for board in boards}
+        for future in as_completed(futures):
+            board = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                # The worker process itself died.
+                summary = {'name': board['name'], 'backend': board['backend'],
+                           'project': board['project'], 'output_dir': board['output_dir'],
+                           'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+            print(f" - {summary['name']}: {summary['status']}"
+                  + (f" in {summary['seconds']:.1f} s" if 'seconds' in summary else '')
+                  + (f" ({summary['error']})" if 'error' in summary else ''))
+            summaries[board['name']] = summary
+
+    return [summaries[board['name']] for board in boards]
+
+
+def main():
+    """
+    Main sequence.
+    """
+    args = parse_args()
+    boards = read_manifest(args.manifest)
+
+    start = time.perf_counter()
+    summaries = update_fleet(boards, args)
+    failed = [s['name'] for s in summaries if s['status'] != 'success']
+    report = {'boards': summaries,
+              'total': len(summaries),
+              'failed': len(failed),
+              'seconds': round(time.perf_counter() - start, 3)}
+
+    print("\n# Summary:")
+    print(json.dumps(report, indent=4))
+    if args.summary is not None:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+
+    if failed:
+        print(f"\n{len(failed)} boards failed: {', '.join(failed)}.")
+        sys.exit(1)
+    print("Done.")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,37 +10,48 @@
 ######################################################################
 
 # This script:
-# - downloads the Activities Metadata JSON file from the GGI repository
+# - downloads the Activities Metadata JSON file from the GGI repository,
+#   or reuses the copy cached in web/cache/handbook for pinned tags and
+#   unchanged branches
 # - saves additional file source information
 # - dumps the resulting JSON file in the local filesystem, 
 #   so it can be manually committed to the my-gg-board repository.
 
-# usage: ggi_deploy [-h] [-r]
+# usage: ggi_deploy [-h] [-r REFERENCE] [-f]
 #
 # optional arguments:
 #   -h, --help        Show this help message and exit
 #   -r, --refefence   Target branch or tag
+#   -f, --force       Ignore the local cache and download the contents again
 #
 
 import argparse
-import copy
 import datetime
+import hashlib
 import json
 import os
-import requests 
+import re
+import requests
 import tarfile
-import tempfile
 
 local_conf_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))+'/conf'
 local_activities_file_path = local_conf_dir + '/ggi_activities_full.json'
 
+# Extracted handbook contents, by hash, and the refs index.
+local_cache_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))+'/web/cache/handbook'
+local_cache_index = local_cache_dir + '/refs.json'
+
 remote_git_url='https://gitlab.ow2.org'
 remote_git_project='ggi/ggi'
 remote_git_reference='main'
 
-tmp_gz_dir = tempfile.TemporaryDirectory()
-tmp_gz_filename=tmp_gz_dir.name+'/ggi_content.tar.bz2'
-tmp_gz_filename='/tmp/ggi_content.tar.bz2'
+# Refs that never move once published: version tags and commit hashes.
+pinned_ref_pattern = re.compile(r'^(v?\d+(\.\d+)+.*|[0-9a-f]{40})$')
+
+# Size of the reads from the network into the bz2 decompressor.
+download_chunk_size = 1024 * 1024
+# Timeouts of the download, in seconds: to connect, and between two reads.
+download_timeout = (10, 60)
 
 #
 # Parse arguments from command line.
@@ -52,8 +63,86 @@ parser.add_argument('-r', '--reference',
     action='store',
     default=remote_git_reference,
     help='Specify target branch or tag')
+parser.add_argument('-f', '--force',
+    dest='opt_force',
+    action='store_true',
+    help='Ignore the local cache and download the contents again')
 args = parser.parse_args()
 
+
+def read_cache_index():
+    """
+    Read the index of cached refs: {ref: {etag, last_modified, sha256}}.
+    """
+    if not os.path.isfile(local_cache_index):
+        return {}
+    with open(local_cache_index, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_cached_contents(entry: dict):
+    """
+    Read cached handbook contents, or None if the entry is missing or
+    its file is gone.
+    """
+    if entry is None:
+        return None
+    cached_file = f"{local_cache_dir}/{entry['sha256']}.json"
+    if not os.path.isfile(cached_file):
+        return None
+    with open(cached_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_cached_contents(index: dict, ref: str, contents: dict, headers):
+    """
+    Store handbook contents under their hash, and point the ref to them.
+    """
+    payload = json.dumps(contents, sort_keys=True).encode('utf-8')
+    sha256 = hashlib.sha256(payload).hexdigest()
+    os.makedirs(local_cache_dir, exist_ok=True)
+    with open(f"{local_cache_dir}/{sha256}.json", 'wb') as f:
+        f.write(payload)
+    index[ref] = {'etag': headers.get('ETag'),
+                  'last_modified': headers.get('Last-Modified'),
+                  'sha256': sha256}
+    with open(local_cache_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+
+
+def download_contents(url: str, entry: dict):
+    """
+    Download the handbook archive and extract the files of its content
+    folder, as {path: text}, streaming the archive from the network
+    through the decompressor.
+
+    The request is conditional when a cached entry exists: returns
+    (None, headers) if the server says the archive did not change.
+    """
+    headers = {}
+    if entry is not None and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry is not None and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    with requests.get(url, headers=headers, stream=True, timeout=download_timeout) as resp:
+        if resp.status_code == 304:
+            return None, resp.headers
+        if resp.status_code != 200:
+            print(f"Status code: {resp.status_code}. Exiting.")
+            exit(1)
+
+        resp.raw.decode_content = True
+        files = {}
+        with tarfile.open(fileobj=resp.raw, mode='r|bz2', bufsize=download_chunk_size) as tf:
+            for member in tf:
+                # Members are <archive folder>/handbook/content/<path>.
+                path = member.name.split('/', 1)[-1]
+                if member.isfile() and path.startswith('handbook/content/'):
+                    files[path[len('handbook/content/'):]] = tf.extractfile(member).read().decode()
+        return files, resp.headers
+
+
 # Build download URL
 # https://gitlab.ow2.org/ggi/ggi/-/archive/main/ggi-main.tar.bz2?path=handbook/content
 remote_git_contents_url = \
@@ -62,37 +151,35 @@ remote_git_contents_url = \
     args.target_git_ref + '/ggi-' + \
     args.target_git_ref + '.tar.bz2?path=handbook/content'
 
-print(f"\n# Download Activities from remote repository")
-print(f"# URL: {remote_git_contents_url}")
-resp = requests.get(remote_git_contents_url)
-if (resp.status_code != 200):
-    print("Status code: " + resp.status_code)
+cache_index = read_cache_index()
+cache_entry = None if args.opt_force else cache_index.get(args.target_git_ref)
+contents = read_cached_contents(cache_entry)
+if contents is None:
+    cache_entry = None
 
-# And store content as a gz file in a temporary folder
-with open(tmp_gz_filename, 'wb') as fd:
-    for chunk in resp.iter_content(chunk_size=128):
-        fd.write(chunk)
+if contents is not None and pinned_ref_pattern.match(args.target_git_ref):
+    print(f"\n# Using cached Activities for pinned reference {args.target_git_ref}")
+else:
+    print(f"\n# Download Activities from remote repository")
+    print(f"# URL: {remote_git_contents_url}")
+    files, resp_headers = download_contents(remote_git_contents_url, cache_entry)
+    if files is None:
+        print(f"# Activities not modified since last download, using cache")
+    else:
+        # Load Metadata file
+        activities_content = json.loads(files['ggi_activities_metadata.json'])
+        contents = {'metadata': activities_content,
+                    'files': {activity['path']: files[activity['path']]
+                              for activity in activities_content['activities']}}
+        write_cached_contents(cache_index, args.target_git_ref, contents, resp_headers)
 
 activities = []
 print("\n# Build activities")
-tf = tarfile.open(tmp_gz_filename, 'r:bz2')
-tf_main_folder=tf.next()
-tmp_gz_dir.cleanup() # Delete temporary folder and file
-
-# Load Metadata file
-activities_content = json.load(tf.extractfile(
-          tf_main_folder.name
-          + '/handbook/content/' 
-          + 'ggi_activities_metadata.json'))
+activities_content = contents['metadata']
 # Add actual Activities description
 for activity in activities_content['activities']:
     print(f"  - Building activity [{activity['id']}]..")
-    content = tf.extractfile(
-          tf_main_folder.name
-          + '/handbook/content/' 
-          + activity['path']
-      ).readlines()
-    activity['content'] = "".join( [ i.decode() for i in content ] )
+    activity['content'] = contents['files'][activity['path']]
     activities.append(activity)
 
 # Add activities reference metadata
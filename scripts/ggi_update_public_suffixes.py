@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Download the public suffix list to the `conf` directory, so it can be
+committed with the board.
+
+The list is used to compute the GitLab Pages URL when CI_PAGES_URL is
+not set. Runs never download it themselves: without this file, the
+snapshot shipped with tldextract is used. Pages domains memoized with
+the previous list are forgotten by every board, as they are memoized
+with the hash of the list.
+
+usage: ggi_update_public_suffixes [-h] [-u URL]
+"""
+
+import argparse
+
+from ggi_utils_gitlab import public_suffix_file
+
+public_suffix_list_url = 'https://publicsuffix.org/list/public_suffix_list.dat'
+
+
+def parse_args():
+    """
+    Parse arguments from command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Download the public suffix list used to compute GitLab Pages URLs.")
+    parser.add_argument('-u', '--url',
+                        dest='url',
+                        default=public_suffix_list_url,
+                        help=f'URL of the public suffix list (default: {public_suffix_list_url}).')
+    args = parser.parse_args()
+
+    return args
+
+
+def main():
+    """
+    Main sequence.
+    """
+    import requests
+
+    args = parse_args()
+
+    print("\n# Download public suffix list")
+    print(f"# URL: {args.url}")
+    resp = requests.get(args.url, timeout=60)
+    if resp.status_code != 200:
+        print(f"Status code: {resp.status_code}. Exiting.")
+        exit(1)
+    if '===BEGIN ICANN DOMAINS===' not in resp.text:
+        print("Downloaded file is not a public suffix list. Exiting.")
+        exit(1)
+
+    print(f"# Save file locally: {public_suffix_file}")
+    with open(public_suffix_file, 'w', encoding='utf-8') as f:
+        f.write(resp.text)
+
+    print("Done.")
+
+
+if __name__ == '__main__':
+    main()
@@ -18,29 +18,137 @@ This script:
 """
 
 import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
 import re
-from collections import OrderedDict
-from fileinput import FileInput
-from os import listdir
-from typing import List
+import shutil
+import stat
+import sys
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, NamedTuple
 
 # Define some variables.
 
 file_conf = 'conf/ggi_deployment.json'
 file_meta = 'conf/ggi_activities_metadata.json'
 file_json_out = 'ggi_activities_full.json'
+file_sync_state = 'web/cache/ggi_sync_state.json'
+file_workflow_cache = 'web/cache/ggi_workflow_cache.json'
+# Version of the structure of the parsed descriptions, bumped whenever
+# parse_workflow changes its results.
+workflow_cache_version = 2
+file_labels_hist = 'web/content/includes/labels_hist.csv'
+# Compressed copy of the label history written by previous versions, next
+# to the CSV file where it was not published; removed.
+file_labels_hist_gz = file_labels_hist + '.gz'
+# Compressed export of the label history, downloadable from the dashboard.
+file_labels_hist_export = 'web/static/data/labels_hist.csv.gz'
+# Dashboard data bundle, as Hugo site data and as a static file.
+file_dashboard = 'web/data/ggi_dashboard.json'
+file_dashboard_static = 'web/static/data/ggi_dashboard.json'
+# Version of the structure of the dashboard data bundle.
+dashboard_version = 2
+# Daily number of activities in each progress state, overall and per goal,
+# replayed from the label history, and the state of the replay.
+file_progress_series = 'web/content/includes/progress_daily.csv'
+file_progress_state = 'web/cache/ggi_progress_state.json'
+# Number of days of the progress series shown on the dashboard.
+progress_series_days = 365
+
+# Parsed issue descriptions, by hash of the description.
+workflow_cache = {}
+# Hashes of the descriptions seen during this run.
+workflow_cache_used = set()
+
+# Number of generated files written or left untouched during this run.
+output_stats = {'changed': 0, 'unchanged': 0}
+
+# Default maximum number of API requests in flight.
+api_workers = 8
+
+# Columns of the issues CSV file.
+issues_csv_columns = ['issue_id', 'activity_id', 'state', 'title', 'labels',
+                      'updated_at', 'url', 'tasks_total', 'tasks_done']
+# Number of new label events buffered before they are appended to the
+# history, in streaming mode.
+stream_events_chunk = 10000
 
 # Define regexps
 
 # Identify tasks in description:
 re_tasks = re.compile(r"^\s*- \[(?P<is_completed>.)\] (?P<task>.+)$")
 # Identify tasks in description:
-re_activity_id = re.compile(r"^Activity ID: \[(GGI-A-\d\d)\]\(.+\).$")
+re_activity_id = re.compile(r"^Activity ID: \[(GGI-A-\d+)\]\(.+\).$")
 # Identify sections for workflow parsing.
 re_section = re.compile(r"^### (?P<section>.*?)\s*$")
 re_subsection = re.compile(r"^#### (?P<subsection>.*?)\s*$")
 
 
+# Records retrieved from the forges, shared by both backends. Fields are
+# the columns of the generated CSV files.
+
+class Issue(NamedTuple):
+    """
+    An open activity issue, with its parsed description.
+    """
+    issue_id: int
+    activity_id: str
+    state: str
+    title: str
+    labels: str
+    updated_at: object
+    url: str
+    desc: str
+    workflow: dict
+    tasks_total: int
+    tasks_done: int
+
+
+class Task(NamedTuple):
+    """
+    A task of the scorecard of an activity (issue_id is the activity ID).
+    """
+    issue_id: str
+    state: str
+    task: str
+
+
+class LabelEvent(NamedTuple):
+    """
+    A label added to or removed from an issue.
+    """
+    time: object
+    issue_id: int
+    event_id: object
+    type: str
+    author: str
+    action: str
+    url: str
+
+
+def make_task(activity_id: str, is_completed: bool, task: str):
+    """
+    Build a task record.
+    """
+    return Task(activity_id, 'completed' if is_completed else 'open', task)
+
+
+def make_label_event(time, issue_id: int, event_id, author: str, action: str, url: str):
+    """
+    Build a label event record. Authors and actions repeat across
+    thousands of events: they are interned, so that each distinct value
+    is stored once.
+    """
+    return LabelEvent(time, issue_id, event_id, 'label', sys.intern(author), sys.intern(action), url)
+
+
 def parse_args():
     """
     Parse arguments from command line.
@@ -52,57 +160,340 @@ def parse_args():
                         dest='opt_verbose',
                         action='store_true',
                         help='More logging.')
+    parser.add_argument('-g', '--graphql',
+                        dest='opt_graphql',
+                        action='store_true',
+                        help='Fetch issues and label events in batches with the GraphQL API (GitHub only).')
+    parser.add_argument('-i', '--incremental',
+                        dest='opt_incremental',
+                        action='store_true',
+                        help='Only fetch issues updated since the last successful run.')
+    parser.add_argument('-c', '--http-cache',
+                        dest='opt_http_cache',
+                        action='store_true',
+                        help='Cache API responses on disk and revalidate them with conditional requests.')
+    parser.add_argument('-t', '--telemetry',
+                        dest='opt_telemetry',
+                        action='store_true',
+                        help='Record phase timings and API calls, and write a JSON and OpenMetrics report.')
+    parser.add_argument('-s', '--stream',
+                        dest='opt_stream',
+                        action='store_true',
+                        help='Write the outputs of each issue as soon as it is fetched. Memory grows with '
+                             'the number of issues only, not with their label events.')
+    parser.add_argument('-w', '--workers',
+                        dest='workers',
+                        type=int,
+                        default=api_workers,
+                        help=f'Maximum number of API requests in flight (default: {api_workers}).')
     args = parser.parse_args()
 
+    if args.opt_stream and args.opt_incremental:
+        parser.error('--stream cannot be combined with --incremental, which keeps all records.')
+
     return args
 
 
-def extract_workflow(activity_desc: str):
+def parse_workflow(activity_desc: str):
     """
-    Extract specific sections from an issue description.
+    Extract specific sections from an issue description, in a single pass.
+
+    Only the Description section is kept, and the Scorecard section is
+    split into subsections and tasks as it is read. Regexps only run on
+    lines that may match them.
     """
-    paragraphs = activity_desc.split('\n')
-    content_t = 'Introduction'
-    content = OrderedDict()
-    content = {content_t: []}
     a_id = ""
-    for p in paragraphs:
-        activity_id_match = re_activity_id.match(p)
-        if activity_id_match:
-            a_id = activity_id_match.group(1)
-            continue
-        match_section = re.search(re_section, p)
-        if match_section:
-            content_t = match_section.group('section')
-            content[content_t] = []
-        else:
-            content[content_t].append(p)
-    subsection = 'Default'
-    workflow = {subsection: []}
-    # Parse the scorecard section.
+    section = 'Introduction'
+    description = None
+    workflow = None
     tasks = []
-    if 'Scorecard' in content:
-        for p in content['Scorecard']:
-            match_subsection = re.search(re_subsection, p)
-            if match_subsection:
-                subsection = match_subsection.group('subsection')
+    subsection = 'Default'
+    for p in activity_desc.split('\n'):
+        if p.startswith('Activity ID: '):
+            activity_id_match = re_activity_id.match(p)
+            if activity_id_match:
+                a_id = activity_id_match.group(1)
+                continue
+        if p.startswith('### '):
+            section = re_section.match(p).group('section')
+            # A repeated section replaces the previous one.
+            if section == 'Description':
+                description = []
+            elif section == 'Scorecard':
+                subsection = 'Default'
+                workflow = {subsection: []}
+                tasks = []
+            continue
+        if section == 'Description':
+            description.append(p)
+        elif section == 'Scorecard':
+            if p.startswith('#### '):
+                subsection = re_subsection.match(p).group('subsection')
                 workflow[subsection] = []
             elif p != '':
                 workflow[subsection].append(p)
                 # Now identify tasks
-                match_tasks = re.search(re_tasks, p)
-                if match_tasks:
-                    is_completed = match_tasks.group('is_completed')
-                    is_completed = True if is_completed == 'x' else False
-                    task = match_tasks.group('task')
-                    tasks.append({'is_completed': is_completed, 'task': task})
+                if '- [' in p:
+                    match_tasks = re_tasks.match(p)
+                    if match_tasks:
+                        is_completed = match_tasks.group('is_completed') == 'x'
+                        tasks.append({'is_completed': is_completed, 'task': match_tasks.group('task')})
+    if description is None:
+        raise KeyError('Description')
+    if workflow is None:
+        workflow = {'Default': []}
     # Remove first element (useless html stuff)
     del workflow['Default']
     # Remove last two elements (useless html stuff too)
     if len(list(workflow)) > 2:
         del workflow[list(workflow)[-1]][-1]
         del workflow[list(workflow)[-1]][-1]
-    return a_id, content['Description'], workflow, tasks
+    return a_id, description, workflow, tasks
+
+
+def extract_workflow(activity_desc: str):
+    """
+    Extract specific sections from an issue description.
+
+    Results are memoized by a hash of the description, so that unchanged
+    descriptions are never parsed twice. Callers get their own copy.
+    """
+    key = hashlib.sha256(activity_desc.encode()).hexdigest()
+    workflow_cache_used.add(key)
+    if key not in workflow_cache:
+        workflow_cache[key] = parse_workflow(activity_desc)
+    a_id, description, workflow, tasks = workflow_cache[key]
+    return (a_id, list(description),
+            {subsection: list(lines) for subsection, lines in workflow.items()},
+            [dict(t) for t in tasks])
+
+
+def load_workflow_cache():
+    """
+    Load the parsed descriptions saved by the previous run. A cache saved
+    with another version of the parser is discarded.
+    """
+    if os.path.isfile(file_workflow_cache):
+        with open(file_workflow_cache, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') != workflow_cache_version:
+            print(f"- Ignoring parsed descriptions of another version in {file_workflow_cache}.")
+            return
+        workflow_cache.update(cache['descriptions'])
+        print(f"- Loaded {len(workflow_cache)} parsed descriptions from {file_workflow_cache}.")
+
+
+def save_workflow_cache():
+    """
+    Save the parsed descriptions for the next run.
+
+    Only the descriptions seen during this run are kept, so that the
+    cache does not grow with outdated descriptions.
+    """
+    os.makedirs(os.path.dirname(file_workflow_cache), exist_ok=True)
+    cache = {'version': workflow_cache_version,
+             'descriptions': {k: workflow_cache[k] for k in workflow_cache_used}}
+    with open(file_workflow_cache, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
+
+def map_concurrently(func, items, workers: int = api_workers):
+    """
+    Apply func to all items, with at most `workers` calls running at once.
+
+    Results are yielded in the order of the items, whatever the order the
+    calls complete in, so that generated files stay stable from run to run.
+    Items are consumed lazily, so they can come from a paginated listing.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            # Keep the pool busy, but never queue more than one batch ahead.
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_sync_state(project: str):
+    """
+    Read the state saved by the last successful incremental run.
+
+    Returns the time of the last sync and the records of that run, or
+    (None, None) when there is no usable state for this project.
+    """
+    if not os.path.isfile(file_sync_state):
+        print(f"- No sync state found in {file_sync_state}, fetching all issues.")
+        return None, None
+    with open(file_sync_state, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('project') != project:
+        print(f"- Sync state is for project {state.get('project')}, fetching all issues.")
+        return None, None
+    print(f"- Using sync state from {state['last_sync']}.")
+    records = [[key,
+                Issue(*issue) if issue is not None else None,
+                [Task(*t) for t in tasks],
+                [make_label_event(e[0], e[1], e[2], e[4], e[5], e[6]) for e in hist]]
+               for key, issue, tasks, hist in state['records']]
+    return datetime.fromisoformat(state['last_sync']), records
+
+
+def save_sync_state(project: str, last_sync: datetime, records: List):
+    """
+    Save the time of the current sync and its records for the next incremental run.
+    """
+    os.makedirs(os.path.dirname(file_sync_state), exist_ok=True)
+    state = {'project': project,
+             'last_sync': last_sync.isoformat(),
+             'records': records}
+    with open(file_sync_state, 'w', encoding='utf-8') as f:
+        # Dates are stored as their string representation, as written in outputs.
+        json.dump(state, f, default=str)
+
+
+def merge_records(previous: List, changed: List):
+    """
+    Merge the records of changed issues into the records of a previous run.
+
+    Records are [key, issue, tasks, events] lists, one per issue. Changed
+    issues replace their previous record, new issues come first (as issues
+    are listed most recent first) and issues without an issue row (closed
+    since the last run) are removed.
+    """
+    changed_by_key = {r[0]: r for r in changed}
+    known_keys = {r[0] for r in previous}
+    merged = [r for r in changed if r[0] not in known_keys]
+    for r in previous:
+        merged.append(changed_by_key.get(r[0], r))
+    return [r for r in merged if r[1] is not None]
+
+
+def flatten_records(records: List):
+    """
+    Split per-issue records into the issues, tasks and events lists.
+    """
+    issues, tasks, hist = [], [], []
+    for key, issue, i_tasks, i_hist in records:
+        if issue is None:
+            continue
+        issues.append(issue)
+        tasks.extend(i_tasks)
+        hist.extend(i_hist)
+    return issues, tasks, hist
+
+
+def build_dataframes(issues: List, tasks: List, hist: List):
+    """
+    Build the issues, tasks and label events dataframes from records.
+
+    Columns with few distinct values (states, labels, authors, actions,
+    urls) are categoricals, and dates are parsed to UTC datetimes, from
+    the strings or datetimes returned by the forges or read back from
+    the sync state.
+    """
+    import pandas as pd
+
+    issues = pd.DataFrame(issues, columns=Issue._fields)
+    tasks = pd.DataFrame(tasks, columns=Task._fields)
+    hist = pd.DataFrame(hist, columns=LabelEvent._fields)
+    issues['updated_at'] = pd.to_datetime(issues['updated_at'], utc=True, format='ISO8601')
+    hist['time'] = pd.to_datetime(hist['time'], utc=True, format='ISO8601')
+    for frame, columns in [(issues, ['state', 'labels']),
+                           (tasks, ['issue_id', 'state']),
+                           (hist, ['type', 'author', 'action', 'url'])]:
+        frame[columns] = frame[columns].astype('category')
+    return issues, tasks, hist
+
+
+def parse_datetime(value):
+    """
+    Convert a date returned by the forges (ISO 8601 string or datetime)
+    to a UTC datetime, written as pandas writes parsed dates.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.astimezone(timezone.utc)
+
+
+def stream_records(records):
+    """
+    Write the outputs of each issue as soon as its record arrives: rows
+    of the issues and tasks CSV files, new label events, and scorecard
+    page. Records can be a generator; none of them is kept.
+
+    Only a summary of each issue (no description nor workflow) is kept,
+    and returned as the issues dataframe needed by write_data_points.
+    New label events are added to the history in chunks, in the order
+    they are fetched (by date within each issue), and the history is
+    replaced once all records are written.
+
+    Stored events are not loaded: events older than the latest stored
+    event of their issue are skipped, and only the events at that time
+    are compared (see read_label_event_marks). Memory thus grows with
+    the number of issues, not with the number of events.
+    """
+    import pandas as pd
+
+    print("\n# Streaming issues to files.")
+    marks = read_label_event_marks(LabelEvent._fields)
+    history_exists = os.path.isfile(file_labels_hist)
+    new_events, nb_new_events, nb_events = [], 0, 0
+    summaries = []
+    pages = {}
+
+    remove_label_history_gz()
+    with StreamedOutput('web/content/includes/issues.csv') as issues_csv, \
+            StreamedOutput('web/content/includes/tasks.csv') as tasks_csv, \
+            AppendedOutput(file_labels_hist, ','.join(LabelEvent._fields) + os.linesep) as history:
+        issues_csv.write(format_csv_rows([issues_csv_columns]))
+        tasks_csv.write(format_csv_rows([Task._fields]))
+        for key, issue, tasks, hist in records:
+            if issue is None:
+                continue
+            issue = issue._replace(updated_at=parse_datetime(issue.updated_at))
+            issues_csv.write(format_csv_rows([[getattr(issue, c) for c in issues_csv_columns]]))
+            tasks_csv.write(format_csv_rows(tasks))
+            if has_activity_page(issue, pages):
+                write_activity_md(issue)
+
+            events = []
+            for e in sorted((e._replace(time=parse_datetime(e.time)) for e in hist), key=lambda e: e.time):
+                time = pd.Timestamp(e.time).value
+                latest, known_ids = marks.get(e.issue_id, (None, None))
+                if latest is None or time > latest:
+                    events.append(e)
+                elif time == latest and is_new_label_event(
+                        known_ids, f"{time}|{e.issue_id}|{e.author}|{e.action}", e.event_id):
+                    events.append(e)
+            marks.pop(issue.issue_id, None)
+            new_events += events
+            nb_new_events += len(events)
+            nb_events += len(hist)
+            if len(new_events) >= stream_events_chunk:
+                history.write(format_csv_rows(new_events))
+                new_events.clear()
+
+            summaries.append(issue._replace(desc='', workflow=None))
+        if new_events:
+            history.write(format_csv_rows(new_events))
+
+    print(f"- {nb_new_events} new label events, {nb_events - nb_new_events} already stored.")
+    output_stats['changed' if nb_new_events > 0 or not history_exists else 'unchanged'] += 1
+    if nb_new_events > 0 or not os.path.isfile(file_labels_hist_export):
+        write_label_history_export()
+
+    return build_dataframes(summaries, [], [])[0]
+
+
+def format_csv_rows(rows):
+    """
+    Format rows as CSV, as pandas' to_csv does.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator=os.linesep).writerows(rows)
+    return buffer.getvalue()
 
 
 def write_to_csv(issues, tasks, events):
@@ -113,141 +504,631 @@ def write_to_csv(issues, tasks, events):
     and provided to the user as downloads for further analysis.
     """
     print("\n# Writing issues and history to files.")
-    issues.to_csv('web/content/includes/issues.csv',
-                  columns=['issue_id', 'activity_id', 'state', 'title', 'labels',
-                           'updated_at', 'url', 'tasks_total', 'tasks_done'], index=False)
-    events.to_csv('web/content/includes/labels_hist.csv', index=False)
-    tasks.to_csv('web/content/includes/tasks.csv', index=False)
+    write_output('web/content/includes/issues.csv',
+                 issues.to_csv(columns=issues_csv_columns, index=False))
+    append_label_events(events)
+    write_output('web/content/includes/tasks.csv', tasks.to_csv(index=False))
+
+
+def append_label_events(events):
+    """
+    Append new label events to the label history, deduplicated by
+    is_new_label_event.
+
+    The history only grows: events already stored are skipped, and new
+    ones are appended, by date, to the CSV file. It is rewritten only
+    when it is missing or has other columns. Its compressed export is
+    written again when events were appended.
+    Returns the number of events appended.
+    """
+    known_ids = read_label_event_ids(events.columns)
+    keys = get_label_event_keys(events['time'], events['issue_id'], events['author'], events['action'])
+    is_new = [is_new_label_event(known_ids, key, event_id) for key, event_id in zip(keys, events['event_id'])]
+    new_events = events[is_new].sort_values('time', kind='stable')
+    print(f"- {len(new_events)} new label events, {len(events) - len(new_events)} already stored.")
+
+    if len(new_events) > 0 or not os.path.isfile(file_labels_hist):
+        append_label_rows(new_events.to_csv(index=False, header=False), ','.join(events.columns))
+    elif not os.path.isfile(file_labels_hist_export):
+        write_label_history_export()
+
+    output_stats['changed' if len(new_events) > 0 else 'unchanged'] += 1
+    return len(new_events)
+
+
+def get_label_event_keys(times, issue_ids, authors, actions):
+    """
+    Identify label events by time (UTC, in ns), issue, author and action.
+
+    Event IDs are not part of the key: the same event has a number in the
+    REST APIs and a node ID in the GitHub GraphQL API, see
+    is_new_label_event.
+    Returns the keys as a series of strings.
+    """
+    import pandas as pd
+
+    times = pd.to_datetime(pd.Series(times), utc=True, format='ISO8601').astype('int64')
+    return pd.Series(times.astype(str).to_numpy() + '|' + pd.Series(issue_ids).astype(str).to_numpy()
+                     + '|' + pd.Series(authors).astype(str).to_numpy()
+                     + '|' + pd.Series(actions).astype(str).to_numpy(), index=times.index)
+
+
+def is_new_label_event(known_ids: dict, key: str, event_id):
+    """
+    Tell if a label event is not stored yet, given the IDs of the known
+    events for each key (see get_label_event_keys), and record it.
+
+    Events with the same key are told apart by their ID, so that a label
+    added, removed and added again within a second is kept. An event
+    stored with an ID of the other API (a number for REST, a node ID for
+    GraphQL) is the same event fetched before switching API: it matches
+    once, and is then known by its new ID.
+    """
+    event_id = str(event_id)
+    stored = known_ids.setdefault(key, set())
+    if event_id in stored:
+        return False
+    numbered = event_id.isdigit()
+    other_api = next((i for i in stored if i.isdigit() != numbered), None)
+    stored.add(event_id)
+    if other_api is not None:
+        stored.discard(other_api)
+        return False
+    return True
+
+
+def has_label_history(columns):
+    """
+    Tell if the label history exists with these columns. It is removed
+    if it was written with other columns.
+    """
+    if not os.path.isfile(file_labels_hist):
+        return False
+    with open(file_labels_hist, 'r', encoding='utf-8') as f:
+        header = f.readline().rstrip('\r\n')
+    if header != ','.join(columns):
+        print(f"- Columns of {file_labels_hist} changed, rewriting it.")
+        os.unlink(file_labels_hist)
+        return False
+    return True
+
+
+def read_label_event_ids(columns):
+    """
+    Read the IDs of the events stored in the label history, for each key
+    (see get_label_event_keys), as is_new_label_event expects them.
+    """
+    import pandas as pd
+
+    if not has_label_history(columns):
+        return {}
+    stored = pd.read_csv(file_labels_hist, usecols=['time', 'issue_id', 'event_id', 'author', 'action'],
+                         dtype=str, keep_default_na=False)
+    known_ids = {}
+    keys = get_label_event_keys(stored['time'], stored['issue_id'], stored['author'], stored['action'])
+    for key, event_id in zip(keys, stored['event_id']):
+        known_ids.setdefault(key, set()).add(event_id)
+    return known_ids
+
+
+def read_label_event_marks(columns):
+    """
+    Read the high-water mark of each issue in the label history: the time
+    (UTC, in ns) of its latest stored event, and the IDs of the events at
+    that time for each key, as is_new_label_event expects them.
+
+    The history is read in chunks, so that it is never loaded whole.
+    Returns {issue_id: (time, {key: IDs})}.
+    """
+    import pandas as pd
+
+    marks = {}
+    if not has_label_history(columns):
+        return marks
+    for chunk in pd.read_csv(file_labels_hist, usecols=['time', 'issue_id', 'event_id', 'author', 'action'],
+                             dtype=str, keep_default_na=False, chunksize=stream_events_chunk):
+        times = pd.to_datetime(chunk['time'], utc=True, format='ISO8601').astype('int64')
+        latest = times == times.groupby(chunk['issue_id']).transform('max')
+        chunk = chunk[latest]
+        keys = get_label_event_keys(chunk['time'], chunk['issue_id'], chunk['author'], chunk['action'])
+        for issue_id, time, key, event_id in zip(chunk['issue_id'].astype(int), times[latest], keys,
+                                                 chunk['event_id']):
+            mark = marks.get(issue_id)
+            if mark is None or time > mark[0]:
+                mark = marks[issue_id] = (time, {})
+            elif time < mark[0]:
+                continue
+            mark[1].setdefault(key, set()).add(event_id)
+    return marks
+
+
+def append_label_rows(content: str, header: str):
+    """
+    Append CSV rows to the label history, created starting with the
+    header if it is missing, and write its compressed export.
+    """
+    remove_label_history_gz()
+    with AppendedOutput(file_labels_hist, header + os.linesep) as history:
+        history.write(content)
+    write_label_history_export()
+
+
+def write_label_history_export():
+    """
+    Write the compressed export of the label history, downloaded from the
+    dashboard, through a temporary file and a rename.
+
+    The history is compressed as it is read, and the export does not
+    depend on the time it is written, so that unchanged histories give
+    the same file.
+    """
+    os.makedirs(os.path.dirname(file_labels_hist_export), exist_ok=True)
+    fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(file_labels_hist_export),
+                                        prefix=f'.{os.path.basename(file_labels_hist_export)}.')
+    try:
+        with os.fdopen(fd, 'wb') as f, open(file_labels_hist, 'rb') as history, \
+                gzip.GzipFile(fileobj=f, mode='wb', compresslevel=9, mtime=0) as export:
+            shutil.copyfileobj(history, export)
+        os.chmod(tmp_filename, 0o644)
+        os.replace(tmp_filename, file_labels_hist_export)
+    except BaseException:
+        os.unlink(tmp_filename)
+        raise
+    output_stats['changed'] += 1
+
+
+def remove_label_history_gz():
+    """
+    Remove the compressed copy of the label history written next to the
+    CSV file by previous versions: it was not published, and is replaced
+    by file_labels_hist_export.
+    """
+    if os.path.isfile(file_labels_hist_gz):
+        print(f"- Removing outdated {file_labels_hist_gz}.")
+        os.unlink(file_labels_hist_gz)
+
+
+def update_progress_series(params: dict, goals: List):
+    """
+    Replay the label history into the daily number of activities in each
+    progress state, overall ('All') and for each goal, and return the
+    last days of the series for the dashboard.
+
+    Counts of complete (UTC) days are appended to the progress CSV file.
+    The replay state is kept in the cache: labels of each issue at the
+    end of the last stored day, position reached in the label history
+    and events of the current day. Each run thus only reads the events
+    appended since the previous one, and only appends new days. Events
+    dated on a stored day change the labels of their issue from the next
+    day on, but stored days are never rewritten. The whole history is
+    replayed when the state is missing, or when the history or the
+    tracked labels changed.
+    """
+    import numpy as np
+    import pandas as pd
+
+    print("\n# Updating progress series.")
+    progress_labels = params['progress_labels']
+    states = ['not_started', 'in_progress', 'done']
+    tracked = [progress_labels[state] for state in states] + goals
+    series_columns = ['date', 'goal', 'state', 'count']
+
+    if not os.path.isfile(file_labels_hist):
+        print("- No label history, skipping.")
+        return {'dates': [], 'states': {state: [] for state in states},
+                'goals': {state: [[] for _ in goals] for state in states}}
+
+    state = None
+    if os.path.isfile(file_progress_state) and os.path.isfile(file_progress_series):
+        with open(file_progress_state, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    with open(file_labels_hist, 'rb') as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        if (state is None or state['tracked'] != tracked or state['header'] != header.decode('utf-8')
+                or not len(header) <= state['offset'] <= size):
+            print("- Replaying the whole label history.")
+            state = {'tracked': tracked, 'header': header.decode('utf-8'), 'offset': len(header),
+                     'last_day': None, 'members': {}, 'pending': []}
+        f.seek(state['offset'])
+        data = f.read()
+    rebuild = state['last_day'] is None
+
+    # Events on tracked labels, read since the last run or kept from it.
+    events = pd.read_csv(io.BytesIO(header + data), usecols=['time', 'issue_id', 'action'], dtype=str)
+    events = pd.concat([pd.DataFrame(state['pending'], columns=['time', 'issue_id', 'action'], dtype=str),
+                        events], ignore_index=True)
+    action = events['action'].str.extract(r'^(?P<verb>\S+) (?P<label>.*)$')
+    events = events.assign(label=action['label'], present=action['verb'].isin(['add', 'labeled']))
+    events = events[events['label'].isin(tracked)]
+    events = events.assign(time=pd.to_datetime(events['time'], utc=True, format='ISO8601'))
+    events = events.assign(day=events['time'].dt.tz_localize(None).dt.normalize())
+    events = events.sort_values('time', kind='stable')
+    print(f"- {len(data.splitlines())} new label events, {len(events)} on progress and goal labels.")
+
+    # Labels of each issue at the end of the last stored day.
+    members = pd.Series(1.0, index=pd.MultiIndex.from_tuples(
+        [(issue, label) for issue, labels in state['members'].items() for label in labels],
+        names=['issue_id', 'label']), dtype=float)
+    last_day = pd.Timestamp(state['last_day']) if state['last_day'] is not None else None
+    if last_day is not None:
+        late = events[events['day'] <= last_day]
+        if len(late) > 0:
+            print(f"- {len(late)} events dated on stored days, applied from the next day.")
+            late = late.groupby(['issue_id', 'label'])['present'].last().astype(float)
+            members = late.combine_first(members)
+        events = events[events['day'] > last_day]
+
+    today = pd.Timestamp(datetime.now(timezone.utc).date())
+    first_day = last_day + pd.Timedelta(days=1) if last_day is not None else events['day'].min()
+    if pd.isna(first_day):
+        first_day = today
+    days = pd.date_range(first_day, max(today, events['day'].max() if len(events) > 0 else today), freq='D')
+
+    # Presence of each (issue, label) at the end of each day: the last
+    # event of the day, or the presence of the previous day.
+    table = events.groupby(['issue_id', 'label', 'day'])['present'].last().astype(float).unstack('day')
+    table = table.reindex(index=table.index.union(members.index), columns=days).astype(float)
+    table.insert(0, 'initial', members.reindex(table.index))
+    presence = table.ffill(axis=1).iloc[:, 1:].fillna(0).to_numpy(dtype=np.int32)
+
+    # Issues x labels x days, then counts per state, overall and per goal.
+    issue_codes, _ = pd.factorize(table.index.get_level_values('issue_id'))
+    label_codes = pd.Index(tracked).get_indexer(table.index.get_level_values('label'))
+    cube = np.zeros((len(tracked), issue_codes.max() + 1 if len(issue_codes) else 0, len(days)), dtype=np.int32)
+    cube[label_codes, issue_codes] = presence
+    in_state, in_goal = cube[:len(states)], cube[len(states):]
+    counts = np.concatenate([in_state.sum(axis=1)[:, None, :],
+                             np.einsum('gid,sid->sgd', in_goal, in_state)], axis=1)
+    # Rows by date, goal and state.
+    index = pd.MultiIndex.from_product([days.strftime('%Y-%m-%d'), ['All'] + goals, states])
+    rows = pd.DataFrame({'count': counts.transpose(2, 1, 0).ravel()}, index=index)
+    rows = rows.rename_axis(series_columns[:3]).reset_index()
+
+    # Complete days are stored, the current day stays pending.
+    complete = days < today
+    stored_rows = rows[rows['date'] < today.strftime('%Y-%m-%d')]
+    if rebuild:
+        write_output(file_progress_series, stored_rows.to_csv(index=False))
+    elif len(stored_rows) > 0:
+        with AppendedOutput(file_progress_series, ','.join(series_columns) + '\n') as series_csv:
+            series_csv.write(stored_rows.to_csv(index=False, header=False))
+        output_stats['changed'] += 1
+    else:
+        output_stats['unchanged'] += 1
+    print(f"- {int(complete.sum())} days added to {file_progress_series}.")
+
+    if complete.any():
+        end_of_day = table.index[presence[:, np.flatnonzero(complete)[-1]] > 0]
+        state['members'] = {}
+        for issue, label in end_of_day:
+            state['members'].setdefault(issue, []).append(label)
+        state['last_day'] = days[complete][-1].strftime('%Y-%m-%d')
+    else:
+        state['members'] = {}
+        for issue, label in members[members > 0].index:
+            state['members'].setdefault(issue, []).append(label)
+    pending = events[events['day'] >= today]
+    state['pending'] = [[t.isoformat(), issue, action] for t, issue, action
+                        in zip(pending['time'], pending['issue_id'], pending['action'])]
+    state['offset'] += len(data)
+    os.makedirs(os.path.dirname(file_progress_state), exist_ok=True)
+    write_file_atomic(file_progress_state, json.dumps(state))
+
+    # Last days of the series, the current day included.
+    series = pd.concat([pd.read_csv(file_progress_series,
+                                    dtype={'date': str, 'goal': str, 'state': str, 'count': 'int64'}),
+                        rows[rows['date'] >= today.strftime('%Y-%m-%d')]], ignore_index=True)
+    start = (today - pd.Timedelta(days=progress_series_days - 1)).strftime('%Y-%m-%d')
+    series = series[series['date'] >= start]
+    series = series.pivot_table(index='date', columns=['goal', 'state'], values='count',
+                                aggfunc='last', fill_value=0)
+    series = series.reindex(columns=pd.MultiIndex.from_product([['All'] + goals, states]),
+                            fill_value=0).astype(int)
+    return {'dates': series.index.tolist(),
+            'states': {state: series[('All', state)].tolist() for state in states},
+            'goals': {state: [series[(goal, state)].tolist() for goal in goals] for state in states}}
 
 
 def write_activities_to_md(issues: List):
     # Generate list of current activities
     print("\n# Writing issues.")
 
-    for local_id, activity_id, activity_date, title, url, desc, workflow, tasks_done, tasks_total in zip(
-            issues['issue_id'],
-            issues['activity_id'],
-            issues['updated_at'],
-            issues['title'],
-            issues['url'],
-            issues['desc'],
-            issues['workflow'],
-            issues['tasks_done'],
-            issues['tasks_total']):
-        print(f" {local_id}, {activity_id}, {title}, {url}")
-
-        my_issue = []
-
-        my_issue.append('---')
-        my_issue.append(f'title: {title}')
-        my_issue.append(f'date: {activity_date}')
-        my_issue.append('layout: default')
-        my_issue.append('---')
-
-        my_issue.append(
-            f"Link to Issue: <a href='{url}' class='w3-text-grey' style='float:right'>[ {activity_id} ]</a>\n\n")
-        my_issue.append(f"Tasks: {tasks_done} done / {tasks_total} total.")
-        if tasks_total > 0:
-            p = int(tasks_done) * 100 // int(tasks_total)
-            my_issue.append(f'  <div class="w3-light-grey w3-round">')
-            my_issue.append(f'    <div class="w3-container w3-blue w3-round" style="width:{p}%">{p}%</div>')
-            my_issue.append(f'  </div><br />')
-        else:
-            my_issue.append(f'  <br /><br />')
-        my_workflow = "\n"
-        for subsection in workflow:
-            my_workflow += f'**{subsection}**\n\n'
-            my_workflow += '\n'.join(workflow[subsection])
-            my_workflow += '\n\n'
-        my_issue.append(f"{my_workflow}")
+    pages = {}
+    for issue in issues.itertuples(index=False):
+        if has_activity_page(issue, pages):
+            write_activity_md(issue)
 
-        filename = f'web/content/scorecards/activity_{activity_id}.md'
-        with open(filename, 'w') as f:
-            f.write('\n'.join(my_issue))
 
+def has_activity_page(issue, pages: dict):
+    """
+    Tell whether the scorecard page of an issue is written: only the
+    first issue of each Activity ID gets one, otherwise duplicates would
+    overwrite the page in turn on every run. Duplicates are reported.
+    `pages` maps the Activity IDs seen so far to the ID of their issue.
+    """
+    if issue.activity_id in pages:
+        print(f"- Duplicate activity ID '{issue.activity_id}': issue {issue.issue_id} skipped, "
+              f"page of issue {pages[issue.activity_id]} kept.")
+        return False
+    pages[issue.activity_id] = issue.issue_id
+    return True
 
-def write_data_points(issues, params):
+
+def write_activity_md(issue):
     """
-    Generates data points for the various dashboard plots.
+    Write the scorecard page of an activity issue (an Issue record, or a
+    row of the issues dataframe).
     """
+    print(f" {issue.issue_id}, {issue.activity_id}, {issue.title}, {issue.url}")
+    tasks_done, tasks_total = issue.tasks_done, issue.tasks_total
+
+    my_issue = []
+
+    my_issue.append('---')
+    my_issue.append(f'title: {issue.title}')
+    my_issue.append(f'date: {issue.updated_at}')
+    my_issue.append('layout: default')
+    my_issue.append('---')
+
+    my_issue.append(
+        f"Link to Issue: <a href='{issue.url}' class='w3-text-grey' style='float:right'>[ {issue.activity_id} ]</a>\n\n")
+    my_issue.append(f"Tasks: {tasks_done} done / {tasks_total} total.")
+    if tasks_total > 0:
+        p = int(tasks_done) * 100 // int(tasks_total)
+        my_issue.append(f'  <div class="w3-light-grey w3-round">')
+        my_issue.append(f'    <div class="w3-container w3-blue w3-round" style="width:{p}%">{p}%</div>')
+        my_issue.append(f'  </div><br />')
+    else:
+        my_issue.append(f'  <br /><br />')
+    my_workflow = "\n"
+    for subsection in issue.workflow:
+        my_workflow += f'**{subsection}**\n\n'
+        my_workflow += '\n'.join(issue.workflow[subsection])
+        my_workflow += '\n\n'
+    my_issue.append(f"{my_workflow}")
+
+    filename = f'web/content/scorecards/activity_{issue.activity_id}.md'
+    write_output(filename, '\n'.join(my_issue))
+
+
+def write_data_points(issues, params, goals: List):
+    """
+    Generates the data bundle used by the dashboard plots.
+
+    Labels are exploded once into an issue x label boolean matrix, with
+    exact label matching; all counts are reductions over that matrix.
+    Goals are the names of the goal labels, in display order.
+
+    All series go to a single JSON file, read by Hugo as site data, and
+    copied with its compressed variants to the static files of the site.
+    """
+    progress_labels = params['progress_labels']
+    states = ['not_started', 'in_progress', 'done']
+
+    # Boolean matrix of issues x labels, with a column for every label of interest.
+    labels = issues['labels'].str.get_dummies(sep=',').astype(bool)
+    needed_labels = [progress_labels[state] for state in states] + goals
+    labels = labels.reindex(columns=list(labels.columns.union(needed_labels)), fill_value=False)
 
     # Identify activities depending on their progress
-    issues_not_started = issues.loc[issues['labels'].str.contains(params['progress_labels']['not_started']),]
-    issues_in_progress = issues.loc[issues['labels'].str.contains(params['progress_labels']['in_progress']),]
-    issues_done = issues.loc[issues['labels'].str.contains(params['progress_labels']['done']),]
-
-    # Generate all activities stats.
-    ggi_data_all_activities = f'[{issues_not_started.shape[0]}, {issues_in_progress.shape[0]}, {issues_done.shape[0]}]'
-    with open('web/content/includes/ggi_data_all_activities.inc', 'w') as f:
-        f.write(ggi_data_all_activities)
-
-    # Generate data points for the dashboard - goals - done
-    done_stats = [
-        int(issues_done['labels'].str.contains('Usage').sum()),
-        int(issues_done['labels'].str.contains('Trust').sum()),
-        int(issues_done['labels'].str.contains('Culture').sum()),
-        int(issues_done['labels'].str.contains('Engagement').sum()),
-        int(issues_done['labels'].str.contains('Strategy').sum())
-    ]
-    with open('web/content/includes/ggi_data_goals_done.inc', 'w') as f:
-        f.write(str(done_stats))
-
-    # Generate data points for the dashboard - goals - in_progress
-    in_progress_stats = [
-        int(issues_in_progress['labels'].str.contains('Usage').sum()),
-        int(issues_in_progress['labels'].str.contains('Trust').sum()),
-        int(issues_in_progress['labels'].str.contains('Culture').sum()),
-        int(issues_in_progress['labels'].str.contains('Engagement').sum()),
-        int(issues_in_progress['labels'].str.contains('Strategy').sum())
-    ]
-    with open('web/content/includes/ggi_data_goals_in_progress.inc', 'w') as f:
-        f.write(str(in_progress_stats))
-
-    # Generate data points for the dashboard - goals - not_started
-    not_started_stats = [
-        int(issues_not_started['labels'].str.contains('Usage').sum()),
-        int(issues_not_started['labels'].str.contains('Trust').sum()),
-        int(issues_not_started['labels'].str.contains('Culture').sum()),
-        int(issues_not_started['labels'].str.contains('Engagement').sum()),
-        int(issues_not_started['labels'].str.contains('Strategy').sum())
-    ]
-    with open('web/content/includes/ggi_data_goals_not_started.inc', 'w') as f:
-        f.write(str(not_started_stats))
-
-    # Generate activities basic statistics, with links to be used from home page.
-    activities_stats = f'Identified {issues.shape[0]} activities overall.\n'
-    activities_stats += f'* {issues_not_started.shape[0]} are <span class="w3-tag w3-light-grey">{params["progress_labels"]["not_started"]}</span>\n'
-    activities_stats += f'* {issues_in_progress.shape[0]} are <span class="w3-tag w3-light-grey">{params["progress_labels"]["in_progress"]}</span>\n'
-    activities_stats += f'* {issues_done.shape[0]} are <span class="w3-tag w3-light-grey">{params["progress_labels"]["done"]}</span>\n'
-    with open('web/content/includes/activities_stats_dashboard.inc', 'w') as f:
-        f.write(activities_stats)
-
-    # Used for the activities table dataset
-    activities_dataset = []
-    for index, issue in issues.iterrows():
-        activity_id = issue['activity_id']
-        title = issue['title']
-        tasks_done = issue['tasks_done']
-        tasks_total = issue['tasks_total']
-        if params['progress_labels']['not_started'] in issue['labels']:
-            status = params['progress_labels']['not_started']
-        elif params['progress_labels']['in_progress'] in issue['labels']:
-            status = params['progress_labels']['in_progress']
-        elif params['progress_labels']['done'] in issue['labels']:
-            status = params['progress_labels']['done']
+    in_state = {state: labels[progress_labels[state]] for state in states}
+    counts = {state: int(in_state[state].sum()) for state in states}
+
+    # Activities table dataset.
+    # Status precedence: not started, then in progress, then done.
+    status = in_state['done'].map({True: progress_labels['done'], False: 'Unknown'})
+    status = status.mask(in_state['in_progress'], progress_labels['in_progress'])
+    status = status.mask(in_state['not_started'], progress_labels['not_started'])
+    activities_dataset = [list(row) for row in zip(issues['activity_id'].tolist(),
+                                                   status.tolist(),
+                                                   issues['title'].tolist(),
+                                                   [int(t) for t in issues['tasks_done']],
+                                                   [int(t) for t in issues['tasks_total']])]
+
+    dashboard = {
+        'version': dashboard_version,
+        'progress_labels': progress_labels,
+        # Not started, in progress and done activities.
+        'all_activities': [counts[state] for state in states],
+        'activities_stats': dict(counts, total=int(issues.shape[0])),
+        # Number of activities of each goal, for each progress state.
+        'goals': dict({'labels': [re.sub(' Goal$', '', goal) for goal in goals]},
+                      **{state: [int(c) for c in labels.loc[in_state[state], goals].sum()]
+                         for state in states}),
+        'activities': activities_dataset,
+        # Daily number of activities in each progress state, overall and per goal.
+        'progress': update_progress_series(params, goals),
+        # The initialisation banner is shown until at least one activity is started.
+        'show_initialisation': counts['not_started'] >= 25,
+    }
+    write_dashboard(json.dumps(dashboard, separators=(',', ':'), default=str))
+
+
+def write_dashboard(content: str):
+    """
+    Write the dashboard data bundle, and its precompressed variants for
+    the Pages host: gzip, and brotli if the module is available.
+    Variants are only written when the bundle changed or is missing.
+    """
+    os.makedirs(os.path.dirname(file_dashboard), exist_ok=True)
+    os.makedirs(os.path.dirname(file_dashboard_static), exist_ok=True)
+    write_output(file_dashboard, content)
+    changed = write_output(file_dashboard_static, content)
+
+    payload = content.encode('utf-8')
+    variants = {file_dashboard_static + '.gz': lambda: gzip.compress(payload, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        variants[file_dashboard_static + '.br'] = lambda: brotli.compress(payload)
+    except ImportError:
+        pass
+    for filename, compress in variants.items():
+        if changed or not os.path.isfile(filename):
+            write_output(filename, compress())
+
+
+def write_file_atomic(filename: str, content):
+    """
+    Write a file (text or bytes) through a temporary file and a rename, so
+    that the file is never seen partially written, even if the job is killed.
+    """
+    directory = os.path.dirname(filename) or '.'
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(filename)}.')
+    try:
+        if isinstance(content, bytes):
+            f = os.fdopen(fd, 'wb')
         else:
-            status = 'Unknown'
+            f = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        with f:
+            f.write(content)
+        mode = stat.S_IMODE(os.stat(filename).st_mode) if os.path.exists(filename) else 0o644
+        os.chmod(tmp_filename, mode)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        os.unlink(tmp_filename)
+        raise
+
+
+def write_output(filename: str, content):
+    """
+    Write a generated file (text or bytes), only if its content changed.
+
+    The content is compared with a hash of the existing file, so that
+    unchanged outputs keep their mtime. Files are written atomically.
+    Returns True if the file was written.
+    """
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as f:
+            existing_hash = hashlib.sha256(f.read()).hexdigest()
+        payload = content if isinstance(content, bytes) else content.encode('utf-8')
+        if existing_hash == hashlib.sha256(payload).hexdigest():
+            output_stats['unchanged'] += 1
+            return False
+    write_file_atomic(filename, content)
+    output_stats['changed'] += 1
+    return True
+
+
+class StreamedOutput:
+    """
+    A generated file written piece by piece, with the guarantees of
+    write_output: it is written through a temporary file and a rename,
+    and left untouched if its content did not change.
+    """
 
-        activities_dataset.append([activity_id, status, title, tasks_done, tasks_total])
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.hash = hashlib.sha256()
+        fd, self.tmp_filename = tempfile.mkstemp(dir=os.path.dirname(filename) or '.',
+                                                 prefix=f'.{os.path.basename(filename)}.')
+        self.file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
 
-    with open('web/content/includes/activities.js.inc', 'w') as f:
-        f.write(str(activities_dataset))
+    def write(self, content: str):
+        self.hash.update(content.encode('utf-8'))
+        self.file.write(content)
 
-    # Empty (or not) the initialisation banner text in index
-    # if at least one activity is started.
-    if issues_not_started.shape[0] < 25:
-        with open('web/content/includes/initialisation.inc', 'w') as f:
-            f.write('')
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+        if exc_type is not None:
+            os.unlink(self.tmp_filename)
+            return False
+        if os.path.isfile(self.filename):
+            with open(self.filename, 'rb') as f:
+                existing_hash = hashlib.sha256(f.read()).hexdigest()
+            if existing_hash == self.hash.hexdigest():
+                os.unlink(self.tmp_filename)
+                output_stats['unchanged'] += 1
+                return False
+        mode = stat.S_IMODE(os.stat(self.filename).st_mode) if os.path.exists(self.filename) else 0o644
+        os.chmod(self.tmp_filename, mode)
+        os.replace(self.tmp_filename, self.filename)
+        output_stats['changed'] += 1
+        return False
+
+
+class AppendedOutput:
+    """
+    A file to which content is appended, through a copy and a rename: it
+    is never seen with partially written lines, even if the job is
+    killed. The copy is only made on the first write. A missing file is
+    created with its header, even if nothing is written.
+    """
+
+    def __init__(self, filename: str, header: str):
+        self.filename = filename
+        self.header = header
+        self.file = None
+
+    def write(self, content: str):
+        if self.file is None:
+            self.open()
+        self.file.write(content.encode('utf-8'))
+
+    def open(self):
+        fd, self.tmp_filename = tempfile.mkstemp(dir=os.path.dirname(self.filename) or '.',
+                                                 prefix=f'.{os.path.basename(self.filename)}.')
+        self.file = os.fdopen(fd, 'wb')
+        if os.path.isfile(self.filename):
+            with open(self.filename, 'rb') as f:
+                shutil.copyfileobj(f, self.file)
+        else:
+            self.file.write(self.header.encode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.file is None:
+            if exc_type is not None or os.path.isfile(self.filename):
+                return False
+            self.open()
+        self.file.close()
+        if exc_type is not None:
+            os.unlink(self.tmp_filename)
+            return False
+        mode = stat.S_IMODE(os.stat(self.filename).st_mode) if os.path.exists(self.filename) else 0o644
+        os.chmod(self.tmp_filename, mode)
+        os.replace(self.tmp_filename, self.filename)
+        return False
+
+
+def print_output_stats():
+    """
+    Print how many generated files changed during this run.
+    """
+    print(f"\n# Outputs: {output_stats['changed']} changed, {output_stats['unchanged']} unchanged.")
+
+
+def compile_keywords(keywords: dict):
+    """
+    Compile all keywords into a single regexp, longest keywords first.
+    """
+    return re.compile('|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+def replace_keywords(file_in, keywords: dict, matcher):
+    """
+    Replace all keywords of a file in a single pass.
+
+    The file is only rewritten (atomically) if a keyword was found.
+    Returns the log messages of the replacement.
+    """
+    with open(file_in, 'r', encoding='utf-8', newline='') as f:
+        content = f.read()
+    occurrences = Counter(matcher.findall(content))
+    messages = [f"\n# Replacing keywords in file {file_in}."]
+    if occurrences:
+        write_file_atomic(file_in, matcher.sub(lambda m: keywords[m.group(0)], content))
+        messages += [f'- Changing "{k}" to "{keywords[k]}" in {file_in} ({n} times).'
+                     for k, n in occurrences.items()]
+        messages.append(f'Replacement done for {file_in}.')
+    else:
+        messages.append(f'No keyword found in {file_in}, unchanged.')
+    return messages
 
 
 def update_keywords(file_in, keywords):
@@ -255,13 +1136,14 @@ def update_keywords(file_in, keywords):
     Reads a file, and replace every occurrence of one keyword with
     its replacement string.
     """
-    occurrences = []
-    print(f"\n# Replacing keywords in file {file_in}.")
-    for keyword in keywords:
-        for line in FileInput(file_in, inplace=1, backup='.bak'):
-            if keyword in line:
-                occurrences.append(f'- Changing "{keyword}" to "{keywords[keyword]}" in {file_in}.')
-                line = line.replace(keyword, keywords[keyword])
-            print(line, end='')
-    [print(o) for o in occurrences]
-    print(f'Replacement done for {file_in}.')
+    [print(m) for m in replace_keywords(file_in, keywords, compile_keywords(keywords))]
+
+
+def update_keywords_in_files(files: List, keywords: dict, workers: int = api_workers):
+    """
+    Replace keywords in several files, processed in parallel.
+    Logs are printed in the order of the files.
+    """
+    matcher = compile_keywords(keywords)
+    for messages in map_concurrently(lambda f: replace_keywords(f, keywords, matcher), files, workers):
+        [print(m) for m in messages]
@@ -13,16 +13,67 @@
 
 """
 import glob
-from datetime import date
-
-import pandas as pd
+import os
+from datetime import date, datetime, timezone
 
+from ggi_http_cache import enable_http_cache, print_http_cache_stats
+from ggi_pacing import RequestPacer
+from ggi_telemetry import enable_telemetry, start_phase, write_telemetry_report
+from ggi_deploy import retrieve_env
 from ggi_update_website import *
-from ggi_utils_github import *
+from ggi_utils_github import get_authent, get_graphql_url, retrieve_params
+
+
+def process_github_issue(i):
+    """
+    Build the record of a GitHub issue: parse its description and list its label events.
+    """
+    if i.state != 'open':
+        return [i.number, None, [], []]
+    tasks = []
+    hist = []
+    desc = i.body
+    a_id, description, workflow, a_tasks = extract_workflow(desc)
+    for t in a_tasks:
+        tasks.append(make_task(a_id, t['is_completed'], t['task']))
+    short_desc = '\n'.join(description)
+    tasks_total = len(a_tasks)
+    tasks_done = len([t for t in a_tasks if t['is_completed']])
+    issue = Issue(i.id, a_id, i.state, i.title, ','.join([label.name for label in i.labels]),
+                  i.updated_at, i.url, short_desc, workflow,
+                  tasks_total, tasks_done)
+
+    for event in i.get_events():
+        if event.event == "labeled" or event.event == "unlabeled":
+            label = event.label.name if event.label else ''
+            n_action = f"{event.event} {label}"
+            user = event.actor.login if event.actor else 'unknown'
+            hist.append(make_label_event(event.created_at, i.number, event.id, user, n_action, i.html_url))
+
+    #print(f"- {i.id} - {a_id} - {i.title} - {i.url} - {i.updated_at}.")
+    return [i.number, issue, tasks, hist]
+
+
+def retrieve_github_issues(params: dict, since: datetime = None, workers: int = api_workers):
+    """
+    Retrieve issues from GitHub instance.
+
+    Returns one [key, issue, tasks, events] record per issue. When `since`
+    is set, only issues updated after that time are retrieved, and issues
+    closed in the meantime get an empty record. Issues are processed by
+    up to `workers` threads.
+    """
+    return list(iter_github_issues(params, since, workers))
 
 
-def retrieve_github_issues(params: dict):
+def iter_github_issues(params: dict, since: datetime = None, workers: int = api_workers):
+    """
+    Generate the records of retrieve_github_issues as issues are fetched,
+    page by page.
+    """
     print(f"\n# Retrieving project from GitHub at {params['GGI_GITHUB_URL']}.")
+    from github import Github, Auth
+
     # Using an access token
     auth = Auth.Token(params['GGI_GITHUB_TOKEN'])
     if params['GGI_API_URL'] is None:
@@ -31,88 +82,293 @@ def retrieve_github_issues(params: dict):
         g = Github(auth=auth, base_url=params['GGI_API_URL'])
     repo = g.get_repo(params["GGI_GITHUB_PROJECT"])
 
+    print("# Fetching issues..")
+    if since is None:
+        repo_issues = repo.get_issues()
+    else:
+        print(f"  Only issues updated since {since}.")
+        repo_issues = repo.get_issues(state='all', since=since)
+
+    print(f"  Found {repo_issues.totalCount} issues.")
+
+    yield from map_concurrently(process_github_issue, repo_issues, workers)
+
+
+# Fields of the label events requested from the issues timeline.
+graphql_label_event_fields = """
+            __typename
+            ... on LabeledEvent { id createdAt actor { login } label { name } }
+            ... on UnlabeledEvent { id createdAt actor { login } label { name } }
+"""
+
+graphql_issues_query = """
+    query ($owner: String!, $name: String!, $cursor: String, $filters: IssueFilters) {
+      repository(owner: $owner, name: $name) {
+        issues(first: 100, after: $cursor, filterBy: $filters,
+               orderBy: {field: CREATED_AT, direction: DESC}) {
+          totalCount
+          pageInfo { hasNextPage endCursor }
+          nodes {
+            id
+            databaseId
+            number
+            state
+            title
+            body
+            url
+            updatedAt
+            labels(first: 100, orderBy: {field: NAME, direction: ASC}) { nodes { name } }
+            timelineItems(first: 100, itemTypes: [LABELED_EVENT, UNLABELED_EVENT]) {
+              pageInfo { hasNextPage endCursor }
+              nodes {""" + graphql_label_event_fields + """              }
+            }
+          }
+        }
+      }
+    }
+"""
+
+graphql_timeline_query = """
+    query ($id: ID!, $cursor: String) {
+      node(id: $id) {
+        ... on Issue {
+          timelineItems(first: 100, after: $cursor, itemTypes: [LABELED_EVENT, UNLABELED_EVENT]) {
+            pageInfo { hasNextPage endCursor }
+            nodes {""" + graphql_label_event_fields + """            }
+          }
+        }
+      }
+    }
+"""
+
+
+# Seconds to wait for the answer to a GraphQL query.
+graphql_timeout = 60
+
+# Pacing of the GraphQL queries, shared by the threads fetching timelines.
+graphql_pacer = {}
+
+
+class GraphQLError(Exception):
     """
-    Retrieve issues from GitHub instance.
+    A failed GraphQL query, with the status and headers of the answer.
+    """
+
+    def __init__(self, message: str, status: int = None, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def get_graphql_pacer():
+    """
+    Pacer of the GraphQL queries: throttled queries (403 or 429 with rate
+    limit headers, RATE_LIMITED errors), timeouts and dropped connections
+    are retried with the backoff used for REST writes.
+    """
+    import requests
+
+    if 'pacer' not in graphql_pacer:
+        graphql_pacer['pacer'] = RequestPacer(transient_errors=(requests.Timeout, requests.ConnectionError))
+    return graphql_pacer['pacer']
+
+
+def post_graphql_query(params: dict, query: str, variables: dict):
+    """
+    Send a GraphQL query once and return its data.
+    """
+    import requests
+
+    headers = {'Authorization': f"bearer {params['GGI_GITHUB_TOKEN']}"}
+    response = requests.post(get_graphql_url(params), headers=headers,
+                             json={'query': query, 'variables': variables},
+                             hooks={'response': get_graphql_pacer().response_hook},
+                             timeout=graphql_timeout)
+    if response.status_code != 200:
+        raise GraphQLError(f"Query failed with status {response.status_code}: {response.text}",
+                           response.status_code, response.headers)
+    data = response.json()
+    if 'errors' in data:
+        # GitHub answers queries over the rate limit with 200 and RATE_LIMITED errors.
+        rate_limited = any(error.get('type') == 'RATE_LIMITED' for error in data['errors'])
+        raise GraphQLError(f"Query returned errors: {data['errors']}",
+                           403 if rate_limited else response.status_code, response.headers)
+    return data['data']
+
+
+def run_graphql_query(params: dict, query: str, variables: dict):
     """
+    Execute a GraphQL query against the GitHub instance and return its data.
+    """
+    return get_graphql_pacer().call(post_graphql_query, params, query, variables)
+
 
-    # Define columns for recorded dataframes.
-    issues = []
+def parse_github_timestamp(value: str):
+    """
+    Convert a GraphQL DateTime into the timezone-aware datetime returned by the REST API.
+    """
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def process_github_issue_node(params: dict, i: dict):
+    """
+    Build the record of an issue node returned by the GraphQL API.
+    """
+    if i['state'] != 'OPEN':
+        return [i['number'], None, [], []]
+    api_url = params['GGI_API_URL'] or 'https://api.github.com'
     tasks = []
     hist = []
+    a_id, description, workflow, a_tasks = extract_workflow(i['body'])
+    for t in a_tasks:
+        tasks.append(make_task(a_id, t['is_completed'], t['task']))
+    short_desc = '\n'.join(description)
+    tasks_total = len(a_tasks)
+    tasks_done = len([t for t in a_tasks if t['is_completed']])
+    # Keep the REST API url of the issue, as used by the REST fetch.
+    issue_url = f"{api_url}/repos/{params['GGI_GITHUB_PROJECT']}/issues/{i['number']}"
+    issue = Issue(i['databaseId'], a_id, i['state'].lower(), i['title'],
+                  ','.join([label['name'] for label in i['labels']['nodes']]),
+                  parse_github_timestamp(i['updatedAt']), issue_url, short_desc, workflow,
+                  tasks_total, tasks_done)
 
-    print("# Fetching issues..")
-    repo_issues = repo.get_issues()
+    # Label events beyond the first page are fetched for this issue only.
+    timeline = i['timelineItems']
+    events = timeline['nodes']
+    while timeline['pageInfo']['hasNextPage']:
+        timeline = run_graphql_query(params, graphql_timeline_query,
+                                     {'id': i['id'], 'cursor': timeline['pageInfo']['endCursor']})
+        timeline = timeline['node']['timelineItems']
+        events += timeline['nodes']
 
-    print(f"  Found {repo_issues.totalCount} issues.")
+    for event in events:
+        n_action = 'labeled' if event['__typename'] == 'LabeledEvent' else 'unlabeled'
+        label = event['label']['name'] if event['label'] else ''
+        user = event['actor']['login'] if event['actor'] else 'unknown'
+        hist.append(make_label_event(parse_github_timestamp(event['createdAt']), i['number'], event['id'],
+                                     user, f"{n_action} {label}", i['url']))
 
-    for i in repo_issues:
-        desc = i.body
-        paragraphs = desc.split('\n\n')
-        lines = desc.split('\n')
-        a_id, description, workflow, a_tasks = extract_workflow(desc)
-        for t in a_tasks:
-            tasks.append([a_id,
-                          'completed' if t['is_completed'] else 'open',
-                          t['task']])
-        short_desc = '\n'.join(description)
-        tasks_total = len(a_tasks)
-        tasks_done = len([t for t in a_tasks if t['is_completed']])
-        issues.append([i.id, a_id, i.state, i.title, ','.join([label.name for label in i.labels]),
-                       i.updated_at, i.url, short_desc, workflow,
-                       tasks_total, tasks_done])
-
-        for event in i.get_events():
-            if event.event == "labeled" or event.event == "unlabeled":
-                n_type = 'label'
-                label = event.label.name if event.label else ''
-                n_action = f"{event.event} {label}"
-                user = event.actor.login if event.actor else 'unknown'
-                line = [
-                    event.created_at,  # Date de l'événement
-                    i.number,  # Numéro de l'issue
-                    event.id,  # ID de l'événement
-                    n_type,  # Type d'événement (toujours 'label')
-                    user,  # Utilisateur qui a déclenché l'événement
-                    n_action,  # Action effectuée (labeled/unlabeled)
-                    i.html_url  # URL de l'issue
-                ]
-                hist.append(line)
-
-        #print(f"- {i.id} - {a_id} - {i.title} - {i.url} - {i.updated_at}.")
-
-    return issues, tasks, hist
+    return [i['number'], issue, tasks, hist]
 
 
-def main():
+def retrieve_github_issues_graphql(params: dict, since: datetime = None, workers: int = api_workers):
     """
-    Main sequence.
+    Retrieve issues from GitHub instance using the GraphQL API.
+
+    Issues, their labels and their label events are fetched in pages of 100,
+    so that a whole board only costs a handful of requests. The returned
+    records are the same as the ones produced by retrieve_github_issues.
     """
+    return list(iter_github_issues_graphql(params, since, workers))
 
-    args = parse_args()
 
-    params = retrieve_params()
+def iter_github_issues_graphql(params: dict, since: datetime = None, workers: int = api_workers):
+    """
+    Generate the records of retrieve_github_issues_graphql, page by page.
+    """
+    print(f"\n# Retrieving project from GitHub at {params['GGI_GITHUB_URL']} (GraphQL).")
+    owner, name = params['GGI_GITHUB_PROJECT'].split('/')
+
+    print("# Fetching issues..")
+    if since is None:
+        filters = {'states': ['OPEN']}
+    else:
+        print(f"  Only issues updated since {since}.")
+        filters = {'since': since.isoformat()}
+    cursor = None
+    has_next_page = True
+    while has_next_page:
+        data = run_graphql_query(params, graphql_issues_query,
+                                 {'owner': owner, 'name': name, 'cursor': cursor, 'filters': filters})
+        repo_issues = data['repository']['issues']
+        if cursor is None:
+            print(f"  Found {repo_issues['totalCount']} issues.")
+        has_next_page = repo_issues['pageInfo']['hasNextPage']
+        cursor = repo_issues['pageInfo']['endCursor']
+
+        yield from map_concurrently(lambda i: process_github_issue_node(params, i),
+                                    repo_issues['nodes'], workers)
+
+
+def update_website(params: dict, args):
+    """
+    Update the website of one board, in the current directory.
+    """
+    start_phase('connection')
     repo, github_handle, headers = get_authent(params)
 
     print(params)
 
-    issues, tasks, hist = retrieve_github_issues(params)
+    if args.opt_stream:
+        stream_website(params, args)
+        return
+
+    start_phase('retrieve issues')
+    load_workflow_cache()
+    sync_time = datetime.now(timezone.utc)
+    since, previous_records = None, None
+    if args.opt_incremental:
+        since, previous_records = load_sync_state(params['GGI_GITHUB_PROJECT'])
 
-    # Convert lists to dataframes
-    issues_cols = ['issue_id', 'activity_id', 'state', 'title', 'labels',
-                   'updated_at', 'url', 'desc', 'workflow', 'tasks_total', 'tasks_done']
-    issues = pd.DataFrame(issues, columns=issues_cols)
-    tasks_cols = ['issue_id', 'state', 'task']
-    tasks = pd.DataFrame(tasks, columns=tasks_cols)
-    hist_cols = ['time', 'issue_id', 'event_id', 'type', 'author', 'action', 'url']
-    hist = pd.DataFrame(hist, columns=hist_cols)
+    if args.opt_graphql:
+        records = retrieve_github_issues_graphql(params, since, args.workers)
+    else:
+        records = retrieve_github_issues(params, since, args.workers)
+    if previous_records is not None:
+        records = merge_records(previous_records, records)
+
+    # Convert records to dataframes
+    start_phase('build dataframes')
+    issues, tasks, hist = build_dataframes(*flatten_records(records))
+    if not args.opt_incremental:
+        # Records are only kept to be saved in the sync state.
+        records = None
 
+    start_phase('write csv')
     write_to_csv(issues, tasks, hist)
+    start_phase('write scorecards')
     write_activities_to_md(issues)
-    write_data_points(issues, params)
+    start_phase('write data points')
+    metadata, init_scorecard = retrieve_env()
+    write_data_points(issues, params, [goal['name'] for goal in metadata['goals']])
+
+    start_phase('save state')
+    save_workflow_cache()
+    if args.opt_incremental:
+        save_sync_state(params['GGI_GITHUB_PROJECT'], sync_time, records)
+
+    replace_website_keywords(params, args)
+    print_output_stats()
+
+
+def stream_website(params: dict, args):
+    """
+    Update the website of one board, writing the outputs of each issue as
+    it is fetched.
+    """
+    start_phase('stream issues')
+    load_workflow_cache()
+    if args.opt_graphql:
+        issues = stream_records(iter_github_issues_graphql(params, None, args.workers))
+    else:
+        issues = stream_records(iter_github_issues(params, None, args.workers))
+
+    start_phase('write data points')
+    metadata, init_scorecard = retrieve_env()
+    write_data_points(issues, params, [goal['name'] for goal in metadata['goals']])
+
+    start_phase('save state')
+    save_workflow_cache()
+
+    replace_website_keywords(params, args)
+    print_output_stats()
+
 
-    #
-    # Replace URLs, date
-    #
+def replace_website_keywords(params: dict, args):
+    """
+    Replace URLs, date in the static website.
+    """
+    start_phase('replace keywords')
     print("\n# Replacing keywords in static website.")
 
     # List of strings to be replaced.
@@ -127,14 +383,12 @@ def main():
     [print(f"- {k} {keywords[k]}") for k in keywords.keys()]
 
     print("\n# Replacing keywords in files.")
-    update_keywords('web/config.toml', keywords)
-    update_keywords('web/content/includes/initialisation.inc', keywords)
-    update_keywords('web/content/scorecards/_index.md', keywords)
-    # update_keywords('README.md', keywords)
-    files = glob.glob("web/content/*.md")
-    for file in files:
-        if os.path.isfile(file):
-            update_keywords(file, keywords)
+    files = ['web/config.toml',
+             'web/content/includes/initialisation.inc',
+             'web/content/scorecards/_index.md']
+    # files.append('README.md')
+    files += [file for file in glob.glob("web/content/*.md") if os.path.isfile(file)]
+    update_keywords_in_files(files, keywords, args.workers)
     try:
         with open('web/content/_index.md', 'r') as file:
             file_content = file.read()
@@ -143,6 +397,27 @@ def main():
         print('not found')
     except Exception as e:
         print('an error occurred')
+
+
+def main():
+    """
+    Main sequence.
+    """
+
+    args = parse_args()
+    if args.opt_telemetry:
+        enable_telemetry()
+    if args.opt_http_cache:
+        enable_http_cache()
+
+    start_phase('configuration')
+    params = retrieve_params()
+    update_website(params, args)
+
+    if args.opt_http_cache:
+        print_http_cache_stats()
+    if args.opt_telemetry:
+        write_telemetry_report('ggi_update_website_github')
     print("Done.")
 
 
@@ -12,66 +12,151 @@ Update static website from GitLab metadata.
 import glob
 import json
 import os
-from datetime import date
-
-import gitlab
-import pandas as pd
+from datetime import date, datetime, timezone
 
+from ggi_http_cache import enable_http_cache, print_http_cache_stats
+from ggi_telemetry import enable_telemetry, start_phase, write_telemetry_report
+from ggi_deploy import retrieve_env
 from ggi_update_website import *
 from ggi_utils_gitlab import retrieve_params
 
 
-def retrieve_gitlab_issues(params: dict):
+def retrieve_label_events(issue):
+    """
+    List all label events of an issue, following pagination.
+    """
+    return issue.resourcelabelevents.list(all=True, per_page=100)
+
+
+def process_gitlab_issue(i):
+    """
+    Build the record of a GitLab issue: parse its description and list its label events.
+    """
+    if i.state != 'opened':
+        return [i.iid, None, [], []]
+    tasks, hist = [], []
+    desc = i.description
+    a_id, description, workflow, a_tasks = extract_workflow(desc)
+    for t in a_tasks:
+        tasks.append(make_task(a_id, t['is_completed'], t['task']))
+    short_desc = '\n'.join(description)
+    tasks_total = len(a_tasks)
+    tasks_done = len([t for t in a_tasks if t['is_completed']])
+    issue = Issue(i.iid, a_id, i.state, i.title, ','.join(i.labels),
+                  i.updated_at, i.web_url, short_desc, workflow,
+                  tasks_total, tasks_done)
+
+    for n in retrieve_label_events(i):
+        label = n.label['name'] if n.label else ''
+        user = n.user['username'] if n.user else 'unknown'
+        hist.append(make_label_event(n.created_at, i.iid, n.id, user, f"{n.action} {label}", i.web_url))
+
+    return [i.iid, issue, tasks, hist]
+
+
+def retrieve_gitlab_issues(params: dict, since: datetime = None, workers: int = api_workers):
     """
     Retrieve issues from GitLab instance.
+
+    Returns one [key, issue, tasks, events] record per issue. When `since`
+    is set, only issues updated after that time are retrieved, and issues
+    closed in the meantime get an empty record. Issues are processed by
+    up to `workers` threads.
     """
+    return list(iter_gitlab_issues(params, since, workers))
+
+
+def iter_gitlab_issues(params: dict, since: datetime = None, workers: int = api_workers):
+    """
+    Generate the records of retrieve_gitlab_issues as issues are fetched,
+    page by page.
+    """
+    import gitlab
+
     print(f"\n# Connection to GitLab at {params['GGI_GITLAB_URL']} - {params['GGI_GITLAB_PROJECT']}.")
     gl = gitlab.Gitlab(url=params['GGI_GITLAB_URL'], per_page=50, private_token=params['GGI_GITLAB_TOKEN'])
     project = gl.projects.get(params['GGI_GITLAB_PROJECT'])
 
     print("# Fetching issues..")
-    gl_issues = project.issues.list(state='opened', all=True)
-    print(f"  Found {len(gl_issues)} issues.")
+    if since is None:
+        gl_issues = project.issues.list(state='opened', iterator=True)
+    else:
+        print(f"  Only issues updated since {since}.")
+        gl_issues = project.issues.list(updated_after=since.isoformat(), iterator=True)
+    print(f"  Found {gl_issues.total} issues.")
 
-    issues, tasks, hist = [], [], []
+    # Label events are listed once per issue, several issues at a time.
+    print(f"# Fetching label events ({workers} workers)..")
+    yield from map_concurrently(process_gitlab_issue, gl_issues, workers)
+
+
+def update_website(params: dict, args):
+    """
+    Update the website of one board, in the current directory.
+    """
+    if args.opt_stream:
+        stream_website(params, args)
+        return
+
+    start_phase('retrieve issues')
+    load_workflow_cache()
+    sync_time = datetime.now(timezone.utc)
+    since, previous_records = None, None
+    if args.opt_incremental:
+        since, previous_records = load_sync_state(params['GGI_GITLAB_PROJECT'])
+
+    records = retrieve_gitlab_issues(params, since, args.workers)
+    if previous_records is not None:
+        records = merge_records(previous_records, records)
+
+    start_phase('build dataframes')
+    issues_df, tasks_df, hist_df = build_dataframes(*flatten_records(records))
+    if not args.opt_incremental:
+        # Records are only kept to be saved in the sync state.
+        records = None
+
+    start_phase('write csv')
+    write_to_csv(issues_df, tasks_df, hist_df)
+    start_phase('write scorecards')
+    write_activities_to_md(issues_df)
+    start_phase('write data points')
+    metadata, init_scorecard = retrieve_env()
+    write_data_points(issues_df, params, [goal['name'] for goal in metadata['goals']])
 
-    for i in gl_issues:
-        desc = i.description
-        a_id, description, workflow, a_tasks = extract_workflow(desc)
-        for t in a_tasks:
-            tasks.append([a_id, 'completed' if t['is_completed'] else 'open', t['task']])
-        short_desc = '\n'.join(description)
-        tasks_total = len(a_tasks)
-        tasks_done = len([t for t in a_tasks if t['is_completed']])
-        issues.append([i.iid, a_id, i.state, i.title, ','.join(i.labels),
-                       i.updated_at, i.web_url, short_desc, workflow,
-                       tasks_total, tasks_done])
+    start_phase('save state')
+    save_workflow_cache()
+    if args.opt_incremental:
+        save_sync_state(params['GGI_GITLAB_PROJECT'], sync_time, records)
 
-        for n in i.resourcelabelevents.list():
-            event = i.resourcelabelevents.get(n.id)
-            label = n.label['name'] if n.label else ''
-            user = n.user['username'] if n.user else 'unknown'
-            hist.append([n.created_at, i.iid, n.id, 'label', user,
-                         f"{n.action} {label}", i.web_url])
+    replace_website_keywords(params, args)
+    print_output_stats()
 
-    return issues, tasks, hist
 
+def stream_website(params: dict, args):
+    """
+    Update the website of one board, writing the outputs of each issue as
+    it is fetched.
+    """
+    start_phase('stream issues')
+    load_workflow_cache()
+    issues_df = stream_records(iter_gitlab_issues(params, None, args.workers))
 
-def main():
-    args = parse_args()
-    params = retrieve_params()
+    start_phase('write data points')
+    metadata, init_scorecard = retrieve_env()
+    write_data_points(issues_df, params, [goal['name'] for goal in metadata['goals']])
 
-    issues, tasks, hist = retrieve_gitlab_issues(params)
+    start_phase('save state')
+    save_workflow_cache()
 
-    issues_df = pd.DataFrame(issues, columns=['issue_id', 'activity_id', 'state', 'title', 'labels',
-                                              'updated_at', 'url', 'desc', 'workflow', 'tasks_total', 'tasks_done'])
-    tasks_df = pd.DataFrame(tasks, columns=['issue_id', 'state', 'task'])
-    hist_df = pd.DataFrame(hist, columns=['time', 'issue_id', 'event_id', 'type', 'author', 'action', 'url'])
+    replace_website_keywords(params, args)
+    print_output_stats()
 
-    write_to_csv(issues_df, tasks_df, hist_df)
-    write_activities_to_md(issues_df)
-    write_data_points(issues_df, params)
 
+def replace_website_keywords(params: dict, args):
+    """
+    Replace URLs and date in the static website.
+    """
+    start_phase('replace keywords')
     print("\n# Replacing keywords in static website.")
     keywords = {
         '[GGI_URL]': params['GGI_URL'],
@@ -80,14 +165,28 @@ def main():
         '[GGI_CURRENT_DATE]': str(date.today())
     }
 
-    update_keywords('web/config.toml', keywords)
-    update_keywords('web/content/includes/initialisation.inc', keywords)
-    update_keywords('web/content/scorecards/_index.md', keywords)
-    files = glob.glob("web/content/*.md")
-    for file in files:
-        if os.path.isfile(file):
-            update_keywords(file, keywords)
+    files = ['web/config.toml',
+             'web/content/includes/initialisation.inc',
+             'web/content/scorecards/_index.md']
+    files += [file for file in glob.glob("web/content/*.md") if os.path.isfile(file)]
+    update_keywords_in_files(files, keywords, args.workers)
+
+
+def main():
+    args = parse_args()
+    if args.opt_telemetry:
+        enable_telemetry()
+    if args.opt_http_cache:
+        enable_http_cache()
+    start_phase('configuration')
+    params = retrieve_params()
+
+    update_website(params, args)
 
+    if args.opt_http_cache:
+        print_http_cache_stats()
+    if args.opt_telemetry:
+        write_telemetry_report('ggi_update_website_gitlab')
     print("Done.")
 
 
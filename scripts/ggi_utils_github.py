@@ -14,13 +14,11 @@
 """
 import urllib.parse
 
-from github import Github, Auth
-
 from ggi_deploy import *
 
 public_github_root_url="https://github.com/"
 
-def retrieve_params():
+def retrieve_params(conf_file: str = conf_file):
     """
     Read metadata for activities and deployment options.
 
@@ -84,24 +82,41 @@ def retrieve_params():
 
     return params
 
+def get_graphql_url(params: dict):
+    """
+    Compute the GraphQL endpoint matching the configured GitHub instance.
+    """
+    if params['GGI_API_URL'] is None:
+        return 'https://api.github.com/graphql'
+    # GitHub Enterprise serves GraphQL under /api/graphql instead of /api/v3.
+    return re.sub('/v3/?$', '', params['GGI_API_URL']) + '/graphql'
+
 def get_authent(params: dict):
     headers = {
         "Authorization": f"Bearer {params['GGI_GITHUB_TOKEN']}",
         "Accept": "application/vnd.github.inertia-preview+json"  # Needed for project board access
     }
 
+    from github import Github, Auth, GithubRetry
+
     # Connecting to the GitHub instance.
     # Manage authentication
     auth = Auth.Token(params['GGI_GITHUB_TOKEN'])
-    if params['GGI_GITHUB_URL'].startswith(public_github_root_url):
+    # Writes are paced by a RequestPacer from the rate limit headers, so
+    # PyGithub's fixed delays between requests (1 s per write) are
+    # disabled. GithubRetry, which also backs off on rate limited 403/429
+    # answers, only retries reads: throttled writes are retried by the
+    # pacer alone, not by both.
+    options = {'per_page': 100, 'seconds_between_requests': None, 'seconds_between_writes': None,
+               'retry': GithubRetry(total=10, allowed_methods={'GET', 'HEAD'})}
+    if params['GGI_API_URL'] is None:
         # Public Web GitHub
         print("- Using public GitHub instance.")
-        github_handle = Github(auth=auth)
+        github_handle = Github(auth=auth, **options)
     else:
-        print(f"- Using GitHub on-premise host {params['GGI_GITHUB_URL']} ")
+        print(f"- Using GitHub on-premise host {params['GGI_API_URL']} ")
         # GitHub Enterprise with custom hostname
-        params['GGI_GITHUB_URL'] = f"{params['GGI_GITHUB_URL']}/api/v3"
-        github_handle = Github(auth=auth, base_url=params['GGI_GITHUB_URL'])
+        github_handle = Github(auth=auth, base_url=params['GGI_API_URL'], **options)
 
     print(f"\n# Retrieving project from GitHub at {params['GGI_GITHUB_URL']}.")
     repo = github_handle.get_repo(params['GGI_GITHUB_PROJECT'])
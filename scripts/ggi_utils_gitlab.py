@@ -13,14 +13,68 @@
 GitLab utilities for GGI tools.
 """
 
+import hashlib
 import json
 import os
+import pathlib
 import urllib.parse
-import tldextract
 
 from ggi_deploy import *
 
-def retrieve_params():
+# Public suffix list used to find the domain of a GitLab instance, as
+# downloaded by ggi_update_public_suffixes. Without it, the snapshot
+# shipped with tldextract is used. The network is never used.
+public_suffix_file = conf_dir + '/public_suffix_list.dat'
+# Pages domain of each GitLab host already resolved, with the suffix list
+# they were resolved with.
+file_pages_domains = 'web/cache/ggi_pages_domains.json'
+
+
+def get_pages_domain(gitlab_url: str):
+    """
+    Compute the domain of the Pages sites of a GitLab instance, e.g.
+    'ow2' for https://gitlab.ow2.org (sites are served by <group>.ow2.io).
+
+    Domains are memoized by host, so tldextract is only loaded the first
+    time a host is seen. They are forgotten when the suffix list changes.
+    """
+    host = urllib.parse.urlsplit(gitlab_url).netloc.lower()
+    suffix_list = get_suffix_list_version()
+    domains = {}
+    if os.path.isfile(file_pages_domains):
+        with open(file_pages_domains, 'r', encoding='utf-8') as f:
+            memo = json.load(f)
+        if memo.get('suffix_list') == suffix_list:
+            domains = memo['domains']
+    if host in domains:
+        return domains[host]
+
+    import tldextract
+    suffix_list_urls = (pathlib.Path(public_suffix_file).as_uri(),) if os.path.isfile(public_suffix_file) else ()
+    extract = tldextract.TLDExtract(cache_dir=None, suffix_list_urls=suffix_list_urls, fallback_to_snapshot=True)
+    domains[host] = extract(gitlab_url).domain
+    try:
+        os.makedirs(os.path.dirname(file_pages_domains), exist_ok=True)
+        with open(file_pages_domains, 'w', encoding='utf-8') as f:
+            json.dump({'suffix_list': suffix_list, 'domains': domains}, f, indent=4)
+    except OSError as e:
+        print(f"  Cannot write {file_pages_domains}: {e}")
+    return domains[host]
+
+
+def get_suffix_list_version():
+    """
+    Identify the public suffix list used by get_pages_domain: the hash of
+    the downloaded list, or the version of the tldextract snapshot.
+    """
+    if os.path.isfile(public_suffix_file):
+        with open(public_suffix_file, 'rb') as f:
+            return 'sha256:' + hashlib.sha256(f.read()).hexdigest()
+    from importlib.metadata import version
+    return 'tldextract:' + version('tldextract')
+
+
+def retrieve_params(conf_file: str = conf_file):
     """
     Read metadata for activities and deployment options.
 
@@ -75,8 +129,9 @@ def retrieve_params():
         print("- Using Pages URL from env var 'CI_PAGES_URL'")
     else:
         print("- Pages URL not found in env. Computing fallback.")
-        pieces = tldextract.extract(params['GGI_GITLAB_URL'])
-        params['GGI_PAGES_URL'] = 'https://' + params['GGI_GITLAB_PROJECT'].split('/')[0] +                                   '.' + pieces.domain + '.io/' + params['GGI_GITLAB_PROJECT'].split('/')[-1]
+        params['GGI_PAGES_URL'] = 'https://' + params['GGI_GITLAB_PROJECT'].split('/')[0] + \
+                                  '.' + get_pages_domain(params['GGI_GITLAB_URL']) + '.io/' + \
+                                  params['GGI_GITLAB_PROJECT'].split('/')[-1]
 
     # Compose URLs
     params['GGI_URL'] = urllib.parse.urljoin(params['GGI_GITLAB_URL'], params['GGI_GITLAB_PROJECT'])
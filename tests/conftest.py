@@ -0,0 +1,69 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+"""
+Shared fixtures: the scripts are imported as top-level modules, and
+updates run against the fake forge in a throwaway board directory.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from ggi_fake_forge import start_fake_forge
+from ggi_update_fleet import board_ignored_env, prepare_board
+
+
+@pytest.fixture
+def fake_forge(request, tmp_path, monkeypatch):
+    """
+    A fake forge, with the options of FakeForge given by indirect
+    parametrization, if any. It is started outside of the repository
+    tree, so that it does not write caches there.
+    """
+    monkeypatch.chdir(tmp_path)
+    options = dict({'issues': 10, 'events': 40}, **getattr(request, 'param', {}))
+    server = start_fake_forge(**options)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_board(backend: str, tmp_path, monkeypatch, fake_forge):
+    """
+    Create a board of the fake forge, with the current directory set to
+    its output tree. Returns the path of its configuration file.
+    """
+    for name in board_ignored_env:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('GGI_GITLAB_TOKEN' if backend == 'gitlab' else 'GGI_GITHUB_TOKEN', 'token')
+    board_conf_file = prepare_board({'backend': backend, 'url': fake_forge.url,
+                                     'project': 'ggi/my-ggi-board', 'output_dir': str(tmp_path)})
+    monkeypatch.chdir(tmp_path)
+    return board_conf_file
+
+
+@pytest.fixture
+def board(tmp_path, monkeypatch, fake_forge):
+    """
+    A GitHub board served by the fake forge, see make_board.
+    """
+    return make_board('github', tmp_path, monkeypatch, fake_forge)
+
+
+@pytest.fixture
+def gitlab_board(tmp_path, monkeypatch, fake_forge):
+    """
+    A GitLab board served by the fake forge, see make_board.
+    """
+    return make_board('gitlab', tmp_path, monkeypatch, fake_forge)
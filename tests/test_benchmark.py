@@ -0,0 +1,19 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import ggi_benchmark
+
+
+def test_synthetic_issues_have_distinct_activity_ids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dataset = ggi_benchmark.make_dataset(120, 10, 2)
+
+    ggi_benchmark.check_dataset(dataset)
+    assert dataset['issues']['activity_id'].iloc[-1] == 'GGI-A-00120'
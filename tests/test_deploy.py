@@ -0,0 +1,66 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import json
+import os
+
+import ggi_deploy
+
+
+def test_compiled_activities_are_cached_as_json_in_the_board(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web')
+    metadata, init_scorecard = ggi_deploy.retrieve_env()
+
+    with open(os.path.join(tmp_path, 'web/cache/ggi_activities_compiled.json'), 'r', encoding='utf-8') as f:
+        compiled = json.load(f)
+    assert list(compiled['sections']) == [activity['id'] for activity in metadata['activities']]
+    assert set(compiled['sections'][metadata['activities'][0]['id']]) == {'activity_id_line', 'body'}
+    assert ggi_deploy.read_compiled_activities(compiled['source_sha256']) == compiled
+
+
+def test_compiled_activities_of_another_source_are_ignored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web')
+    ggi_deploy.retrieve_env()
+    with open(ggi_deploy.compiled_activities_file, 'r', encoding='utf-8') as f:
+        compiled = json.load(f)
+
+    assert ggi_deploy.read_compiled_activities('0' * 64) is None
+    with open(ggi_deploy.compiled_activities_file, 'w', encoding='utf-8') as f:
+        f.write('not json')
+    assert ggi_deploy.read_compiled_activities(compiled['source_sha256']) is None
+
+
+def test_compiled_activities_are_not_written_outside_of_a_board(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ggi_deploy.retrieve_env()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_labels_are_diffed_by_name_and_colour():
+    existing = {'Done': '#ED9121', 'Developer': '000000', 'Other': 'ffffff'}
+    wanted = {'Done': 'ed9121', 'Developer': 'ffffff', 'Usage Goal': 'aaaaaa'}
+
+    assert ggi_deploy.diff_labels(existing, wanted) == (['Usage Goal'], ['Developer'], ['Done'])
+
+
+def test_missing_activities_are_planned():
+    metadata = {'activities': [{'id': 'GGI-A-01'}, {'id': 'GGI-A-02'}, {'id': 'GGI-A-03'}]}
+    existing = ggi_deploy.index_activities([
+        (1, 'Activity ID: [GGI-A-02](https://example.org/GGI-A-02).'),
+        (2, 'No activity here.'),
+        (3, None),
+        (4, 'Activity ID: [GGI-A-02](https://example.org/GGI-A-02).'),
+    ])
+
+    assert existing == {'GGI-A-02': 1}
+    assert ggi_deploy.plan_activities(metadata, existing) == [{'id': 'GGI-A-01'}, {'id': 'GGI-A-03'}]
@@ -0,0 +1,99 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import sys
+import time
+
+import pytest
+
+import ggi_deploy_github
+
+
+def deploy_activities(board, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['ggi_deploy_github.py', '-a'])
+    args = ggi_deploy_github.parse_args()
+    metadata, init_scorecard = ggi_deploy_github.retrieve_env()
+    params = ggi_deploy_github.retrieve_params(board)
+    start = time.perf_counter()
+    ggi_deploy_github.setup_github(metadata, params, init_scorecard, args)
+    return metadata, time.perf_counter() - start
+
+
+def count_requests(forge, method: str, resource: str):
+    return sum(count for endpoint, count in forge.stats.items()
+               if endpoint.startswith(method + ' ') and endpoint.endswith(f'/{resource}/?$'))
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 0}], indirect=True)
+def test_writes_are_not_throttled_by_pygithub(board, monkeypatch, fake_forge):
+    """
+    Writes are only paced by the RequestPacer: PyGithub used to wait 1 s
+    before each of them.
+    """
+    metadata, seconds = deploy_activities(board, monkeypatch)
+
+    writes = count_requests(fake_forge.forge, 'POST', 'labels') + count_requests(fake_forge.forge, 'POST', 'issues')
+    assert count_requests(fake_forge.forge, 'POST', 'issues') == len(metadata['activities'])
+    assert seconds < writes / 2
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 0, 'throttle_every': 5, 'retry_after': 0}], indirect=True)
+def test_throttled_writes_are_retried_by_the_pacer(board, monkeypatch, capsys, fake_forge):
+    """
+    Writes rejected by a secondary rate limit are retried by the pacer
+    alone: GithubRetry does not retry them first.
+    """
+    metadata, seconds = deploy_activities(board, monkeypatch)
+
+    throttled = fake_forge.forge.stats['throttled (secondary, writes)']
+    assert throttled > 0
+    assert capsys.readouterr().out.count('Throttled by server (status 403)') == throttled
+    assert count_requests(fake_forge.forge, 'POST', 'issues') == len(metadata['activities'])
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 10}], indirect=True)
+def test_existing_activities_are_listed_by_goal_label(board, monkeypatch, fake_forge):
+    """
+    Only issues with a goal label are listed; pull requests are not
+    activities, and closed activities are not recreated.
+    """
+    forge = fake_forge.forge
+    project = forge.get_project('ggi/my-ggi-board')
+    project['issues'][0]['state'] = 'closed'
+    activity = forge.metadata['activities'][10]
+    pull_request = forge.add_issue(project, activity['name'], f"Activity ID: [{activity['id']}](url).",
+                                   [activity['goal']], 'user')
+    pull_request['pull_request'] = True
+    forge.add_issue(project, 'Unrelated', 'Some text.', [], 'user')
+
+    metadata, seconds = deploy_activities(board, monkeypatch)
+
+    assert count_requests(forge, 'POST', 'issues') == len(metadata['activities']) - 10
+    assert count_requests(forge, 'GET', 'issues') == len(metadata['goals'])
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 0}], indirect=True)
+def test_plan_prints_missing_labels_and_activities_without_writing(board, monkeypatch, capsys, fake_forge):
+    forge = fake_forge.forge
+    project = forge.get_project('ggi/my-ggi-board')
+    project['labels']['Developer'] = {'id': forge.new_id(), 'name': 'Developer', 'color': '000000'}
+    monkeypatch.setattr(sys, 'argv', ['ggi_deploy_github.py', '-a', '-b', '-p', '--plan'])
+    args = ggi_deploy_github.parse_args()
+    metadata, init_scorecard = ggi_deploy_github.retrieve_env()
+
+    ggi_deploy_github.setup_github(metadata, ggi_deploy_github.retrieve_params(board), init_scorecard, args)
+
+    out = capsys.readouterr().out
+    assert "[plan] POST /repos/ggi/my-ggi-board/labels name='Done'" in out
+    assert "[plan] PATCH /repos/ggi/my-ggi-board/labels/Developer" in out
+    assert out.count("[plan] POST /repos/ggi/my-ggi-board/issues") == len(metadata['activities'])
+    assert [endpoint for endpoint in forge.stats if not endpoint.startswith('GET ')] == []
+    assert list(project['labels']) == ['Developer']
+    assert project['labels']['Developer']['color'] == '000000'
@@ -0,0 +1,121 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import ggi_deploy_gitlab
+
+
+def deploy(board, monkeypatch, options: list):
+    monkeypatch.setattr(sys, 'argv', ['ggi_deploy_gitlab.py'] + options)
+    args = ggi_deploy_gitlab.parse_args()
+    metadata, init_scorecard = ggi_deploy_gitlab.retrieve_env()
+    params = ggi_deploy_gitlab.retrieve_params(board)
+    ggi_deploy_gitlab.setup_gitlab(metadata, params, init_scorecard, args)
+    return metadata
+
+
+def count_requests(forge, method: str, resource: str):
+    return sum(count for endpoint, count in forge.stats.items()
+               if endpoint.startswith(method + ' ') and endpoint.endswith(f'/{resource}/?$'))
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 0, 'throttle_every': 5, 'retry_after': 0}], indirect=True)
+def test_throttled_writes_are_retried_by_the_pacer(gitlab_board, monkeypatch, capsys, fake_forge):
+    """
+    Writes rejected with a 429 are retried by the pacer, not by
+    python-gitlab, and every activity is created once.
+    """
+    metadata = deploy(gitlab_board, monkeypatch, ['-a', '-b'])
+
+    assert 'Throttled by server (status 429)' in capsys.readouterr().out
+    assert count_requests(fake_forge.forge, 'POST', 'issues') == len(metadata['activities'])
+    assert count_requests(fake_forge.forge, 'POST', 'labels') == len(fake_forge.forge.wanted_labels)
+    project = fake_forge.forge.get_project('ggi/my-ggi-board')
+    assert len(project['issues']) == len(metadata['activities'])
+    assert len(project['boards']) == 1
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 0}], indirect=True)
+def test_writes_failing_with_a_server_error_are_not_retried(gitlab_board, monkeypatch, fake_forge):
+    """
+    A write that failed with a server error may have been applied: it is
+    not sent again.
+    """
+    import gitlab
+
+    forge = fake_forge.forge
+
+    def create_issue(context, path):
+        forge.gitlab_create_issue(context, path)
+        return 502, {}, {'message': 'Bad Gateway'}
+
+    monkeypatch.setattr(forge, 'routes', [(method, pattern, create_issue if func == forge.gitlab_create_issue else func)
+                                          for method, pattern, func in forge.routes])
+
+    with pytest.raises(gitlab.exceptions.GitlabCreateError):
+        deploy(gitlab_board, monkeypatch, ['-a'])
+
+    assert len(fake_forge.forge.get_project('ggi/my-ggi-board')['issues']) == 1
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 10}], indirect=True)
+def test_existing_activities_are_listed_by_goal_label(gitlab_board, monkeypatch, fake_forge):
+    """
+    Only issues with a goal label are listed, and closed activities are
+    not recreated.
+    """
+    forge = fake_forge.forge
+    project = forge.get_project('ggi/my-ggi-board')
+    project['issues'][0]['state'] = 'closed'
+    forge.add_issue(project, 'Unrelated', 'Some text.', [], 'user')
+
+    metadata = deploy(gitlab_board, monkeypatch, ['-a'])
+
+    assert count_requests(forge, 'POST', 'issues') == len(metadata['activities']) - 10
+    assert count_requests(forge, 'GET', 'issues') == len(metadata['goals'])
+
+
+def test_labels_inherited_from_groups_are_not_updated(capsys):
+    saved = []
+
+    def make_label(name, color, is_project_label):
+        label = SimpleNamespace(name=name, color=color, is_project_label=is_project_label)
+        label.save = lambda **kwargs: saved.append(label.name)
+        return label
+
+    labels = [make_label('Usage Goal', '#000000', False), make_label('Trust Goal', '#000000', True)]
+    project = SimpleNamespace(id=1, labels=SimpleNamespace(list=lambda **kwargs: labels))
+
+    ggi_deploy_gitlab.sync_gitlab_labels(project, {'Usage Goal': 'ffffff', 'Trust Goal': 'ffffff'})
+
+    assert saved == ['Trust Goal']
+    assert 'Ignore group label: Usage Goal' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 0}], indirect=True)
+def test_plan_prints_missing_labels_and_activities_without_writing(gitlab_board, monkeypatch, capsys, fake_forge):
+    forge = fake_forge.forge
+    project = forge.get_project('ggi/my-ggi-board')
+    project['labels']['Developer'] = {'id': forge.new_id(), 'name': 'Developer', 'color': '000000'}
+
+    metadata = deploy(gitlab_board, monkeypatch, ['-a', '-b', '-p', '--plan'])
+
+    out = capsys.readouterr().out
+    assert f"[plan] POST /projects/{project['id']}/labels name='Done'" in out
+    assert f"[plan] PUT /projects/{project['id']}/labels name='Developer'" in out
+    assert out.count(f"[plan] POST /projects/{project['id']}/issues") == len(metadata['activities'])
+    assert [endpoint for endpoint in forge.stats if not endpoint.startswith('GET ')] == []
+    assert list(project['labels']) == ['Developer']
+    assert project['labels']['Developer']['color'] == '000000'
+    assert project['boards'] == []
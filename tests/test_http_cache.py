@@ -0,0 +1,51 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import os
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+import ggi_http_cache
+
+
+@pytest.fixture
+def http_cache(monkeypatch):
+    """
+    HTTP cache enabled in the current directory, disabled afterwards.
+    """
+    monkeypatch.setattr(HTTPAdapter, 'send', HTTPAdapter.send)
+    monkeypatch.setattr(ggi_http_cache, 'cache_stats', {'hits': 0, 'misses': 0, 'uncached': 0})
+    ggi_http_cache.enable_http_cache()
+    return ggi_http_cache.cache_stats
+
+
+def test_responses_are_replayed_from_the_board_cache(tmp_path, fake_forge, http_cache):
+    url = f"{fake_forge.url}/api/v4/projects/ggi%2Fmy-ggi-board/issues"
+
+    first = requests.get(url, headers={'PRIVATE-TOKEN': 'token'}, timeout=10)
+    second = requests.get(url, headers={'PRIVATE-TOKEN': 'token'}, timeout=10)
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert http_cache == {'hits': 1, 'misses': 1, 'uncached': 0}
+    assert fake_forge.forge.stats['not modified'] == 1
+    assert len(os.listdir(tmp_path / 'web' / 'cache' / 'http')) == 2
+
+
+def test_tokens_do_not_share_cache_entries(fake_forge, http_cache):
+    url = f"{fake_forge.url}/api/v4/projects/ggi%2Fmy-ggi-board/labels"
+
+    requests.get(url, headers={'PRIVATE-TOKEN': 'token'}, timeout=10)
+    requests.get(url, headers={'PRIVATE-TOKEN': 'other'}, timeout=10)
+
+    assert http_cache['hits'] == 0
+    assert fake_forge.forge.stats['not modified'] == 0
@@ -0,0 +1,65 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import pytest
+
+import ggi_telemetry
+
+openmetrics_parser = pytest.importorskip('prometheus_client.openmetrics.parser')
+
+report = {
+    'script': 'ggi_update_website_github',
+    'total_seconds': 2.5,
+    'phases': {'retrieve issues': {'seconds': 2.0, 'requests': 3, 'request_seconds': 1.5}},
+    'endpoints': {
+        'GET api.github.com/repos/{owner}/{repo}/issues': {
+            'requests': 3, 'statuses': {'200': 2, '403': 1},
+            'bytes_sent': 0, 'bytes_received': 3000,
+            'latency_seconds': {'p50': 0.4, 'p90': 0.6, 'p99': 0.6, 'mean': 0.5, 'max': 0.6, 'sum': 1.5}},
+    },
+    'rate_limits': [
+        {'host': 'api.github.com', 'resource': 'core', 'limit': 5000, 'remaining': 4990, 'min_remaining': 4980},
+        {'host': 'api.github.com', 'resource': 'graphql', 'limit': 5000, 'remaining': 4000, 'min_remaining': 3999},
+    ],
+}
+
+
+def test_openmetrics_output_is_parsed():
+    families = {family.name: family for family in
+                openmetrics_parser.text_string_to_metric_families(ggi_telemetry.format_openmetrics(report))}
+
+    assert [s.value for s in families['ggi_rate_limit_remaining'].samples] == [4990, 4000]
+    assert [s.value for s in families['ggi_rate_limit_min_remaining'].samples] == [4980, 3999]
+    assert sum(s.value for s in families['ggi_http_requests'].samples) == 3
+    assert families['ggi_http_request_duration_seconds'].type == 'summary'
+
+
+def test_openmetrics_output_without_rate_limits_is_parsed():
+    families = list(openmetrics_parser.text_string_to_metric_families(
+        ggi_telemetry.format_openmetrics(dict(report, rate_limits=[]))))
+
+    assert 'ggi_run_duration_seconds' in [family.name for family in families]
+
+
+def test_streamed_response_body_is_not_read():
+    requests = pytest.importorskip('requests')
+
+    class StreamedBody:
+        def read(self, *args, **kwargs):
+            raise AssertionError('body read by telemetry')
+
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = StreamedBody()
+    request = requests.Request('GET', 'https://api.github.com/repos/o/r/issues').prepare()
+
+    ggi_telemetry.record_request(request, response, 0.1)
+
+    assert response._content is False
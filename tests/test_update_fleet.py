@@ -0,0 +1,76 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import json
+import os
+import sys
+
+import pytest
+
+import ggi_update_fleet
+
+
+def write_manifest(tmp_path, boards: list):
+    manifest_file = os.path.join(tmp_path, 'fleet.json')
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump({'boards': boards}, f)
+    return manifest_file
+
+
+def run_fleet(monkeypatch, options: list):
+    monkeypatch.setattr(sys, 'argv', ['ggi_update_fleet.py'] + options)
+    ggi_update_fleet.main()
+
+
+def test_boards_of_both_forges_are_updated(tmp_path, monkeypatch, fake_forge):
+    """
+    Each board is updated in its own output directory, with its own
+    token, and the summary lists them in manifest order.
+    """
+    monkeypatch.setenv('OSPO_A_TOKEN', 'token-a')
+    monkeypatch.setenv('OSPO_B_TOKEN', 'token-b')
+    manifest_file = write_manifest(tmp_path, [
+        {'name': 'ospo-a', 'backend': 'gitlab', 'url': fake_forge.url,
+         'project': 'ospo-a/my-ggi-board', 'token_env': 'OSPO_A_TOKEN'},
+        {'name': 'ospo-b', 'backend': 'github', 'url': fake_forge.url,
+         'project': 'ospo-b/my-ggi-board', 'token_env': 'OSPO_B_TOKEN', 'output_dir': 'boards/b'},
+    ])
+
+    run_fleet(monkeypatch, ['-m', manifest_file, '-j', '2', '-c', '-s', 'summary.json'])
+
+    with open('summary.json', 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    assert [(board['name'], board['status']) for board in report['boards']] == [
+        ('ospo-a', 'success'), ('ospo-b', 'success')]
+    assert report['failed'] == 0
+    for output_dir in ['ospo-a', 'boards/b']:
+        with open(os.path.join(tmp_path, output_dir, 'web/data/ggi_dashboard.json'), 'r', encoding='utf-8') as f:
+            assert json.load(f)['activities_stats']['total'] == 10
+        assert os.path.isdir(os.path.join(tmp_path, output_dir, 'web/cache/http'))
+    assert set(fake_forge.forge.projects) == {'ospo-a/my-ggi-board', 'ospo-b/my-ggi-board'}
+
+
+def test_failed_board_does_not_stop_the_others(tmp_path, monkeypatch, capsys, fake_forge):
+    monkeypatch.setenv('OSPO_A_TOKEN', 'token-a')
+    monkeypatch.delenv('OSPO_B_TOKEN', raising=False)
+    manifest_file = write_manifest(tmp_path, [
+        {'name': 'ospo-a', 'backend': 'gitlab', 'url': fake_forge.url,
+         'project': 'ospo-a/my-ggi-board', 'token_env': 'OSPO_A_TOKEN'},
+        {'name': 'ospo-b', 'backend': 'github', 'url': fake_forge.url,
+         'project': 'ospo-b/my-ggi-board', 'token_env': 'OSPO_B_TOKEN'},
+    ])
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_fleet(monkeypatch, ['-m', manifest_file, '-j', '2', '--stream'])
+
+    assert exit_info.value.code == 1
+    assert "Cannot find env var 'OSPO_B_TOKEN' for the token." in capsys.readouterr().out
+    with open(os.path.join(tmp_path, 'ospo-a/web/data/ggi_dashboard.json'), 'r', encoding='utf-8') as f:
+        assert json.load(f)['activities_stats']['total'] == 10
@@ -0,0 +1,277 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import gzip
+import json
+import os
+
+import pytest
+
+import ggi_update_website
+
+description = """Activity ID: [GGI-A-01](https://ospo-alliance.org/ggi/activities/a).
+
+### Description
+
+Some text.
+
+### Scorecard
+
+#### Tasks
+
+- [x] First task
+- [ ] Second task
+"""
+
+
+@pytest.fixture
+def workflow_cache(tmp_path, monkeypatch):
+    """
+    Empty workflow cache, saved in a throwaway directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ggi_update_website, 'workflow_cache', {})
+    monkeypatch.setattr(ggi_update_website, 'workflow_cache_used', set())
+    return ggi_update_website.workflow_cache
+
+
+def test_workflow_cache_round_trip(workflow_cache):
+    parsed = ggi_update_website.extract_workflow(description)
+    ggi_update_website.save_workflow_cache()
+    workflow_cache.clear()
+
+    ggi_update_website.load_workflow_cache()
+
+    assert len(workflow_cache) == 1
+    assert ggi_update_website.extract_workflow(description) == parsed
+
+
+@pytest.mark.parametrize('content', [
+    # Cache saved before it had a version.
+    {'0' * 64: ['GGI-A-01', [], {}, []]},
+    {'version': ggi_update_website.workflow_cache_version + 1, 'descriptions': {'0' * 64: []}},
+])
+def test_workflow_cache_of_another_version_is_discarded(workflow_cache, content):
+    os.makedirs(os.path.dirname(ggi_update_website.file_workflow_cache))
+    with open(ggi_update_website.file_workflow_cache, 'w', encoding='utf-8') as f:
+        json.dump(content, f)
+
+    ggi_update_website.load_workflow_cache()
+
+    assert workflow_cache == {}
+
+
+def make_issue(issue_id: int, activity_id: str, title: str):
+    return ggi_update_website.Issue(issue_id, activity_id, 'open', title, '', '2025-01-01 00:00:00+00:00',
+                                    f'https://forge/issues/{issue_id}', '', {}, 0, 0)
+
+
+def test_duplicate_activity_pages_are_not_rewritten(tmp_path, monkeypatch):
+    import pandas as pd
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/scorecards')
+    issues = pd.DataFrame([make_issue(1, 'GGI-A-01', 'First'), make_issue(2, 'GGI-A-01', 'Duplicate'),
+                           make_issue(3, 'GGI-A-02', 'Other')])
+    ggi_update_website.write_activities_to_md(issues)
+    stats = dict(ggi_update_website.output_stats)
+
+    ggi_update_website.write_activities_to_md(issues)
+
+    assert ggi_update_website.output_stats['changed'] == stats['changed']
+    assert ggi_update_website.output_stats['unchanged'] == stats['unchanged'] + 2
+    with open('web/content/scorecards/activity_GGI-A-01.md', 'r', encoding='utf-8') as f:
+        assert 'title: First' in f.read()
+
+
+def test_interrupted_append_leaves_label_history_intact(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/includes')
+    header = 'time,issue_id,action'
+    ggi_update_website.append_label_rows('2025-01-01 00:00:00+00:00,1,add Done\n', header)
+    with open(ggi_update_website.file_labels_hist, 'rb') as f:
+        history = f.read()
+
+    with pytest.raises(KeyboardInterrupt):
+        with ggi_update_website.AppendedOutput(ggi_update_website.file_labels_hist, header) as output:
+            output.write('2025-01-02 00:00:00+00:00,1,rem')
+            raise KeyboardInterrupt()
+
+    with open(ggi_update_website.file_labels_hist, 'rb') as f:
+        assert f.read() == history
+    assert os.listdir('web/content/includes') == ['labels_hist.csv']
+
+
+def test_label_history_is_created_with_its_header(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/includes')
+    with open(ggi_update_website.file_labels_hist_gz, 'wb') as f:
+        f.write(b'outdated')
+
+    ggi_update_website.append_label_rows('', 'time,issue_id,action')
+    ggi_update_website.append_label_rows('2025-01-01 00:00:00+00:00,1,add Done\n', 'time,issue_id,action')
+
+    with open(ggi_update_website.file_labels_hist, 'r', encoding='utf-8') as f:
+        assert f.read().splitlines() == ['time,issue_id,action', '2025-01-01 00:00:00+00:00,1,add Done']
+    assert not os.path.exists(ggi_update_website.file_labels_hist_gz)
+    with gzip.open(ggi_update_website.file_labels_hist_export, 'rt', encoding='utf-8') as f:
+        assert f.read().splitlines() == ['time,issue_id,action', '2025-01-01 00:00:00+00:00,1,add Done']
+
+
+def test_label_events_repeated_within_a_second_are_kept(tmp_path, monkeypatch):
+    import pandas as pd
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/includes')
+    time = '2025-01-01 00:00:00+00:00'
+    events = pd.DataFrame([[time, 1, 11, 'label', 'alice', 'add Done', 'u'],
+                           [time, 1, 12, 'label', 'alice', 'remove Done', 'u'],
+                           [time, 1, 13, 'label', 'alice', 'add Done', 'u']],
+                          columns=ggi_update_website.LabelEvent._fields)
+
+    assert ggi_update_website.append_label_events(events) == 3
+    assert ggi_update_website.append_label_events(events) == 0
+
+    # The same events, with the node IDs of the GraphQL API.
+    events['event_id'] = ['LE_1', 'LE_2', 'LE_3']
+    assert ggi_update_website.append_label_events(events) == 0
+    events['event_id'] = ['LE_1', 'LE_2', 'LE_4']
+    events.loc[2, 'author'] = 'bob'
+    assert ggi_update_website.append_label_events(events) == 1
+
+
+progress_params = {'progress_labels': {'not_started': 'Not Selected', 'in_progress': 'In Progress', 'done': 'Done'}}
+progress_goals = ['Usage Goal', 'Trust Goal']
+
+
+def write_label_history(rows: list):
+    with open(ggi_update_website.file_labels_hist, 'w', encoding='utf-8') as f:
+        f.write('time,issue_id,event_id,type,author,action,url\n')
+        for time, issue_id, action in rows:
+            f.write(f'{time},{issue_id},0,label,a,{action},u\n')
+
+
+@pytest.mark.filterwarnings('error')
+def test_progress_series(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/includes')
+    series = ggi_update_website.update_progress_series(progress_params, progress_goals)
+    assert series['dates'] == []
+
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    day = [str(today - timedelta(days=3 - n)) for n in range(4)]
+    write_label_history([(day[0], 1, 'add Usage Goal'), (day[0], 1, 'add In Progress'),
+                         (day[1], 2, 'labeled Trust Goal'), (day[1], 2, 'labeled Done'),
+                         (day[2], 1, 'remove In Progress'), (day[2], 1, 'add Done'),
+                         (day[2], 3, 'add Unrelated')])
+    series = ggi_update_website.update_progress_series(progress_params, progress_goals)
+
+    assert len(series['dates']) == 4
+    assert series['states']['in_progress'] == [1, 1, 0, 0]
+    assert series['states']['done'] == [0, 1, 2, 2]
+    assert series['goals']['done'] == [[0, 0, 1, 1], [0, 1, 1, 1]]
+
+    # Nothing new: the stored days are read back.
+    assert ggi_update_website.update_progress_series(progress_params, progress_goals) == series
+
+
+@pytest.mark.filterwarnings('error')
+def test_progress_series_of_the_current_day_only(tmp_path, monkeypatch):
+    from datetime import datetime, timezone
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/includes')
+    write_label_history([(datetime.now(timezone.utc), 1, 'add Done')])
+
+    series = ggi_update_website.update_progress_series(progress_params, progress_goals)
+
+    assert len(series['dates']) == 1
+    assert series['states']['done'] == [1]
+    with open(ggi_update_website.file_progress_series, 'r', encoding='utf-8') as f:
+        assert f.read().splitlines() == ['date,goal,state,count']
+
+
+def test_streaming_skips_events_up_to_the_latest_stored_one(tmp_path, monkeypatch):
+    from datetime import datetime, timezone
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('web/content/includes')
+    os.makedirs('web/content/scorecards')
+    LabelEvent = ggi_update_website.LabelEvent
+    with open(ggi_update_website.file_labels_hist, 'w', encoding='utf-8') as f:
+        f.write(','.join(LabelEvent._fields) + '\n')
+        f.write('2025-01-01 00:00:00+00:00,1,11,label,alice,add Done,u\n')
+        f.write('2025-01-02 00:00:00+00:00,1,12,label,alice,remove Done,u\n')
+        f.write('2025-01-01 00:00:00+00:00,2,21,label,alice,add Done,u\n')
+
+    marks = ggi_update_website.read_label_event_marks(LabelEvent._fields)
+    assert sorted(marks) == [1, 2]
+    assert marks[1][1] == {f"{1735776000 * 10**9}|1|alice|remove Done": {'12'}}
+
+    def event(day, issue_id, event_id, action):
+        return ggi_update_website.make_label_event(datetime(2025, 1, day, tzinfo=timezone.utc), issue_id,
+                                                  event_id, 'alice', action, 'u')
+
+    def record(issue_id, hist):
+        issue = ggi_update_website.Issue(issue_id, f'GGI-A-0{issue_id}', 'open', 'Title', 'Done',
+                                         '2025-01-03T00:00:00Z', 'u', 'Description', {}, 0, 0)
+        return [issue_id, issue, [], hist]
+
+    ggi_update_website.stream_records([
+        record(1, [event(1, 1, 11, 'add Done'), event(2, 1, 12, 'remove Done'),
+                   event(2, 1, 13, 'remove Done'), event(3, 1, 14, 'add Done')]),
+        record(2, [event(1, 2, 21, 'add Done')]),
+        record(3, [event(1, 3, 31, 'add Done')])])
+
+    with open(ggi_update_website.file_labels_hist, 'r', encoding='utf-8') as f:
+        event_ids = [line.split(',')[2] for line in f.read().splitlines()[1:]]
+    assert event_ids == ['11', '12', '21', '13', '14', '31']
+
+
+def test_keywords_are_replaced_longest_first_in_a_single_pass(tmp_path, capsys):
+    """
+    A keyword within a longer one does not break it, and replacements are
+    not replaced again.
+    """
+    file_in = os.path.join(tmp_path, 'config.toml')
+    with open(file_in, 'w', encoding='utf-8', newline='') as f:
+        f.write('url = "[GGI_URL]"\r\nactivities = "[GGI_URL]/[GGI_URL_ACTIVITIES]"\r\n')
+
+    ggi_update_website.update_keywords(file_in, {'[GGI_URL]': 'https://[GGI_URL_ACTIVITIES]',
+                                                 '[GGI_URL_ACTIVITIES]': 'activities'})
+
+    with open(file_in, 'r', encoding='utf-8', newline='') as f:
+        assert f.read() == ('url = "https://[GGI_URL_ACTIVITIES]"\r\n'
+                            'activities = "https://[GGI_URL_ACTIVITIES]/activities"\r\n')
+    assert f'- Changing "[GGI_URL]" to "https://[GGI_URL_ACTIVITIES]" in {file_in} (2 times).' \
+        in capsys.readouterr().out
+
+
+def test_files_without_keywords_are_not_rewritten(tmp_path, capsys):
+    files = [os.path.join(tmp_path, name) for name in ['a.md', 'b.md', 'c.md']]
+    for file_in, content in zip(files, ['[GGI_NAME]', 'No keyword.', '[GGI_NAME] [GGI_NAME]']):
+        with open(file_in, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.utime(file_in, (0, 0))
+
+    ggi_update_website.update_keywords_in_files(files, {'[GGI_NAME]': 'My board'}, workers=2)
+
+    contents = []
+    for file_in in files:
+        with open(file_in, 'r', encoding='utf-8') as f:
+            contents.append(f.read())
+    assert contents == ['My board', 'No keyword.', 'My board My board']
+    assert os.stat(files[0]).st_mtime != 0
+    assert os.stat(files[1]).st_mtime == 0
+    out = capsys.readouterr().out
+    assert out.index(files[0]) < out.index(files[1]) < out.index(files[2])
+    assert f'No keyword found in {files[1]}, unchanged.' in out
@@ -0,0 +1,69 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import gzip
+import json
+import sys
+
+import pytest
+
+import ggi_update_website_github
+
+
+@pytest.mark.parametrize('options', [[], ['-g'], ['-s', '-w', '2'], ['-g', '-i']])
+def test_main_updates_website(board, monkeypatch, options):
+    """
+    The command line of the updater is parsed by its own parser (not the
+    deploy one) and a whole update runs against the fake forge.
+    """
+    retrieve_params = ggi_update_website_github.retrieve_params
+    monkeypatch.setattr(ggi_update_website_github, 'retrieve_params', lambda: retrieve_params(board))
+    monkeypatch.setattr(sys, 'argv', ['ggi_update_website_github.py'] + options)
+
+    ggi_update_website_github.main()
+
+    with open('web/data/ggi_dashboard.json', 'r', encoding='utf-8') as f:
+        dashboard = json.load(f)
+    assert dashboard['activities_stats']['total'] == 10
+    with open('web/content/includes/labels_hist.csv', 'rb') as f, \
+            gzip.open('web/static/data/labels_hist.csv.gz', 'rb') as export:
+        assert export.read() == f.read()
+
+
+@pytest.mark.parametrize('fake_forge', [{'issues': 150, 'throttle_every': 2, 'retry_after': 0}], indirect=True)
+def test_graphql_query_retries_throttled_requests(board, fake_forge):
+    """
+    GraphQL queries rejected by a secondary rate limit are paced and
+    retried instead of failing the update.
+    """
+    params = ggi_update_website_github.retrieve_params(board)
+    records = ggi_update_website_github.retrieve_github_issues_graphql(params)
+
+    assert len(records) == 150
+    assert fake_forge.forge.stats['throttled (secondary)'] > 0
+
+
+def test_switching_api_does_not_duplicate_label_history(board, monkeypatch):
+    """
+    REST and GraphQL give different IDs to the same label events: the
+    history must not store them again when the API changes.
+    """
+    retrieve_params = ggi_update_website_github.retrieve_params
+    monkeypatch.setattr(ggi_update_website_github, 'retrieve_params', lambda: retrieve_params(board))
+
+    sizes = []
+    for options in [[], ['-g'], ['-g', '-s'], []]:
+        monkeypatch.setattr(sys, 'argv', ['ggi_update_website_github.py'] + options)
+        ggi_update_website_github.main()
+        with open('web/content/includes/labels_hist.csv', 'r', encoding='utf-8') as f:
+            sizes.append(len(f.readlines()))
+
+    assert sizes[0] > 1
+    assert sizes == [sizes[0]] * 4
@@ -0,0 +1,84 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import json
+import os
+import sys
+
+import pytest
+
+import ggi_update_website_gitlab
+
+
+@pytest.fixture
+def update(gitlab_board, monkeypatch):
+    """
+    Run the updater of the GitLab board with the given options, and return
+    the dashboard data it wrote.
+    """
+    retrieve_params = ggi_update_website_gitlab.retrieve_params
+    monkeypatch.setattr(ggi_update_website_gitlab, 'retrieve_params', lambda: retrieve_params(gitlab_board))
+    return lambda options: run_update(monkeypatch, options)
+
+
+def run_update(monkeypatch, options: list):
+    monkeypatch.setattr(sys, 'argv', ['ggi_update_website_gitlab.py'] + options)
+    ggi_update_website_gitlab.main()
+    with open('web/data/ggi_dashboard.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_outputs():
+    outputs = {}
+    for name in ['issues.csv', 'tasks.csv', 'labels_hist.csv']:
+        with open(os.path.join('web/content/includes', name), 'r', encoding='utf-8') as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+@pytest.mark.parametrize('options', [[], ['-i'], ['-s', '-w', '2']])
+def test_main_updates_website(update, options):
+    dashboard = update(options)
+
+    assert dashboard['activities_stats']['total'] == 10
+    scorecards = [name for name in os.listdir('web/content/scorecards') if name.startswith('activity_')]
+    assert len(scorecards) == 10
+    with open('web/config.toml', 'r', encoding='utf-8') as f:
+        assert '[GGI_PAGES_URL]' not in f.read()
+
+
+def test_all_modes_write_the_same_outputs(update, fake_forge):
+    """
+    Full, incremental and streaming updates of an unchanged board give
+    the same outputs, and the label history does not grow.
+    """
+    dashboard = update(['-i'])
+    outputs = read_outputs()
+
+    for options in [['-i'], [], ['-s']]:
+        assert update(options) == dashboard
+        assert read_outputs() == outputs
+    assert len(outputs['labels_hist.csv'].splitlines()) == 41
+
+
+def test_incremental_update_fetches_changed_issues_only(update, fake_forge):
+    update(['-i'])
+    forge = fake_forge.forge
+    project = forge.get_project('ggi/my-ggi-board')
+    activity = forge.metadata['activities'][10]
+    forge.add_issue(project, activity['name'], project['issues'][0]['body'].replace(
+        forge.metadata['activities'][0]['id'], activity['id']), [activity['goal'], 'Done'], 'user')
+    forge.stats.clear()
+
+    dashboard = update(['-i'])
+
+    assert dashboard['activities_stats']['total'] == 11
+    events_requests = sum(count for endpoint, count in forge.stats.items() if 'resource_label_events' in endpoint)
+    assert events_requests == 1
@@ -0,0 +1,26 @@
+# ######################################################################
+# Copyright (c) 2025 The OSPO Alliance contributors
+#
+# This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License 2.0
+# which is available at https://www.eclipse.org/legal/epl-2.0/
+#
+# SPDX-License-Identifier: EPL-2.0
+######################################################################
+
+import os
+
+import ggi_utils_gitlab
+
+
+def test_pages_domains_are_forgotten_when_the_suffix_list_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    suffix_list = tmp_path / 'public_suffix_list.dat'
+    monkeypatch.setattr(ggi_utils_gitlab, 'public_suffix_file', str(suffix_list))
+
+    suffix_list.write_text('// ===BEGIN ICANN DOMAINS===\norg\n', encoding='utf-8')
+    assert ggi_utils_gitlab.get_pages_domain('https://gitlab.ow2.org') == 'ow2'
+    assert os.path.isfile(ggi_utils_gitlab.file_pages_domains)
+
+    suffix_list.write_text('// ===BEGIN ICANN DOMAINS===\norg\now2.org\n', encoding='utf-8')
+    assert ggi_utils_gitlab.get_pages_domain('https://gitlab.ow2.org') == 'gitlab'